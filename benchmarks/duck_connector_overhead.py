@@ -0,0 +1,135 @@
+"""Per-call overhead of DuckConnector: a fresh DuckDB connection per statement vs persistent connections.
+
+The "fresh" connector reproduces the previous behaviour: every metadata statement
+opens the metadata database again, every query opens the data database and
+re-registers the DataFrames, and YAML files are upserted one statement at a time.
+
+Run from the repository root:
+    PYTHONPATH=. python benchmarks/duck_connector_overhead.py [--queries 200] [--yaml-files 50]
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import duckdb
+import numpy as np
+import pandas as pd
+import yaml
+
+from broinsight.metadata.metadata_db import DuckConnector
+from broinsight.utils.result_stream import fetch_capped
+
+
+class FreshConnectionConnector(DuckConnector):
+    """DuckConnector as it was before connections were reused"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # An open connection keeps the database cached in-process, which would hide the cost of reopening it
+        self.metadata_conn.close()
+        self.data_conn.close()
+
+    def _execute_metadata(self, sql: str, params: list = None):
+        with duckdb.connect(self.metadata_db_path) as conn:
+            result = conn.execute(sql, params) if params else conn.execute(sql)
+            if sql.strip().upper().startswith('SELECT'):
+                return result.fetchall()
+            return result
+
+    def register_dataframe(self, df: pd.DataFrame, table_name: str):
+        self._registered_tables[table_name] = df
+
+    def execute_query(self, sql: str, max_rows=None, max_bytes=None, timeout=None):
+        with duckdb.connect(self.data_db_path) as conn:
+            for table_name, df in self._registered_tables.items():
+                conn.register(table_name, df)
+            return fetch_capped(conn, sql, max_rows=max_rows, max_bytes=max_bytes)
+
+    def register_metadata_from_yaml(self, yaml_dir: str):
+        for yaml_file in Path(yaml_dir).glob("*.yaml"):
+            with open(yaml_file, 'r') as f:
+                metadata = yaml.safe_load(f)
+            table_name = metadata['table_name']
+            detail = json.dumps({'fields': metadata['fields']})
+            existing = self._execute_metadata("SELECT table_id FROM metadata_tables WHERE table_name = ?", [table_name])
+            if existing:
+                self._execute_metadata(
+                    "UPDATE metadata_tables SET description = ?, detail = ?, updated_at = CURRENT_TIMESTAMP WHERE table_name = ?",
+                    [metadata['description'], detail, table_name])
+            else:
+                self._execute_metadata(
+                    "INSERT INTO metadata_tables (table_id, table_name, description, detail) VALUES (?, ?, ?, ?)",
+                    [str(uuid.uuid4()), table_name, metadata['description'], detail])
+
+
+def write_yaml_files(directory: Path, count: int):
+    """YAML metadata files modelled on the ones shipped in metadata/"""
+    templates = [yaml.safe_load(path.read_text()) for path in sorted(Path("metadata").glob("*.yaml"))]
+    for i in range(count):
+        metadata = dict(templates[i % len(templates)])
+        metadata['table_name'] = f"table_{i}"
+        (directory / f"table_{i}.yaml").write_text(yaml.safe_dump(metadata))
+
+
+def per_call_ms(fn, repeat: int) -> float:
+    fn()  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def measure(connector_class, workdir: Path, yaml_dir: Path, frames: dict, queries: int) -> dict:
+    workdir.mkdir()
+    connector = connector_class(metadata_db_path=str(workdir / "metadata.db"))
+    for name, df in frames.items():
+        connector.register_dataframe(df, name)
+
+    start = time.perf_counter()
+    connector.register_metadata_from_yaml(str(yaml_dir))
+    register_seconds = time.perf_counter() - start
+
+    sql = "SELECT o.region, COUNT(*) AS n, AVG(o.amount) AS amount FROM orders o GROUP BY o.region"
+    results = {
+        "execute_query (ms/call)": per_call_ms(lambda: connector.execute_query(sql), queries),
+        "get_metadata_context (ms/call)": per_call_ms(lambda: connector.get_metadata_context(["table_0", "table_1"]), queries),
+        "register_metadata_from_yaml (s)": register_seconds,
+    }
+    if connector_class is DuckConnector:
+        connector.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--queries", type=int, default=200, help="calls timed per operation")
+    parser.add_argument("--yaml-files", type=int, default=50, help="YAML metadata files to register")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = {
+        "orders": pd.DataFrame({"region": rng.choice(["N", "S", "E", "W"], 100_000), "amount": rng.random(100_000)}),
+        "customers": pd.DataFrame({"id": np.arange(10_000), "age": rng.integers(18, 80, 10_000)}),
+        "products": pd.DataFrame({"id": np.arange(1_000), "price": rng.random(1_000) * 100}),
+    }
+    root = Path(tempfile.mkdtemp())
+    try:
+        yaml_dir = root / "yaml"
+        yaml_dir.mkdir()
+        write_yaml_files(yaml_dir, args.yaml_files)
+        before = measure(FreshConnectionConnector, root / "fresh", yaml_dir, frames, args.queries)
+        after = measure(DuckConnector, root / "persistent", yaml_dir, frames, args.queries)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{'operation':<34}{'fresh connection':>18}{'persistent':>12}{'speedup':>9}")
+    for operation in before:
+        print(f"{operation:<34}{before[operation]:>18.3f}{after[operation]:>12.3f}{before[operation] / after[operation]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""field_profile and table_profile on a large frame: the previous per-statistic implementation vs the single-pass one.
+
+The "previous" functions below are the implementation before field_profile was
+rebuilt around one value_counts call per column and table_profile around one
+row hash. The frame has an integer, a float, an object string and a categorical
+column, with some missing values and duplicate rows.
+
+Run from the repository root (10M rows needs a few GB of memory):
+    PYTHONPATH=. python benchmarks/profile_10m_rows.py [--rows 10000000] [--repeat 1]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from broinsight.data_quality import field_profile, table_profile
+
+
+def _previous_data_type(x):
+    if x == "object" or x == "category":
+        return "string"
+    if x.startswith("int"):
+        return "integer"
+    if x.startswith("float"):
+        return "float"
+    return "unknown"
+
+def _previous_numeric_statistics(series: pd.Series):
+    q1 = series.quantile(0.25)
+    q3 = series.quantile(0.75)
+    iqr = q3 - q1
+    proxy = pd.Series({
+        "min": series.min(),
+        "max": series.max(),
+        "mean": series.mean(),
+        "median": series.median(),
+        "std": series.std(),
+        "var": series.var(),
+        "skew": series.skew(),
+        "kurt": series.kurtosis(),
+        "iqr": iqr,
+        "cv": series.std() / series.mean(),
+        "lower_bound": q1 - 1.5 * iqr,
+        "upper_bound": q3 + 1.5 * iqr
+    })
+    return proxy.round(2).to_dict()
+
+def _previous_string_statistics(series: pd.Series):
+    lengths = series.str.len()
+    proxy = pd.Series({
+        "avg_length": lengths.mean(),
+        "min_length": lengths.min(),
+        "max_length": lengths.max(),
+        "empty_count": (series == "").sum(),
+        "whitespace_count": series.str.isspace().sum(),
+        "pattern_consistency": series.nunique() / len(series)
+    })
+    proxy = proxy.round(2).to_dict()
+    return {"mode": series.mode().values[0], **proxy}
+
+def _previous_statistics(series: pd.Series, dtype: str):
+    if dtype == "string":
+        return _previous_string_statistics(series)
+    if dtype in ["integer", "float"]:
+        return _previous_numeric_statistics(series)
+    return {}
+
+def previous_field_profile(df: pd.DataFrame, top_n: int = 5):
+    features = df.columns.tolist()
+    data = pd.DataFrame({
+        "data_types": df.dtypes.astype(str),
+        "missing_values": df.isnull().sum(),
+        "missing_values_pct": df.isnull().sum() / df.shape[0],
+        "unique_values": df.nunique(),
+        "unique_values_pct": df.nunique() / df.shape[0],
+        "most_frequent": [df[feat].value_counts().head(top_n).to_dict() for feat in features]
+    }, index=features)
+    data["data_types"] = data["data_types"].apply(_previous_data_type)
+    data["statistics"] = [_previous_statistics(series=df[feat], dtype=data.loc[feat, "data_types"]) for feat in features]
+    return data.round(2).to_dict(orient="index")
+
+def previous_table_profile(df: pd.DataFrame):
+    rows, columns = df.shape
+    duplicates = int(df.duplicated().sum())
+    evidences = df.loc[df.duplicated(keep=False),:].to_dict(orient="index")
+    return {"rows": rows, "columns": columns, "duplicates": duplicates, "evidences": evidences}
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    cities = np.array(["Bangkok", "Chiang Mai", "Phuket", "Khon Kaen", "Hat Yai", " ", ""], dtype=object)
+    amount = rng.gamma(2.0, 50.0, rows)
+    amount[rng.random(rows) < 0.05] = np.nan
+    df = pd.DataFrame({
+        "customer_id": rng.integers(0, rows // 2, rows),
+        "amount": amount,
+        "city": pd.Series(cities[rng.integers(0, len(cities), rows)], dtype=object),
+        "segment": pd.Categorical(rng.choice(["gold", "silver", "bronze"], rows))
+    })
+    # A few exact duplicate rows for table_profile to report
+    duplicates = df.sample(n=min(1_000, rows), random_state=0)
+    return pd.concat([df, duplicates], ignore_index=True)
+
+def seconds(fn, df: pd.DataFrame, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000, help="rows in the generated frame")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per function; the best is reported")
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    print(f"{len(df):,} rows, columns: {', '.join(f'{col} ({dtype})' for col, dtype in df.dtypes.astype(str).items())}")
+    print(f"{'function':<16}{'previous (s)':>14}{'current (s)':>13}{'speedup':>9}")
+    for name, previous, current in [
+        ("field_profile", previous_field_profile, field_profile),
+        ("table_profile", previous_table_profile, table_profile),
+    ]:
+        before = seconds(previous, df, args.repeat)
+        after = seconds(current, df, args.repeat)
+        print(f"{name:<16}{before:>14.2f}{after:>13.2f}{before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
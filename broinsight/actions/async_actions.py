@@ -0,0 +1,114 @@
+"""Awaitable variants of the flow actions, for driving many sessions from one event loop.
+
+Each async action reuses the prompt building and response handling of its
+synchronous counterpart. Model calls are awaited through ``model.run_async``
+(see ``broinsight.experiment.async_model.AsyncModel``), and DuckDB work (metadata
+lookups, query execution) runs on a bounded executor so it never blocks the loop.
+"""
+
+import asyncio
+import inspect
+from concurrent.futures import Executor
+from functools import partial
+from typing import Optional
+from .chat import Chat
+from .generate_sql import GenerateSQL
+from .guide_question import GuideQuestion
+from .interface import Shared
+from .organize import Organize
+from .retrieve import Retrieve
+from .select_metadata import SelectMetadata
+from broinsight.experiment.streaming import TokenStream
+
+async def offload(executor: Optional[Executor], fn, *args):
+    """Run blocking work (DuckDB) on the executor and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(fn, *args))
+
+class AsyncActionMixin:
+    executor: Optional[Executor] = None
+
+    async def run_async(self, shared:Shared):
+        raise NotImplementedError("Overwrite .run_async method before starting AsyncFlow")
+
+    async def execute_action(self, shared:Shared) -> str:
+        result = await self.run_async(shared)
+        return self.validate_next_action(result)
+
+class AsyncLLMAction(AsyncActionMixin):
+    """Builds the prompt on the executor, awaits the model, then handles the response like run()"""
+    streaming = False  # whether answers go to shared.on_token chunk by chunk
+
+    async def call_model(self, shared:Shared, messages:list):
+        if not (self.streaming and shared.on_token is not None):
+            return await self.model.run_async(system_prompt=self.system_prompt, messages=messages)
+        if hasattr(self.model, 'stream'):
+            stream = self.model.stream(self.system_prompt, messages)
+        else:
+            stream = TokenStream(self.model, self.system_prompt, messages)
+        async for chunk in stream:
+            # on_token may be a plain function or a coroutine function
+            result = shared.on_token(chunk)
+            if inspect.isawaitable(result):
+                await result
+        return stream.response
+
+    async def run_async(self, shared:Shared):
+        prompt = await offload(self.executor, self.create_prompt, shared)
+        try:
+            response = await self.call_model(shared, self.create_messages(shared, prompt))
+            self.handle_response(shared, prompt, response)
+        except Exception as e:
+            shared.session_logger.log(
+                action=self.__class__.__name__, input_data=prompt, status='failed', error_message=str(e)
+            )
+        return shared
+
+class AsyncOrganize(AsyncLLMAction, Organize):
+    def __init__(self, system_prompt:str, model, executor:Optional[Executor]=None):
+        super().__init__(system_prompt=system_prompt, model=model)
+        self.executor = executor
+
+    async def run_async(self, shared:Shared):
+        shared.next_action = "default"
+        if shared.db is None and shared.metadata_db is None:
+            return shared
+        return await super().run_async(shared)
+
+class AsyncSelectMetadata(AsyncLLMAction, SelectMetadata):
+    def __init__(self, system_prompt:str, model, executor:Optional[Executor]=None):
+        super().__init__(system_prompt=system_prompt, model=model)
+        self.executor = executor
+
+    async def run_async(self, shared:Shared):
+        if await offload(self.executor, self.use_cached_plan, shared):
+            return shared
+        return await super().run_async(shared)
+
+class AsyncGenerateSQL(AsyncLLMAction, GenerateSQL):
+    def __init__(self, system_prompt:str, model, executor:Optional[Executor]=None):
+        super().__init__(system_prompt=system_prompt, model=model)
+        self.executor = executor
+
+class AsyncChat(AsyncLLMAction, Chat):
+    streaming = True
+
+    def __init__(self, system_prompt:str, model, executor:Optional[Executor]=None):
+        super().__init__(system_prompt=system_prompt, model=model)
+        self.executor = executor
+
+class AsyncGuideQuestion(AsyncLLMAction, GuideQuestion):
+    streaming = True
+
+    def __init__(self, system_prompt:str, model, executor:Optional[Executor]=None):
+        super().__init__(system_prompt=system_prompt, model=model)
+        self.executor = executor
+
+class AsyncRetrieve(AsyncActionMixin, Retrieve):
+    """Pre-flight, query and logging are all DuckDB work: the whole step runs on the executor"""
+    def __init__(self, executor:Optional[Executor]=None):
+        super().__init__()
+        self.executor = executor
+
+    async def run_async(self, shared:Shared):
+        return await offload(self.executor, self.run, shared)
@@ -1,5 +1,6 @@
 from . import Action, BaseLLM
 from .interface import Shared
+from broinsight.experiment.streaming import run_streaming
 
 class Chat(Action):
     def __init__(self, system_prompt:str, model:BaseLLM):
@@ -14,30 +15,35 @@ class Chat(Action):
         elif shared.fallback_message is not None:
             prompt = f"{shared.fallback_message}\n\nUser question: {user_input}\n\nPlease explain what went wrong and suggest how to rephrase the question."
         else:
-            prompt = [
-                "DATA:\n\n{result}\n\n".format(result=shared.query_result.to_string(index=False, max_cols=None)),
-                "USER_INPUT:\n\n{user_input}".format(user_input=user_input)
-            ]
+            prompt = ["DATA:\n\n{result}\n\n".format(result=shared.query_result.to_string(index=False, max_cols=None))]
+            if shared.query_total_rows > len(shared.query_result):
+                prompt.append("NOTE: showing the first {shown} of {total} rows\n\n".format(shown=len(shared.query_result), total=shared.query_total_rows))
+            prompt.append("USER_INPUT:\n\n{user_input}".format(user_input=user_input))
             prompt = "\n".join(prompt)
         return prompt
 
+    def create_messages(self, shared:Shared, prompt:str):
+        # Temporary messages for the LLM call: history plus the data-enriched prompt
+        return shared.messages[:-1].copy() + [self.model.UserMessage(text=prompt)]
+
+    def handle_response(self, shared:Shared, prompt:str, response:dict):
+        shared.input_token += response['tokens']['input']
+        shared.output_token += response['tokens']['output']
+        # Add the actual conversation to shared messages
+        shared.messages.append(self.model.AIMessage(text=response['content']))
+        shared.session_logger.log(
+            action=self.__class__.__name__, input_data=prompt, output_data=response['content'], status='success'
+        )
+
     def run(self, shared:Shared):
         prompt = self.create_prompt(shared)
         
-        # Create temporary messages for LLM call
-        temp_messages = shared.messages[:-1].copy() + [self.model.UserMessage(text=prompt)]
         try:
-            response = self.model.run(
-                system_prompt=self.system_prompt,
-                messages=temp_messages
-            )
-            shared.input_token += response['tokens']['input']
-            shared.output_token += response['tokens']['output']
-            # Add the actual conversation to shared messages
-            shared.messages.append(self.model.AIMessage(text=response['content']))
-            shared.session_logger.log(
-                action=self.__class__.__name__, input_data=prompt, output_data=response['content'], status='success'
+            # Streams the answer to shared.on_token when set; messages and tokens are updated once it completes
+            response = run_streaming(
+                self.model, self.system_prompt, self.create_messages(shared, prompt), shared.on_token
             )
+            self.handle_response(shared, prompt, response)
         except Exception as e:
             shared.session_logger.log(
                 action=self.__class__.__name__, input_data=prompt, status='failed', error_message=str(e)
@@ -1,5 +1,6 @@
 from . import Action, BaseLLM
 from .interface import Shared
+from broinsight.experiment.streaming import run_streaming
 
 class GuideQuestion(Action):
     def __init__(self, system_prompt, model:BaseLLM):
@@ -7,23 +8,32 @@ class GuideQuestion(Action):
         self.system_prompt = system_prompt
         self.model = model
 
-    def run(self, shared:Shared):
+    def create_prompt(self, shared:Shared):
         metadata = shared.metadata_db.construct_prompt_context()
         user_chat_history = shared.messages[-1]['content']
-        prompt = "METADATAS:\n\n{metadata}\n\nUSER_INPUT:\n\n{user_input}\n\n".format(metadata=metadata, user_input=user_chat_history)
+        return "METADATAS:\n\n{metadata}\n\nUSER_INPUT:\n\n{user_input}\n\n".format(metadata=metadata, user_input=user_chat_history)
+
+    def create_messages(self, shared:Shared, prompt:str):
+        return [
+            self.model.UserMessage(text=prompt)
+        ]
+
+    def handle_response(self, shared:Shared, prompt:str, response:dict):
+        shared.input_token += response['tokens']['input']
+        shared.output_token += response['tokens']['output']        
+        shared.messages.append(self.model.AIMessage(text=response['content']))
+        shared.session_logger.log(
+            action=self.__class__.__name__, input_data=prompt, output_data=response['content'], status='success'
+        )
+
+    def run(self, shared:Shared):
+        prompt = self.create_prompt(shared)
         try:
-            response = self.model.run(
-                system_prompt=self.system_prompt,
-                messages=[
-                    self.model.UserMessage(text=prompt)
-                ]
-            )
-            shared.input_token += response['tokens']['input']
-            shared.output_token += response['tokens']['output']        
-            shared.messages.append(self.model.AIMessage(text=response['content']))
-            shared.session_logger.log(
-                action=self.__class__.__name__, input_data=prompt, output_data=response['content'], status='success'
+            # Streams the answer to shared.on_token when set; messages and tokens are updated once it completes
+            response = run_streaming(
+                self.model, self.system_prompt, self.create_messages(shared, prompt), shared.on_token
             )
+            self.handle_response(shared, prompt, response)
         except Exception as e:
             shared.session_logger.log(
                 action=self.__class__.__name__, input_data=prompt, status='failed', error_message=str(e)
@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Optional
 from broinsight.session_logger import SessionLogger
+from broinsight.utils.sql_guard import SQLGuard
+from broinsight.utils.plan_cache import PlanCache
 
 class Shared(BaseModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -13,10 +15,17 @@ class Shared(BaseModel):
     selected_metadata: List[str] = Field(description="Selected metadata", default_factory=list)
     sql_query: str = Field(description="SQL query", default="")
     query_result: Any = Field(description="Query result", default=None)
+    query_total_rows: int = Field(description="Total rows returned by the query, including rows not fetched", default=0)
+    max_result_rows: Optional[int] = Field(description="Max query rows fetched into query_result (None fetches all)", default=1000)
+    sql_guard: Optional[SQLGuard] = Field(description="Pre-flight checks and time limit for generated SQL (None disables them)", default_factory=SQLGuard)
+    plan_cache: Optional[PlanCache] = Field(description="Validated SQL plans reused for questions differing only in literals (None disables it)", default=None)
+    plan_cache_hit: bool = Field(description="Whether sql_query was bound from plan_cache", default=False)
     error_log: List[str] = Field(description="Error Log", default_factory=list)
     retries: int = Field(description="Retries", default=0)
     max_retries: int = Field(description="Max retries", default=3)
     fallback_message: Any = Field(description="Fallback message", default=None)
+    on_token: Optional[Callable[[str], Any]] = Field(description="Receives Chat/GuideQuestion answer chunks as they are generated (None waits for the full answer)", default=None)
+    next_action: str = Field(description="Routing decision of the last branching action (Organize, Retrieve)", default="default")
     
     # Session support
     session_logger: Optional[SessionLogger] = Field(description="Session logger", default=None)
@@ -18,27 +18,41 @@ class Organize(Action):
             return "guide"
         return "default"
 
+    def create_prompt(self, shared:Shared):
+        metadata = shared.metadata_db.get_summary_prompt()
+
+        user_input = shared.messages[-1]['content']
+        
+        return "METADATAS:\n\n{metadata}\n\nUSER_INPUT:\n\n{user_input}\n\n".format(metadata=metadata, user_input=user_input)
+
+    def create_messages(self, shared:Shared, prompt:str):
+        return [self.model.UserMessage(text=prompt)]
+
+    def handle_response(self, shared:Shared, prompt:str, response:dict):
+        shared.input_token += response['tokens']['input']
+        shared.output_token += response['tokens']['output']        
+        shared.next_action = self.parse_response(response['content'])
+        shared.session_logger.log(
+            action=self.__class__.__name__, input_data=prompt, output_data=response['content'], status='success'
+        )
+
+    def validate_next_action(self, shared:Shared) -> str:
+        # Routing lives on the session state, so one flow instance can serve concurrent sessions
+        return shared.next_action
+
     def run(self, shared:Shared):
+        shared.next_action = "default"
         # Add user input to messages if not already there
         if shared.db is None and shared.metadata_db is None:
             return shared
         
-        metadata = shared.metadata_db.get_summary_prompt()
-
-        user_input = shared.messages[-1]['content']
-        
-        prompt = "METADATAS:\n\n{metadata}\n\nUSER_INPUT:\n\n{user_input}\n\n".format(metadata=metadata, user_input=user_input)
+        prompt = self.create_prompt(shared)
         try:
             response = self.model.run(
                 system_prompt=self.system_prompt,
-                messages=[self.model.UserMessage(text=prompt)]
-            )
-            shared.input_token += response['tokens']['input']
-            shared.output_token += response['tokens']['output']        
-            self.next_action = self.parse_response(response['content'])
-            shared.session_logger.log(
-                action=self.__class__.__name__, input_data=prompt, output_data=response['content'], status='success'
+                messages=self.create_messages(shared, prompt)
             )
+            self.handle_response(shared, prompt, response)
         except Exception as e:
             shared.session_logger.log(
                 action=self.__class__.__name__, input_data=prompt, status='failed', error_message=str(e)
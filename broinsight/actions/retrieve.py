@@ -1,35 +1,85 @@
 from . import Action
 from .interface import Shared
+from broinsight.utils.sql_guard import PreflightError
+from broinsight.utils.plan_cache import category_index
 
 class Retrieve(Action):
+    def preflight(self, shared:Shared):
+        """Plan the SQL before running it; rejected queries go back to GenerateSQL without touching data"""
+        report = shared.sql_guard.check(shared.db, shared.sql_query)
+        if not report.passed:
+            raise PreflightError(report)
+        if report.rewrites:
+            shared.session_logger.log(
+                action=self.__class__.__name__, input_data=shared.sql_query, output_data=report.sql,
+                status='rewritten', error_message="; ".join(report.rewrites)
+            )
+            shared.sql_query = report.sql
+    
+    def resource_details(self, shared:Shared):
+        """Resource limits the query ran under, for the session log"""
+        if hasattr(shared.db, 'resource_limits'):
+            try:
+                return {'resource_limits': shared.db.resource_limits()}
+            except Exception:
+                return None
+        return None
+    
+    def validate_next_action(self, shared:Shared) -> str:
+        return shared.next_action
+
+    def update_plan_cache(self, shared:Shared, succeeded:bool):
+        """Remember SQL that ran for its question; drop a cached plan whose SQL failed"""
+        if shared.plan_cache is None:
+            return
+        question = "\n".join([m['content'] for m in shared.messages if m['role']=='user'])
+        categories = category_index(shared.metadata_db.category_values()) if hasattr(shared.metadata_db, 'category_values') else {}
+        if succeeded and not shared.plan_cache_hit:
+            shared.plan_cache.store(question, shared.sql_query, shared.selected_metadata, categories)
+        elif not succeeded and shared.plan_cache_hit:
+            shared.plan_cache.invalidate(question, categories)
+            shared.plan_cache_hit = False
+    
     def run(self, shared:Shared):
+        shared.next_action = "default"
         if shared.db:
             try:
-                result = shared.db.execute_query(shared.sql_query)
+                options = {'max_rows': shared.max_result_rows}
+                if shared.sql_guard is not None and hasattr(shared.db, 'explain'):
+                    self.preflight(shared)
+                    if shared.sql_guard.timeout_seconds is not None:
+                        options['timeout'] = shared.sql_guard.timeout_seconds
+                result = shared.db.execute_query(shared.sql_query, **options)
                 shared.query_result = result
+                shared.query_total_rows = result.attrs.get('total_rows') or len(result)
                 shared.error_log = []
                 shared.retries = 0
+                self.update_plan_cache(shared, succeeded=True)
                 
                 if len(result) == 0:
                     shared.fallback_message = "The query executed successfully but returned no results. This might mean the data doesn't exist or the filters are too restrictive."
                     shared.session_logger.log(
-                        action=self.__class__.__name__, input_data=shared.sql_query, status='success', error_message='Empty result set'
+                        action=self.__class__.__name__, input_data=shared.sql_query, status='success', error_message='Empty result set',
+                        details=self.resource_details(shared)
                     )
                 else:
                     shared.session_logger.log(
                         action=self.__class__.__name__, input_data=shared.sql_query, status='success',
+                        details=self.resource_details(shared)
                     )                
-                self.next_action = "default"
+                shared.next_action = "default"
             except Exception as e:
                 shared.error_log.append(str(e))
                 shared.retries += 1
+                self.update_plan_cache(shared, succeeded=False)
                 if shared.retries <= shared.max_retries:
-                    self.next_action = "generate_sql"
+                    shared.next_action = "generate_sql"
                     shared.session_logger.log(
-                        action=self.__class__.__name__, input_data=shared.sql_query, status='failed', error_message=str(e)
+                        action=self.__class__.__name__, input_data=shared.sql_query, status='failed', error_message=str(e),
+                        details=self.resource_details(shared)
                     )                         
                 else:
-                    self.next_action = "default"
+                    shared.next_action = "default"
                     fallback_message = "I couldn't generate a working SQL query after {max_retries} attempts. The error was: \n{error_history}".format(max_retries=shared.max_retries, error_history="\n".join(["\t -{err}".format(err=err) for err in shared.error_log]))
                     shared.fallback_message = fallback_message
                     shared.error_log = []
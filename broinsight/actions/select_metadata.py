@@ -1,5 +1,6 @@
 from . import Action, BaseLLM
 from .interface import Shared
+from broinsight.utils.plan_cache import category_index
 import yaml
 
 class SelectMetadata(Action):
@@ -14,25 +15,58 @@ class SelectMetadata(Action):
         response = yaml.safe_load(response)['tables']
         return response
 
-    def run(self, shared:Shared):
+    def create_prompt(self, shared:Shared):
         metadata = shared.metadata_db.construct_prompt_context()
         user_chat_history = [m['content'] for m in shared.messages if m['role']=='user']
         user_chat_history = "\n".join(user_chat_history)
-        prompt = "METADATAS:\n\n{metadata}\n\nUSER_INPUT:\n\n{user_input}\n\n".format(metadata=metadata, user_input=user_chat_history)
+        return "METADATAS:\n\n{metadata}\n\nUSER_INPUT:\n\n{user_input}\n\n".format(metadata=metadata, user_input=user_chat_history)
+
+    def create_messages(self, shared:Shared, prompt:str):
+        return [self.model.UserMessage(text=prompt)]
+
+    def handle_response(self, shared:Shared, prompt:str, response:dict):
+        shared.input_token += response['tokens']['input']
+        shared.output_token += response['tokens']['output']        
+        tables = self.parse_response(response['content'])
+        shared.selected_metadata = []
+        for table in set(tables):
+            shared.selected_metadata.append(table)
+        shared.session_logger.log(
+            action=self.__class__.__name__, input_data=prompt, output_data=response['content'], status='success'
+        )
+
+    def use_cached_plan(self, shared:Shared) -> bool:
+        """Bind a cached plan for the question; on a hit GenerateSQL is skipped"""
+        shared.next_action = "default"
+        shared.plan_cache_hit = False
+        if shared.plan_cache is None:
+            return False
+        question = "\n".join([m['content'] for m in shared.messages if m['role']=='user'])
+        categories = category_index(shared.metadata_db.category_values()) if hasattr(shared.metadata_db, 'category_values') else {}
+        plan = shared.plan_cache.lookup(question, categories)
+        if plan is None:
+            return False
+        shared.sql_query, shared.selected_metadata = plan
+        shared.plan_cache_hit = True
+        shared.next_action = "retrieve"
+        shared.session_logger.log(
+            action=self.__class__.__name__, input_data=question, output_data=shared.sql_query, status='cached'
+        )
+        return True
+
+    def validate_next_action(self, shared:Shared) -> str:
+        return shared.next_action
+
+    def run(self, shared:Shared):
+        if self.use_cached_plan(shared):
+            return shared
+        prompt = self.create_prompt(shared)
         try:
             response = self.model.run(
                 system_prompt=self.system_prompt,
-                messages=[self.model.UserMessage(text=prompt)]
-            )
-            shared.input_token += response['tokens']['input']
-            shared.output_token += response['tokens']['output']        
-            tables = self.parse_response(response['content'])
-            shared.selected_metadata = []
-            for table in set(tables):
-                shared.selected_metadata.append(table)
-            shared.session_logger.log(
-                action=self.__class__.__name__, input_data=prompt, output_data=response['content'], status='success'
+                messages=self.create_messages(shared, prompt)
             )
+            self.handle_response(shared, prompt, response)
         except Exception as e:
             shared.session_logger.log(
                 action=self.__class__.__name__, input_data=prompt, status='failed', error_message=str(e)
@@ -1,5 +1,6 @@
 from typing import Any, Dict, Optional
 from broprompt import Prompt
+from broinsight.experiment.streaming import run_streaming
 import os
 try:
     from importlib.resources import files
@@ -139,13 +140,15 @@ class BroInsight:
             print(f"Visualization generation failed: {e}")
             return None
 
-    def ask_data(self, context: str, message: str):
+    def ask_data(self, context: str, message: str, on_token=None):
         """
         Provide conversational insights about data results.
         
         Args:
             context: Query results or data to analyze
             message: User's question about the data
+            on_token: Optional callback receiving the answer chunk by chunk as it is generated
+                (streams with models offering run_stream, e.g. BedrockOpenAI and LocalOpenAI)
             
         Returns:
             LLM response with business insights and interpretations
@@ -154,7 +157,6 @@ class BroInsight:
         prompt = Prompt.from_markdown(prompt_path)
         user_input = f"CONTEXT:\n\n{context}\n\nUSER_INPUT:\n\n{message}\n\n"
         
-        return self.model.run(
-            system_prompt=prompt.str,
-            messages=[self.model.UserMessage(text=user_input)]
+        return run_streaming(
+            self.model, prompt.str, [self.model.UserMessage(text=user_input)], on_token
         )
\ No newline at end of file
@@ -10,6 +10,7 @@ Key Features:
     - Frequency distributions and uniqueness metrics
     - Outlier detection bounds
     - String pattern analysis
+    - Chunked profiling of inputs larger than memory
 
 Example:
     >>> from broinsight.data_quality import field_profile, table_profile
@@ -18,9 +19,11 @@ Example:
     >>> df = pd.read_csv('data.csv')
     >>> field_stats = field_profile(df)
     >>> table_stats = table_profile(df)
+    >>> streamed = stream_profile(pd.read_csv('big.csv', chunksize=100_000))
 """
 
 from .field_profile import field_profile
 from .table_profile import table_profile
+from .stream_profile import stream_profile
 
-__all__ = ['field_profile', 'table_profile']
\ No newline at end of file
+__all__ = ['field_profile', 'table_profile', 'stream_profile']
\ No newline at end of file
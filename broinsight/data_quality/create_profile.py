@@ -1,24 +1,39 @@
 import pandas as pd
+from typing import Iterable, Union
 from .field_profile import field_profile
 from .criteria import assess_data_quality
 from .table_profile import table_profile
+from .stream_profile import MAX_ROW_HASHES, stream_profile
 
 
-def create_profile(df: pd.DataFrame, top_n: int = 5) -> dict:
+def create_profile(df: Union[pd.DataFrame, Iterable], top_n: int = 5, max_hashes: int = MAX_ROW_HASHES) -> dict:
     """Create a comprehensive data profile combining table and field statistics with quality assessment.
     
+    Besides a DataFrame, accepts an iterable of DataFrame chunks or Arrow batches
+    (e.g. ``pd.read_csv(path, chunksize=100_000)``), which is profiled one chunk at a
+    time with mergeable sketches; see ``stream_profile``.
+    
     Args:
-        df (pd.DataFrame): DataFrame to profile.
+        df (pd.DataFrame | Iterable): DataFrame, or iterable of DataFrame chunks / Arrow batches.
         top_n (int, optional): Number of most frequent values to include. Defaults to 5.
+        max_hashes (int, optional): Cap on row hashes kept for duplicate detection when streaming.
         
     Returns:
         dict: Combined profile with dataset summary and field details.
     """
-    # Get table-level profile
-    table_info = table_profile(df)
-    
-    # Get field profiles
-    field_profiles = field_profile(df, top_n=top_n)
+    if isinstance(df, pd.DataFrame):
+        # Get table-level profile
+        table_info = table_profile(df)
+        
+        # Get field profiles
+        field_profiles = {
+            field_name: {"data_type": profile.pop("data_types"), **profile}
+            for field_name, profile in field_profile(df, top_n=top_n).items()
+        }
+    else:
+        streamed = stream_profile(df, top_n=top_n, max_hashes=max_hashes)
+        table_info = streamed["table"]
+        field_profiles = streamed["fields"]
     
     # Get quality assessments
     quality_assessments = assess_data_quality(field_profiles)
@@ -29,6 +44,8 @@ def create_profile(df: pd.DataFrame, top_n: int = 5) -> dict:
         "columns": table_info["columns"],
         "duplicates": table_info["duplicates"]
     }
+    if not table_info.get("duplicates_exact", True):
+        dataset_summary["duplicates_exact"] = False
     
     # Add duplicate examples if they exist
     if table_info["duplicates"] > 0 and "evidences" in table_info:
@@ -65,7 +82,8 @@ def format_profile(profile_dict: dict) -> str:
     lines.append(f"**Size:** {dataset['rows']} rows × {dataset['columns']} columns")
     
     if dataset["duplicates"] > 0:
-        lines.append(f"**Duplicates:** {dataset['duplicates']} duplicate record(s) found")
+        at_least = "" if dataset.get("duplicates_exact", True) else "at least "
+        lines.append(f"**Duplicates:** {at_least}{dataset['duplicates']} duplicate record(s) found")
         if "duplicate_examples" in dataset:
             example_rows = list(dataset["duplicate_examples"].keys())[:2]
             lines.append(f"**Examples:** Rows {', '.join(map(str, example_rows))} are identical")
@@ -83,7 +101,8 @@ def format_profile(profile_dict: dict) -> str:
         profile = field_data["profile"]
         lines.append(f"**Type:** {profile['data_type']}")
         lines.append(f"**Missing:** {profile['missing_values']} ({profile['missing_values_pct']:.1%})")
-        lines.append(f"**Unique:** {profile['unique_values']} ({profile['unique_values_pct']:.1%})")
+        approx = "" if profile.get("accuracy", {}).get("unique_values", {}).get("exact", True) else "~"
+        lines.append(f"**Unique:** {approx}{profile['unique_values']} ({profile['unique_values_pct']:.1%})")
         
         # Quality section
         quality = field_data["quality"]
@@ -35,7 +35,7 @@ def assess_field_quality(field_name: str, field_data: dict) -> dict:
     
     # Numeric data checks
     if data_type in ["integer", "float"]:
-        skew = abs(stats.get("skew", 0))
+        skew = abs(stats.get("skew") or 0)
         if skew > 2.0:
             issues.append({
                 "type": "high_skewness",
@@ -1,30 +1,59 @@
+import numpy as np
 import pandas as pd
 
 def _extract_data_type(x):
     """Convert pandas dtype to simplified data type category.
     
+    Recognizes NumPy, nullable extension, categorical and pyarrow-backed dtypes.
+    
     Args:
-        x (str): Pandas dtype as string (e.g., 'object', 'int64', 'float32').
+        x (str): Pandas dtype as string (e.g., 'object', 'int64', 'Float32', 'string[pyarrow]').
         
     Returns:
         str: Simplified data type ('string', 'integer', 'float', or 'unknown').
     """
-    if x=="object":
-        return "string"
-    if x=="category":
+    x = x.lower()
+    if x.endswith("[pyarrow]"):
+        x = x[:-len("[pyarrow]")]
+    if x in ["object", "category", "str", "string", "large_string"]:
         return "string"
-    if x.startswith("int"):
+    if x.startswith("int") or x.startswith("uint"):
         return "integer"
-    if x.startswith("float"):
+    if x.startswith("float") or x in ["double", "halffloat"]:
         return "float"
     else:
         return "unknown"
 
+def _numeric_values(series: pd.Series) -> np.ndarray:
+    """Non-null values of a numeric series as a float64 NumPy array (works for nullable and pyarrow dtypes)."""
+    values = series.to_numpy(dtype="float64", na_value=np.nan)
+    return values[~np.isnan(values)]
+
+def _central_moments(values: np.ndarray, mean: float):
+    """Second to fourth central moment sums, with floating point noise zeroed out as pandas does."""
+    deviations = values - mean
+    squared = deviations ** 2
+    m2 = squared.sum()
+    m3 = (squared * deviations).sum()
+    m4 = (squared ** 2).sum()
+    max_abs = np.abs(values).max(initial=0.0)
+    eps = np.finfo(np.float64).eps
+    if np.abs(m2) <= ((eps * max_abs) ** 2) * len(values):
+        m2 = 0.0
+    if np.abs(m3) <= ((eps * max_abs) ** 3) * len(values):
+        m3 = 0.0
+    if np.abs(m4) <= ((eps * max_abs) ** 4) * len(values):
+        m4 = 0.0
+    return m2, m3, m4
+
 def _extract_numeric_statistics(series: pd.Series):
     """Calculate comprehensive statistics for numeric data.
     
     Computes descriptive statistics including central tendency, dispersion,
-    distribution shape, and outlier detection bounds.
+    distribution shape, and outlier detection bounds. Values are converted to
+    a NumPy array once; the moments come from one pass over the deviations and
+    all quartiles from one percentile call, with pandas' bias-corrected skew
+    and kurtosis formulas.
     
     Args:
         series (pd.Series): Numeric pandas Series.
@@ -41,31 +70,64 @@ def _extract_numeric_statistics(series: pd.Series):
                   indicate high variability relative to the mean
             - lower_bound/upper_bound: Outlier detection bounds using 1.5*IQR rule
     """
-    q1 = series.quantile(0.25)
-    q3 = series.quantile(0.75)
+    values = _numeric_values(series)
+    n = len(values)
+    nan = np.nan
+    if n == 0:
+        minimum = maximum = mean = q1 = median = q3 = nan
+    else:
+        minimum, maximum, mean = values.min(), values.max(), values.mean()
+        q1, median, q3 = np.percentile(values, [25, 50, 75])
+    var = std = skew = kurt = nan
+    if n > 1:
+        m2, m3, m4 = _central_moments(values, mean)
+        var = m2 / (n - 1)
+        std = np.sqrt(var)
+        if n > 2:
+            skew = 0.0 if m2 == 0 else np.sqrt(n * (n - 1)) / (n - 2) * (m3 / n) / (m2 / n) ** 1.5
+        if n > 3:
+            denominator = (n - 2) * (n - 3) * m2 ** 2
+            kurt = 0.0 if denominator == 0 else (
+                n * (n + 1) * (n - 1) * m4 / denominator - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+            )
     iqr = q3 - q1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cv = np.float64(std) / np.float64(mean)
     proxy = pd.Series({
-        "min": series.min(),
-        "max": series.max(),
-        "mean": series.mean(),
-        "median": series.median(),
-        "std": series.std(),
-        "var": series.var(),
-        "skew": series.skew(),
-        "kurt": series.kurtosis(),
+        "min": minimum,
+        "max": maximum,
+        "mean": mean,
+        "median": median,
+        "std": std,
+        "var": var,
+        "skew": skew,
+        "kurt": kurt,
         "iqr": iqr,
-        "cv": series.std() / series.mean(),
+        "cv": cv,
         "lower_bound": q1 - 1.5 * iqr,
         "upper_bound": q3 + 1.5 * iqr
-    })
+    }, dtype="float64")
     return proxy.round(2).to_dict()
 
+def _extract_mode(counts: pd.Series):
+    """Most frequent value from value counts; ties go to the smallest value, like Series.mode()."""
+    if counts.empty:
+        return None
+    tied = counts.index[counts.to_numpy() == counts.iloc[0]]
+    try:
+        return min(tied)
+    except TypeError:
+        return tied[0]
 
-def _extract_string_statistics(series: pd.Series):
+def _extract_string_statistics(series: pd.Series, counts: pd.Series):
     """Calculate statistics specific to string/text data.
     
+    Works on the distinct values in value counts, weighted by their counts, so
+    each string is measured once rather than once per row.
+    
     Args:
         series (pd.Series): String pandas Series.
+        counts (pd.Series): Non-null value counts of the series.
         
     Returns:
         dict: Dictionary containing:
@@ -75,55 +137,99 @@ def _extract_string_statistics(series: pd.Series):
             - whitespace_count: Number of whitespace-only strings
             - pattern_consistency: Ratio of unique values to total (diversity measure)
     """
-    lengths = series.str.len()
+    distinct = pd.Series(counts.index.to_numpy(dtype=object), dtype=object)
+    weights = counts.to_numpy(dtype="float64")
+    # Non-string values (e.g. in object or categorical columns) have no length, as with Series.str
+    is_text = distinct.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+    texts = distinct[is_text]
+    lengths = texts.str.len().to_numpy(dtype="float64")
+    text_weights = weights[is_text]
+    has_text = text_weights.sum() > 0
     proxy = pd.Series({
-        "avg_length": lengths.mean(),
-        "min_length": lengths.min(),
-        "max_length": lengths.max(),
-        "empty_count": (series == "").sum(),
-        "whitespace_count": series.str.isspace().sum(),
-        "pattern_consistency": series.nunique() / len(series)
-    })
+        "avg_length": (lengths * text_weights).sum() / text_weights.sum() if has_text else np.nan,
+        "min_length": lengths.min() if has_text else np.nan,
+        "max_length": lengths.max() if has_text else np.nan,
+        "empty_count": text_weights[lengths == 0].sum(),
+        "whitespace_count": text_weights[texts.str.isspace().to_numpy(dtype=bool)].sum(),
+        "pattern_consistency": len(counts) / len(series) if len(series) else np.nan
+    }, dtype="float64")
     proxy = proxy.round(2).to_dict()
-    proxy = {"mode": series.mode().values[0], **proxy}
+    proxy = {"mode": _extract_mode(counts), **proxy}
     return proxy
 
 
-def _extract_statistics(series: pd.Series, dtype: str):
+def _extract_statistics(series: pd.Series, dtype: str, counts: pd.Series):
     """Extract appropriate statistics based on data type.
     
     Args:
         series (pd.Series): Data series to analyze.
         dtype (str): Data type category ('string', 'integer', 'float', etc.).
+        counts (pd.Series): Non-null value counts of the series.
         
     Returns:
         dict: Statistics dictionary appropriate for the data type.
     """
     if dtype=="string":
-        return _extract_string_statistics(series)
+        return _extract_string_statistics(series, counts)
     if dtype in ["integer", "float"]:
         return _extract_numeric_statistics(series)
     else:
         return {}
 
-def _extract_most_frequent(series: pd.Series, top_n: int = 5):
+def _value_counts(series: pd.Series) -> pd.Series:
+    """Non-null value counts, most frequent first; unused categories are dropped."""
+    counts = series.value_counts(dropna=True, sort=True)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        counts = counts[counts > 0]
+    if not counts.is_monotonic_decreasing:
+        # pyarrow-backed value counts are not always returned in order
+        counts = counts.sort_values(ascending=False, kind="stable")
+    return counts
+
+def _native(value):
+    """Unwrap NumPy/pyarrow scalars into plain Python values."""
+    return value.item() if isinstance(value, np.generic) else value
+
+def _extract_most_frequent(counts: pd.Series, top_n: int = 5):
     """Get the most frequent values and their counts.
     
     Args:
-        series (pd.Series): Data series to analyze.
+        counts (pd.Series): Non-null value counts of the series.
         top_n (int, optional): Number of top frequent values to return. Defaults to 5.
         
     Returns:
         dict: Dictionary mapping values to their occurrence counts.
     """
-    return series.value_counts().head(top_n).to_dict()
+    return {_native(value): int(count) for value, count in counts.head(top_n).items()}
+
+def _profile_series(series: pd.Series, top_n: int = 5):
+    """Profile a single column from one value_counts pass.
+    
+    The value counts give the number of non-null values (hence missing values),
+    the number of unique values, the top-n values and the mode at once.
+    """
+    rows = len(series)
+    counts = _value_counts(series)
+    missing = rows - int(counts.sum())
+    unique = len(counts)
+    data_type = _extract_data_type(str(series.dtype))
+    return {
+        "data_types": data_type,
+        "missing_values": missing,
+        "missing_values_pct": round(missing / rows, 2) if rows else np.nan,
+        "unique_values": unique,
+        "unique_values_pct": round(unique / rows, 2) if rows else np.nan,
+        "most_frequent": _extract_most_frequent(counts, top_n=top_n),
+        "statistics": _extract_statistics(series=series, dtype=data_type, counts=counts)
+    }
 
 def field_profile(df: pd.DataFrame, top_n: int = 5):
     """Generate comprehensive data quality profile for each field in a DataFrame.
     
     Creates detailed statistics and quality metrics for every column, including
     data types, missing values, uniqueness, frequency distributions, and
-    type-specific statistical measures.
+    type-specific statistical measures. Each column is profiled in a single
+    pass built around one value_counts call.
     
     Args:
         df (pd.DataFrame): DataFrame to profile.
@@ -139,15 +245,4 @@ def field_profile(df: pd.DataFrame, top_n: int = 5):
             - most_frequent: Top N most frequent values with counts
             - statistics: Type-specific statistical measures
     """
-    features = df.columns.tolist()
-    data = pd.DataFrame({
-        "data_types": df.dtypes.astype(str),
-        "missing_values": df.isnull().sum(),
-        "missing_values_pct": df.isnull().sum() / df.shape[0],
-        "unique_values": df.nunique(),
-        "unique_values_pct": df.nunique() / df.shape[0],
-        "most_frequent": [_extract_most_frequent(df[feat], top_n=top_n) for feat in features]
-    }, index=features)
-    data["data_types"] = data["data_types"].apply(_extract_data_type)
-    data["statistics"] = [_extract_statistics(series=df[feat], dtype=data.loc[feat, "data_types"]) for feat in features] 
-    return data.round(2).to_dict(orient="index")
\ No newline at end of file
+    return {feat: _profile_series(df[feat], top_n=top_n) for feat in df.columns}
@@ -0,0 +1,238 @@
+"""Partition-parallel profiling of multi-file datasets across processes.
+
+A dataset (parquet/CSV files, given as paths or glob patterns) is split into
+partitions: one per file, and for parquet files additionally into ranges of row
+groups. Each partition is profiled in its own process with its own DuckDB
+connection into mergeable state (``FieldSketch`` per field, plus row-hash
+fingerprint counts for duplicates), and the partial states are reduced into one
+profile. This scales with cores where a single DuckDB query would not, e.g. on
+CSV parsing or on per-column sequential queries.
+"""
+
+import duckdb
+import math
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, List, Optional
+from .sketches import FieldSketch
+from .sql_profile import _path_literal, _quote_identifier, sql_field_sketches
+from .stream_profile import MAX_ROW_HASHES
+
+
+def _reader(partition: dict, extra: str = "") -> str:
+    """DuckDB table function reading the file of one partition"""
+    if partition["hive"]:
+        extra += ", hive_partitioning=true"
+    if partition["format"] == 'parquet':
+        return f"read_parquet({_path_literal(partition['path'])}{extra})"
+    return f"read_csv_auto({_path_literal(partition['path'])}{extra})"
+
+
+def expand_paths(conn, paths) -> List[str]:
+    """Resolve paths and glob patterns to a sorted list of files"""
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        if any(char in path for char in "*?["):
+            files.extend(row[0] for row in conn.execute("SELECT file FROM glob(?)", [path]).fetchall())
+        else:
+            files.append(path)
+    return sorted(set(files))
+
+
+def file_partitions(conn, paths, target_partitions: int = 1, file_format: Optional[str] = None,
+                    hive_partitioning: bool = False) -> List[dict]:
+    """Split files into partitions of roughly equal work.
+
+    Every file is at least one partition. When there are fewer files than
+    ``target_partitions``, parquet files are further split into contiguous
+    ranges of row groups, read through a ``file_row_number`` filter that DuckDB
+    pushes down to the row groups. CSV files are never split.
+
+    Args:
+        file_format: "parquet" or "csv"; taken from each file's suffix when omitted
+        hive_partitioning: Read key=value directories of each file as columns
+
+    Returns:
+        list: ``{"path", "format", "hive", "rows": (start, stop) or None}`` per partition.
+    """
+    files = expand_paths(conn, paths)
+    if not files:
+        raise ValueError(f"No files found for {paths}")
+    splits = max(1, math.ceil(target_partitions / len(files)))
+    partitions = []
+    for path in files:
+        fmt = file_format or ('parquet' if path.lower().endswith(('.parquet', '.parq', '.pq')) else 'csv')
+        base = {"path": path, "format": fmt, "hive": hive_partitioning}
+        if splits == 1 or fmt != 'parquet':
+            partitions.append(dict(base, rows=None))
+            continue
+        row_groups = [row[0] for row in conn.execute(
+            f"SELECT row_group_num_rows FROM parquet_metadata({_path_literal(path)}) "
+            "GROUP BY row_group_id, row_group_num_rows ORDER BY row_group_id"
+        ).fetchall()]
+        per_split = max(1, math.ceil(len(row_groups) / splits))
+        start = 0
+        for first in range(0, len(row_groups), per_split):
+            stop = start + sum(row_groups[first:first + per_split])
+            partitions.append(dict(base, rows=(start, stop)))
+            start = stop
+        if not row_groups:
+            partitions.append(dict(base, rows=None))
+    return partitions
+
+
+def partition_source(partition: dict) -> str:
+    """SQL selecting exactly the rows of one partition"""
+    if partition["rows"] is None:
+        return f"SELECT * FROM {_reader(partition)}"
+    start, stop = partition["rows"]
+    return (f"SELECT * EXCLUDE (file_row_number) FROM {_reader(partition, ', file_row_number=true')} "
+            f"WHERE file_row_number >= {start} AND file_row_number < {stop}")
+
+
+def profile_partition(partition: dict, connection_setup: Optional[Callable] = None,
+                      precision: int = 10, quantile_size: int = 100, capacity: int = 1024,
+                      max_hashes: int = MAX_ROW_HASHES) -> dict:
+    """Profile one partition into mergeable partial state (runs inside a worker process).
+
+    Args:
+        partition: Partition from file_partitions
+        connection_setup: Picklable callable applied to the worker's fresh connection
+            (e.g. to load httpfs and create the S3 secret)
+
+    Returns:
+        dict: rows, the field sketches, and the row fingerprints with their counts
+            (``None`` when the partition has more than ``max_hashes`` distinct rows,
+            with ``duplicates`` still counted within the partition).
+    """
+    conn = duckdb.connect()
+    try:
+        conn.execute("SET enable_progress_bar = false")
+        if connection_setup is not None:
+            connection_setup(conn)
+        conn.execute(f"CREATE TEMP VIEW partition_rows AS {partition_source(partition)}")
+        col_names = [col[0] for col in conn.execute("DESCRIBE partition_rows").fetchall()]
+        fingerprint = f"hash({', '.join(_quote_identifier(col) for col in col_names)})"
+        groups = conn.execute(
+            f"SELECT {fingerprint} AS fingerprint, COUNT(1) AS dup_count FROM partition_rows GROUP BY fingerprint"
+        ).fetchnumpy()
+        rows = int(groups["dup_count"].sum())
+        exact = len(groups["fingerprint"]) <= max_hashes
+        return {
+            "rows": rows,
+            "columns": col_names,
+            "duplicates": rows - len(groups["fingerprint"]),
+            "fingerprints": np.asarray(groups["fingerprint"], dtype=np.uint64) if exact else None,
+            "dup_counts": np.asarray(groups["dup_count"], dtype=np.int64) if exact else None,
+            "fields": sql_field_sketches(conn, "partition_rows", precision=precision,
+                                         quantile_size=quantile_size, capacity=capacity)
+        }
+    finally:
+        conn.close()
+
+
+def _merge_field(left: FieldSketch, right: FieldSketch) -> FieldSketch:
+    """Merge field sketches, widening integer to float when files disagree"""
+    merged = left.merge(right)
+    if {left.data_type, right.data_type} == {"integer", "float"}:
+        merged.data_type = "float"
+    elif left.data_type == "unknown":
+        # Placeholder for files that lack the column
+        merged.data_type = right.data_type
+    return merged
+
+
+def reduce_partitions(partials: List[dict], top_n: int = 5, max_evidences: int = 10) -> dict:
+    """Reduce partial states into one profile.
+
+    Returns:
+        dict: ``{"table": ..., "fields": ...}``. ``table`` has rows, columns and
+            duplicates (``duplicates_exact`` False when a partition exceeded the hash
+            cap and only within-partition duplicates were counted), plus the
+            fingerprints of the ``max_evidences`` largest duplicate groups as
+            ``top_groups`` (``{fingerprint: dup_count}``). ``fields`` maps each field
+            to a profile entry with its merged ``sketch``.
+    """
+    if not partials:
+        raise ValueError("No partitions to reduce")
+    # Union of columns in first-seen order: files may add columns (read with union_by_name)
+    columns = list(dict.fromkeys(col for partial in partials for col in partial["columns"]))
+    rows = sum(partial["rows"] for partial in partials)
+
+    top_groups = {}
+    exact = all(partial["fingerprints"] is not None for partial in partials)
+    if exact:
+        fingerprints = np.concatenate([partial["fingerprints"] for partial in partials])
+        counts = np.concatenate([partial["dup_counts"] for partial in partials])
+        unique, inverse = np.unique(fingerprints, return_inverse=True)
+        group_counts = np.bincount(inverse, weights=counts).astype(np.int64)
+        duplicates = rows - len(unique)
+        largest = np.argsort(-group_counts, kind="stable")[:max_evidences]
+        top_groups = {int(unique[i]): int(group_counts[i]) for i in largest if group_counts[i] > 1}
+    else:
+        duplicates = sum(partial["duplicates"] for partial in partials)
+
+    fields = {}
+    for col in columns:
+        merged = None
+        for partial in partials:
+            if col in partial["fields"]:
+                sketch = FieldSketch.from_dict(partial["fields"][col])
+            else:
+                # Every row of a file without the column reads as NULL
+                sketch = FieldSketch(data_type=merged.data_type if merged else "unknown",
+                                     rows=partial["rows"], missing=partial["rows"])
+            merged = sketch if merged is None else _merge_field(merged, sketch)
+        fields[col] = merged.to_profile(top_n=top_n)
+        fields[col]["sketch"] = merged.to_dict()
+
+    table = {
+        "rows": rows,
+        "columns": len(columns),
+        "duplicates": duplicates,
+        "duplicates_exact": exact,
+        "top_groups": top_groups
+    }
+    return {"table": table, "fields": fields}
+
+
+def partition_profile(partitions: List[dict], processes: Optional[int] = None,
+                      connection_setup: Optional[Callable] = None, top_n: int = 5,
+                      max_evidences: int = 10, max_hashes: int = MAX_ROW_HASHES,
+                      progress_callback: Optional[Callable[[int, int], None]] = None) -> dict:
+    """Profile partitions in a process pool and reduce them into one profile.
+
+    Workers are started with the "spawn" method, so no DuckDB state of the parent
+    is inherited across fork. Partials are reduced in partition order, so the
+    result does not depend on scheduling.
+
+    Args:
+        partitions: Partitions from file_partitions
+        processes: Worker processes (defaults to the CPU count); 1 profiles in-process
+        connection_setup: Picklable callable applied to each worker connection
+        top_n: Number of most frequent values to keep per field
+        max_evidences: Number of largest duplicate groups to report
+        max_hashes: Cap on distinct row fingerprints shipped back per partition
+        progress_callback: Called as progress_callback(completed, total) per partition
+    """
+    partials = [None] * len(partitions)
+    if processes == 1 or len(partitions) == 1:
+        for position, partition in enumerate(partitions):
+            partials[position] = profile_partition(partition, connection_setup, max_hashes=max_hashes)
+            if progress_callback:
+                progress_callback(position + 1, len(partitions))
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+            futures = {
+                executor.submit(profile_partition, partition, connection_setup, max_hashes=max_hashes): position
+                for position, partition in enumerate(partitions)
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                partials[futures[future]] = future.result()
+                if progress_callback:
+                    progress_callback(completed, len(partitions))
+    return reduce_partitions(partials, top_n=top_n, max_evidences=max_evidences)
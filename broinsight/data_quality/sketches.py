@@ -0,0 +1,351 @@
+"""Mergeable profiling state for incremental re-profiling.
+
+Each sketch summarises one column of one batch of rows and can be merged with
+the sketch of another batch, so appending data only requires profiling the new
+rows. Every sketch serialises to a JSON-safe dict (``to_dict``/``from_dict``) so
+it can be stored alongside the table ``Metadata``.
+
+Sketches:
+    - MomentSketch: counts, min/max and central moments merged with Chan's formulas
+    - HyperLogLog: distinct count estimate from hashed values
+    - QuantileSketch: fixed-size weighted quantile summary
+    - HeavyHitters: bounded counter of the most frequent values
+    - FieldSketch: all of the above for one field, rendered back into a field profile
+"""
+
+import math
+from datetime import date, datetime
+from decimal import Decimal
+
+
+def _json_value(value):
+    """Convert a value to a JSON-safe equivalent, keeping ints, floats, strings and bools."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+class MomentSketch:
+    """Count, min, max and central moment sums (M2..M4) of a numeric stream."""
+
+    def __init__(self, n=0, mean=0.0, m2=0.0, m3=0.0, m4=0.0, min=None, max=None):
+        self.n = n
+        self.mean = mean
+        self.m2 = m2
+        self.m3 = m3
+        self.m4 = m4
+        self.min = min
+        self.max = max
+
+    def merge(self, other: "MomentSketch") -> "MomentSketch":
+        """Combine two moment sketches (Chan et al. pairwise update)."""
+        if other.n == 0:
+            return MomentSketch(**self.to_dict())
+        if self.n == 0:
+            return MomentSketch(**other.to_dict())
+        na, nb = self.n, other.n
+        n = na + nb
+        delta = other.mean - self.mean
+        mean = self.mean + delta * nb / n
+        m2 = self.m2 + other.m2 + delta ** 2 * na * nb / n
+        m3 = (self.m3 + other.m3
+              + delta ** 3 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+        m4 = (self.m4 + other.m4
+              + delta ** 4 * na * nb * (na ** 2 - na * nb + nb ** 2) / n ** 3
+              + 6 * delta ** 2 * (na ** 2 * other.m2 + nb ** 2 * self.m2) / n ** 2
+              + 4 * delta * (na * other.m3 - nb * self.m3) / n)
+        return MomentSketch(
+            n=n, mean=mean, m2=m2, m3=m3, m4=m4,
+            min=min(self.min, other.min), max=max(self.max, other.max)
+        )
+
+    @property
+    def var(self):
+        """Sample variance, as DuckDB VARIANCE."""
+        return self.m2 / (self.n - 1) if self.n > 1 else None
+
+    @property
+    def std(self):
+        """Sample standard deviation, as DuckDB STDDEV."""
+        return math.sqrt(self.var) if self.var is not None else None
+
+    @property
+    def skew(self):
+        """Adjusted sample skewness, as DuckDB SKEWNESS."""
+        n = self.n
+        if n < 3 or self.m2 == 0:
+            return None
+        g1 = (self.m3 / n) / (self.m2 / n) ** 1.5
+        return g1 * math.sqrt(n * (n - 1)) / (n - 2)
+
+    @property
+    def kurt(self):
+        """Adjusted sample excess kurtosis, as DuckDB KURTOSIS."""
+        n = self.n
+        if n < 4 or self.m2 == 0:
+            return None
+        g2 = n * self.m4 / self.m2 ** 2 - 3
+        return ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))
+
+    def to_dict(self) -> dict:
+        return {
+            "n": self.n, "mean": self.mean, "m2": self.m2, "m3": self.m3, "m4": self.m4,
+            "min": _json_value(self.min), "max": _json_value(self.max)
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MomentSketch":
+        return cls(**data)
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter over 64-bit hashes split into 2**precision registers."""
+
+    def __init__(self, precision=10, registers=None):
+        self.precision = precision
+        self.registers = list(registers) if registers else [0] * (1 << precision)
+
+    @property
+    def relative_error(self) -> float:
+        """Relative standard error of the estimate, 1.04 / sqrt(m)."""
+        return round(1.04 / math.sqrt(len(self.registers)), 4)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if self.precision != other.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+        return HyperLogLog(self.precision, [max(a, b) for a, b in zip(self.registers, other.registers)])
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros > 0:
+            # Small-range correction: linear counting
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+    def to_dict(self) -> dict:
+        return {"precision": self.precision, "registers": self.registers}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HyperLogLog":
+        return cls(**data)
+
+
+class QuantileSketch:
+    """Equal-weight quantile summary of at most ``size`` points.
+
+    Built from evenly spaced quantiles of a batch; merging re-samples the weighted
+    union back to ``size`` points, keeping the rank error around 1 / size.
+    """
+
+    def __init__(self, n=0, points=None, size=100):
+        self.n = n
+        self.points = list(points) if points else []
+        self.size = size
+
+    @staticmethod
+    def probabilities(size: int = 100) -> list:
+        """Probabilities at which a batch is summarised."""
+        return [round((i + 0.5) / size, 6) for i in range(size)]
+
+    def _weighted(self):
+        weight = self.n / len(self.points) if self.points else 0
+        return [(point, weight) for point in self.points]
+
+    @staticmethod
+    def _quantile(weighted: list, q: float):
+        total = sum(weight for _, weight in weighted)
+        target = q * total
+        cumulative = 0.0
+        previous = None
+        for point, weight in weighted:
+            center = cumulative + weight / 2
+            if center >= target:
+                if previous is None or center == previous[1]:
+                    return point
+                # Linear interpolation between neighbouring point centres
+                ratio = (target - previous[1]) / (center - previous[1])
+                return previous[0] + ratio * (point - previous[0])
+            previous = (point, center)
+            cumulative += weight
+        return weighted[-1][0]
+
+    def quantile(self, q: float):
+        if not self.points:
+            return None
+        return self._quantile(self._weighted(), q)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if not other.points:
+            return QuantileSketch(self.n, self.points, self.size)
+        if not self.points:
+            return QuantileSketch(other.n, other.points, self.size)
+        weighted = sorted(self._weighted() + other._weighted())
+        points = [self._quantile(weighted, q) for q in self.probabilities(self.size)]
+        return QuantileSketch(self.n + other.n, points, self.size)
+
+    def to_dict(self) -> dict:
+        return {"n": self.n, "points": [_json_value(point) for point in self.points], "size": self.size}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileSketch":
+        return cls(**data)
+
+
+class HeavyHitters:
+    """Bounded counter of the most frequent values.
+
+    Merging sums counts and keeps the ``capacity`` largest; ``error`` accumulates
+    the largest count dropped so far, an upper bound on any count's underestimate.
+    """
+
+    def __init__(self, counts=None, capacity=64, error=0):
+        self.counts = [[value, count] for value, count in (counts or [])]
+        self.capacity = capacity
+        self.error = error
+
+    def merge(self, other: "HeavyHitters") -> "HeavyHitters":
+        combined = {}
+        for value, count in self.counts + other.counts:
+            combined[value] = combined.get(value, 0) + count
+        ranked = sorted(combined.items(), key=lambda item: item[1], reverse=True)
+        dropped = ranked[self.capacity:]
+        error = max(self.error, other.error) + (dropped[0][1] if dropped else 0)
+        return HeavyHitters(ranked[:self.capacity], self.capacity, error)
+
+    def top(self, top_n: int = 5) -> dict:
+        return {value: count for value, count in self.counts[:top_n]}
+
+    def to_dict(self) -> dict:
+        return {"counts": self.counts, "capacity": self.capacity, "error": self.error}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "HeavyHitters":
+        return cls(**data)
+
+
+class FieldSketch:
+    """Mergeable profiling state of one field."""
+
+    def __init__(self, data_type, rows=0, missing=0, values=None, lengths=None,
+                 quantiles=None, distinct=None, frequent=None, empty_count=0, whitespace_count=0):
+        self.data_type = data_type
+        self.rows = rows
+        self.missing = missing
+        self.values = values or MomentSketch()
+        self.lengths = lengths or MomentSketch()
+        self.quantiles = quantiles or QuantileSketch()
+        self.distinct = distinct or HyperLogLog()
+        self.frequent = frequent or HeavyHitters()
+        self.empty_count = empty_count
+        self.whitespace_count = whitespace_count
+
+    def merge(self, other: "FieldSketch") -> "FieldSketch":
+        return FieldSketch(
+            data_type=self.data_type,
+            rows=self.rows + other.rows,
+            missing=self.missing + other.missing,
+            values=self.values.merge(other.values),
+            lengths=self.lengths.merge(other.lengths),
+            quantiles=self.quantiles.merge(other.quantiles),
+            distinct=self.distinct.merge(other.distinct),
+            frequent=self.frequent.merge(other.frequent),
+            empty_count=self.empty_count + other.empty_count,
+            whitespace_count=self.whitespace_count + other.whitespace_count
+        )
+
+    def _numeric_statistics(self) -> dict:
+        values = self.values
+        if values.n == 0:
+            return {}
+        q1, q3 = self.quantiles.quantile(0.25), self.quantiles.quantile(0.75)
+        iqr = q3 - q1
+        rounded = lambda x: round(x, 2) if x is not None else None
+        return {
+            "min": round(values.min, 2),
+            "max": round(values.max, 2),
+            "mean": round(values.mean, 2),
+            "median": round(self.quantiles.quantile(0.5), 2),
+            "std": rounded(values.std),
+            "var": rounded(values.var),
+            "skew": rounded(values.skew),
+            "kurt": rounded(values.kurt),
+            "iqr": round(iqr, 2),
+            "cv": round(values.std / values.mean, 2) if values.std is not None and values.mean != 0 else 0,
+            "lower_bound": round(q1 - 1.5 * iqr, 2),
+            "upper_bound": round(q3 + 1.5 * iqr, 2)
+        }
+
+    def _string_statistics(self, most_frequent: dict, unique_values: int) -> dict:
+        lengths = self.lengths
+        return {
+            "mode": list(most_frequent.keys())[0] if most_frequent else "",
+            "avg_length": round(lengths.mean, 2) if lengths.n else 0,
+            "min_length": lengths.min if lengths.min else 0,
+            "max_length": lengths.max if lengths.max else 0,
+            "empty_count": self.empty_count,
+            "whitespace_count": self.whitespace_count,
+            "pattern_consistency": round(unique_values / self.rows, 2) if self.rows > 0 else 0
+        }
+
+    def to_profile(self, top_n: int = 5) -> dict:
+        """Render the sketch as a field profile entry, matching sql_field_profile's format."""
+        unique_values = min(self.distinct.estimate(), self.rows - self.missing)
+        most_frequent = self.frequent.top(top_n)
+        statistics = {}
+        accuracy = {
+            "unique_values": {"exact": False, "method": "hyperloglog", "error": self.distinct.relative_error},
+            "most_frequent": {"exact": self.frequent.error == 0, "method": "heavy_hitters", "error": self.frequent.error}
+        }
+        if self.data_type in ["integer", "float"]:
+            statistics = self._numeric_statistics()
+            for stat in ["median", "iqr", "lower_bound", "upper_bound"]:
+                accuracy[stat] = {"exact": False, "method": "quantile_sketch", "error": round(1 / self.quantiles.size, 4)}
+        elif self.data_type == "string":
+            statistics = self._string_statistics(most_frequent, unique_values)
+        return {
+            "data_type": self.data_type,
+            "missing_values": self.missing,
+            "missing_values_pct": round(self.missing / self.rows, 2) if self.rows > 0 else 0,
+            "unique_values": unique_values,
+            "unique_values_pct": round(unique_values / self.rows, 2) if self.rows > 0 else 0,
+            "most_frequent": most_frequent,
+            "statistics": statistics,
+            "accuracy": accuracy
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "data_type": self.data_type,
+            "rows": self.rows,
+            "missing": self.missing,
+            "values": self.values.to_dict(),
+            "lengths": self.lengths.to_dict(),
+            "quantiles": self.quantiles.to_dict(),
+            "distinct": self.distinct.to_dict(),
+            "frequent": self.frequent.to_dict(),
+            "empty_count": self.empty_count,
+            "whitespace_count": self.whitespace_count
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FieldSketch":
+        return cls(
+            data_type=data["data_type"],
+            rows=data["rows"],
+            missing=data["missing"],
+            values=MomentSketch.from_dict(data["values"]),
+            lengths=MomentSketch.from_dict(data["lengths"]),
+            quantiles=QuantileSketch.from_dict(data["quantiles"]),
+            distinct=HyperLogLog.from_dict(data["distinct"]),
+            frequent=HeavyHitters.from_dict(data["frequent"]),
+            empty_count=data["empty_count"],
+            whitespace_count=data["whitespace_count"]
+        )
@@ -1,3 +1,6 @@
+import math
+from .sketches import FieldSketch, HeavyHitters, HyperLogLog, MomentSketch, QuantileSketch, _json_value
+
 def _extract_data_type(column_type: str) -> str:
     """Convert SQL column type to simplified data type category."""
     column_type = column_type.upper()
@@ -9,38 +12,57 @@ def _extract_data_type(column_type: str) -> str:
         return "float"
     return "unknown"
 
-def sql_table_profile(conn, table_name: str) -> dict:
-    """Generate dataset-level data quality profile using SQL."""
-    # Get table dimensions
-    rows = conn.execute(f"SELECT COUNT(1) FROM {table_name}").fetchone()[0]
-    
-    # Get column count
-    columns = len(conn.execute(f"DESCRIBE {table_name}").fetchall())
-    
-    # Get column names for duplicate detection
+PROFILE_MODES = ["exact", "approx"]
+
+# DuckDB's HyperLogLog keeps 64 registers: relative standard error 1.04 / sqrt(m)
+HLL_RELATIVE_ERROR = round(1.04 / math.sqrt(64), 3)
+# approx_quantile is a t-digest (compression 100): roughly 1% rank error
+TDIGEST_RANK_ERROR = 0.01
+# z-score used for the reported confidence intervals of sampled estimates
+CONFIDENCE_Z = 1.96
+
+def _quote_identifier(name: str) -> str:
+    """Quote a column name so it can be used safely in generated SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _path_literal(source) -> str:
+    """Render a file path, glob or list of paths as a DuckDB string / list literal."""
+    if isinstance(source, (list, tuple)):
+        return "[" + ", ".join(_path_literal(path) for path in source) + "]"
+    return "'" + str(source).replace("'", "''") + "'"
+
+def sql_table_profile(conn, table_name: str, max_evidences: int = 10, collect_evidences: bool = True) -> dict:
+    """Generate dataset-level data quality profile using SQL.
+
+    Rows and duplicates come from a single scan that groups rows by a 64-bit
+    row-hash fingerprint. When duplicates exist and ``collect_evidences`` is set,
+    a second scan fetches one example row for each of the ``max_evidences``
+    largest duplicate groups (ordered by ``dup_count``).
+    """
     col_names = [col[0] for col in conn.execute(f"DESCRIBE {table_name}").fetchall()]
-    col_list = ", ".join(col_names)
+    columns = len(col_names)
+    fingerprint = f"hash({', '.join(_quote_identifier(col) for col in col_names)})"
+    top_k = max(max_evidences, 1) if collect_evidences else 1
     
-    # Count duplicates using all columns
-    dup_count_sql = f"""
-    SELECT COUNT(*) - COUNT(DISTINCT ({col_list})) as duplicates
-    FROM {table_name}
+    # Count rows and duplicates from fingerprint groups, keeping the largest duplicate groups
+    dup_sql = f"""
+    SELECT
+        COALESCE(SUM(dup_count), 0) AS rows,
+        COALESCE(SUM(dup_count), 0) - COUNT(1) AS duplicates,
+        MAX_BY({{'fingerprint': fingerprint, 'dup_count': dup_count}}, dup_count, {top_k}) FILTER (WHERE dup_count > 1) AS top_groups
+    FROM (
+        SELECT {fingerprint} AS fingerprint, COUNT(1) AS dup_count
+        FROM {table_name}
+        GROUP BY fingerprint
+    )
     """
-    duplicates = conn.execute(dup_count_sql).fetchone()[0]
+    rows, duplicates, top_groups = conn.execute(dup_sql).fetchone()
     
-    # Get duplicate evidences
+    # Get a bounded sample of duplicate evidences
     evidences = {}
-    if duplicates > 0:
-        dup_rows_sql = f"""
-        SELECT {col_list}, COUNT(*) as dup_count
-        FROM {table_name}
-        GROUP BY {col_list}
-        HAVING COUNT(*) > 1
-        """
-        dup_rows = conn.execute(dup_rows_sql).fetchall()
-        
-        for i, row in enumerate(dup_rows):
-            evidences[i] = dict(zip(col_names + ['dup_count'], row))
+    if duplicates > 0 and collect_evidences and max_evidences > 0:
+        dup_counts = {group['fingerprint']: group['dup_count'] for group in top_groups}
+        evidences = sql_duplicate_evidences(conn, table_name, dup_counts, col_names)
     
     return {
         "rows": rows,
@@ -49,114 +71,454 @@ def sql_table_profile(conn, table_name: str) -> dict:
         "evidences": evidences
     }
 
-def sql_field_profile(conn, table_name: str, top_n: int = 5) -> dict:
-    """Generate comprehensive data quality profile for each field using SQL."""
+def sql_duplicate_evidences(conn, table_name: str, dup_counts: dict, col_names: list = None) -> dict:
+    """Fetch one example row per duplicate group, given ``{fingerprint: dup_count}``.
+
+    Fingerprints are the row hashes used by sql_table_profile; evidences are
+    ordered by ``dup_count``, largest first, and carry it as an extra key.
+    """
+    if not dup_counts:
+        return {}
+    if col_names is None:
+        col_names = [col[0] for col in conn.execute(f"DESCRIBE {table_name}").fetchall()]
+    fingerprint = f"hash({', '.join(_quote_identifier(col) for col in col_names)})"
+    fingerprints = ", ".join(str(fp) for fp in dup_counts)
+    dup_rows_sql = f"""
+    SELECT {fingerprint} AS fingerprint, {", ".join(_quote_identifier(col) for col in col_names)}
+    FROM {table_name}
+    WHERE {fingerprint} IN ({fingerprints})
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY fingerprint) = 1
+    """
+    dup_rows = sorted(conn.execute(dup_rows_sql).fetchall(), key=lambda row: dup_counts[row[0]], reverse=True)
+    
+    evidences = {}
+    for i, row in enumerate(dup_rows):
+        evidences[i] = dict(zip(col_names + ['dup_count'], list(row[1:]) + [dup_counts[row[0]]]))
+    return evidences
+
+def _column_batches(columns: list, batch_size: int):
+    """Split (name, type) pairs into consecutive batches for fused queries."""
+    batch_size = max(1, batch_size)
+    for start in range(0, len(columns), batch_size):
+        yield list(enumerate(columns[start:start + batch_size], start=start))
+
+def _aggregate_expressions(index: int, col_name: str, col_type: str, mode: str = "exact", top_n: int = 5, known: tuple = ()) -> list:
+    """Build the aggregate expressions profiling a single column, skipping metrics already ``known``."""
+    col = _quote_identifier(col_name)
+    if mode == "approx":
+        unique_expr = f"APPROX_COUNT_DISTINCT({col})"
+        quantile = lambda q: f"APPROX_QUANTILE({col}, {q})"
+    else:
+        unique_expr = f"COUNT(DISTINCT {col})"
+        quantile = lambda q: f"PERCENTILE_CONT({q}) WITHIN GROUP (ORDER BY {col})"
+    expressions = [] if "missing" in known else [f"COUNT(1) - COUNT({col}) AS c{index}_missing"]
+    expressions.append(f"{unique_expr} AS c{index}_unique")
+    if mode == "approx":
+        expressions.append(f"APPROX_TOP_K({col}, {top_n}) AS c{index}_top")
+    if col_type in ["integer", "float"]:
+        expressions += [] if "min" in known else [f"MIN({col}) AS c{index}_min"]
+        expressions += [] if "max" in known else [f"MAX({col}) AS c{index}_max"]
+        expressions += [
+            f"AVG({col}) AS c{index}_mean",
+            f"{quantile(0.5)} AS c{index}_median",
+            f"STDDEV({col}) AS c{index}_std",
+            f"VARIANCE({col}) AS c{index}_var",
+            f"SKEWNESS({col}) AS c{index}_skew",
+            f"KURTOSIS({col}) AS c{index}_kurt",
+            f"{quantile(0.25)} AS c{index}_q1",
+            f"{quantile(0.75)} AS c{index}_q3"
+        ]
+    elif col_type == "string":
+        expressions += [
+            f"AVG(LENGTH({col})) AS c{index}_avg_length",
+            f"MIN(LENGTH({col})) AS c{index}_min_length",
+            f"MAX(LENGTH({col})) AS c{index}_max_length",
+            f"SUM(CASE WHEN {col} = '' THEN 1 ELSE 0 END) AS c{index}_empty_count",
+            f"SUM(CASE WHEN TRIM({col}) = '' AND {col} != '' THEN 1 ELSE 0 END) AS c{index}_whitespace_count"
+        ]
+    return expressions
+
+def _fused_aggregate_sql(table_name: str, batch: list, mode: str = "exact", top_n: int = 5, known: dict = None) -> str:
+    """Build one aggregate query computing every metric for a batch of columns."""
+    expressions = ["COUNT(1) AS total_rows"]
+    for index, (col_name, col_type) in batch:
+        expressions += _aggregate_expressions(index, col_name, col_type, mode, top_n, tuple((known or {}).get(col_name, {})))
+    select_list = ",\n        ".join(expressions)
+    return f"""
+    SELECT
+        {select_list}
+    FROM {table_name}
+    """
+
+def _fused_frequency_sql(table_name: str, batch: list, top_n: int) -> str:
+    """Build one GROUPING SETS query returning the top-n values of every column in a batch."""
+    cols = [_quote_identifier(col_name) for _, (col_name, _) in batch]
+    set_id = " ".join(f"WHEN GROUPING({col}) = 0 THEN {position}" for position, col in enumerate(cols))
+    not_null = " ".join(f"WHEN GROUPING({col}) = 0 THEN {col} IS NOT NULL" for col in cols)
+    grouping_sets = ", ".join(f"({col})" for col in cols)
+    return f"""
+    SELECT CASE {set_id} END AS grouping_set, {", ".join(cols)}, COUNT(1) AS frequency
+    FROM {table_name}
+    GROUP BY GROUPING SETS ({grouping_sets})
+    HAVING CASE {not_null} END
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY grouping_set ORDER BY COUNT(1) DESC) <= {top_n}
+    """
+
+def _candidate_frequency_sql(table_name: str, batch: list, metrics: dict):
+    """Build one query counting the approximate top-k candidates of every column in a batch."""
+    expressions, params, slots = [], [], []
+    for position, (index, (col_name, _)) in enumerate(batch):
+        col = _quote_identifier(col_name)
+        for value in metrics[f"c{index}_top"] or []:
+            if value is None:
+                continue
+            expressions.append(f"COUNT(1) FILTER (WHERE {col} = ?)")
+            params.append(value)
+            slots.append((position, value))
+    if not expressions:
+        return None, params, slots
+    return f"SELECT {', '.join(expressions)} FROM {table_name}", params, slots
+
+def _sample_source(table_name: str, sample_pct: float, seed: int = 42) -> str:
+    """Wrap a table in a repeatable Bernoulli sample."""
+    return f"(SELECT * FROM {table_name} USING SAMPLE {sample_pct} PERCENT (bernoulli, {seed})) AS sampled"
+
+def parquet_footer_stats(conn, source: str, column_types: dict) -> dict:
+    """Read row count, null counts and numeric min/max from parquet footers without touching data pages.
+
+    Args:
+        conn: DuckDB connection
+        source: Parquet path, glob or list of paths (local or s3://)
+        column_types: Simplified data type per top-level column, as from _extract_data_type
+
+    Returns:
+        dict: {"rows": int, "fields": {column: {"missing": int, "min": value, "max": value}}}.
+        A statistic is only included when every row group carries it.
+    """
+    rows = conn.execute(f"SELECT SUM(num_rows) FROM parquet_file_metadata({_path_literal(source)})").fetchone()[0]
+    stats_sql = f"""
+    SELECT path_in_schema, row_group_num_rows, stats_null_count, stats_min_value, stats_max_value, min_is_exact, max_is_exact
+    FROM parquet_metadata({_path_literal(source)})
+    """
+    per_column = {}
+    for path, *row_group in conn.execute(stats_sql).fetchall():
+        per_column.setdefault(path, []).append(row_group)
+    
+    fields = {}
+    for col_name, col_type in column_types.items():
+        row_groups = per_column.get(col_name)
+        if not row_groups or sum(rg[0] for rg in row_groups) != rows:
+            # Column missing from some files (e.g. read with union_by_name): footers do not cover every row
+            continue
+        stats = {}
+        if all(null_count is not None for _, null_count, *_ in row_groups):
+            stats["missing"] = sum(null_count for _, null_count, *_ in row_groups)
+        if col_type in ["integer", "float"]:
+            cast = int if col_type == "integer" else float
+            # All-null row groups carry no min/max; any other gap disables the fast path for this column
+            valued = [rg for rg in row_groups if rg[1] is None or rg[1] < rg[0]]
+            if all(rg[2] is not None and rg[3] is not None and rg[4] is not False and rg[5] is not False for rg in valued):
+                stats["min"] = min((cast(rg[2]) for rg in valued), default=None)
+                stats["max"] = max((cast(rg[3]) for rg in valued), default=None)
+        fields[col_name] = stats
+    return {"rows": rows, "fields": fields}
+
+def _fetch_named_row(conn, sql: str) -> dict:
+    """Execute a single-row query and return it keyed by column alias."""
+    cursor = conn.execute(sql)
+    row = cursor.fetchone()
+    return dict(zip([desc[0] for desc in cursor.description], row))
+
+def _numeric_statistics(metrics: dict, index: int) -> dict:
+    """Derive numeric statistics from fused aggregate results."""
+    prefix = f"c{index}_"
+    if metrics[prefix + "min"] is None:
+        return {}
+    q1, q3 = metrics[prefix + "q1"], metrics[prefix + "q3"]
+    mean, std = metrics[prefix + "mean"], metrics[prefix + "std"]
+    iqr = q3 - q1
+    cv = std / mean if std is not None and mean != 0 else 0  # std / mean
+    # Dispersion and shape are NULL for too few rows or constant columns
+    rounded = lambda x: round(x, 2) if x is not None else None
+    return {
+        "min": round(metrics[prefix + "min"], 2),
+        "max": round(metrics[prefix + "max"], 2),
+        "mean": round(mean, 2),
+        "median": round(metrics[prefix + "median"], 2),
+        "std": rounded(std),
+        "var": rounded(metrics[prefix + "var"]),
+        "skew": rounded(metrics[prefix + "skew"]),
+        "kurt": rounded(metrics[prefix + "kurt"]),
+        "iqr": round(iqr, 2),
+        "cv": round(cv, 2),
+        "lower_bound": round(q1 - 1.5 * iqr, 2),
+        "upper_bound": round(q3 + 1.5 * iqr, 2)
+    }
+
+def _string_statistics(metrics: dict, index: int, most_frequent: dict, total_rows: int) -> dict:
+    """Derive string statistics from fused aggregate results."""
+    prefix = f"c{index}_"
+    mode_val = list(most_frequent.keys())[0] if most_frequent else ""
+    pattern_consistency = metrics[prefix + "unique"] / total_rows if total_rows > 0 else 0
+    return {
+        "mode": mode_val,
+        "avg_length": round(metrics[prefix + "avg_length"], 2) if metrics[prefix + "avg_length"] else 0,
+        "min_length": metrics[prefix + "min_length"] if metrics[prefix + "min_length"] else 0,
+        "max_length": metrics[prefix + "max_length"] if metrics[prefix + "max_length"] else 0,
+        "empty_count": metrics[prefix + "empty_count"] if metrics[prefix + "empty_count"] else 0,
+        "whitespace_count": metrics[prefix + "whitespace_count"] if metrics[prefix + "whitespace_count"] else 0,
+        "pattern_consistency": round(pattern_consistency, 2)
+    }
+
+def _approx_accuracy(metrics: dict, index: int, col_type: str, sampled_rows: int = None) -> dict:
+    """Describe which statistics of an approximate profile are estimates and how far off they can be."""
+    prefix = f"c{index}_"
+    accuracy = {
+        "unique_values": {"exact": False, "method": "hyperloglog", "error": HLL_RELATIVE_ERROR},
+        "most_frequent": {"exact": False, "method": "approx_top_k", "error": None}
+    }
+    if col_type in ["integer", "float"]:
+        for stat in ["median", "iqr", "lower_bound", "upper_bound"]:
+            accuracy[stat] = {"exact": False, "method": "t-digest", "error": TDIGEST_RANK_ERROR}
+    
+    if sampled_rows is not None:
+        # Sample estimates: unique counts are lower bounds, proportions and means get a 95% CI half-width
+        accuracy["unique_values"] = {"exact": False, "method": "hyperloglog on sample (lower bound)", "error": None}
+        missing_pct = metrics[prefix + "missing"] / sampled_rows if sampled_rows > 0 else 0
+        accuracy["missing_values"] = {
+            "exact": False,
+            "method": "sample",
+            "error": round(CONFIDENCE_Z * math.sqrt(missing_pct * (1 - missing_pct) / sampled_rows), 4) if sampled_rows > 0 else None
+        }
+        non_null = sampled_rows - metrics[prefix + "missing"]
+        if col_type in ["integer", "float"] and non_null > 0 and metrics[prefix + "std"] is not None:
+            accuracy["mean"] = {"exact": False, "method": "sample", "error": round(CONFIDENCE_Z * metrics[prefix + "std"] / math.sqrt(non_null), 4)}
+        for stat in ["min", "max", "std", "var", "skew", "kurt", "cv", "empty_count", "whitespace_count", "min_length", "max_length", "avg_length"]:
+            accuracy.setdefault(stat, {"exact": False, "method": "sample", "error": None})
+    return accuracy
+
+def sql_field_profile(conn, table_name: str, top_n: int = 5, batch_size: int = 50, mode: str = "exact", sample_pct: float = None, columns: list = None, footer: dict = None) -> dict:
+    """Generate comprehensive data quality profile for each field using SQL.
+
+    Columns are profiled in batches of ``batch_size``: each batch costs one fused
+    aggregate scan plus one scan for the most frequent values, instead of several
+    scans per column.
+
+    ``mode="approx"`` swaps exact distinct counts, quantiles and top-n for
+    HyperLogLog, t-digest and approximate top-k, and ``sample_pct`` additionally
+    profiles a Bernoulli sample of the table. Approximate profiles carry an
+    ``accuracy`` entry per field describing each estimated statistic and its
+    error bound.
+
+    ``columns`` restricts profiling to a subset of fields (kept in schema order),
+    which lets callers split a wide table into independent units of work.
+
+    ``footer`` takes ``parquet_footer_stats`` output for a parquet-backed table:
+    row count, null counts and numeric min/max are then read from it and dropped
+    from the scans.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unsupported profile mode: {mode}. Use one of {PROFILE_MODES}")
+    if sample_pct is not None and mode != "approx":
+        raise ValueError("sample_pct is only supported with mode='approx'")
+    
     # Get schema
     schema = conn.execute(f"DESCRIBE {table_name}").fetchall()
-    total_rows = conn.execute(f"SELECT COUNT(1) FROM {table_name}").fetchone()[0]
+    if columns is not None:
+        selected = set(columns)
+        schema = [col_info for col_info in schema if col_info[0] in selected]
+    columns = [(col_info[0], _extract_data_type(col_info[1])) for col_info in schema]
+    
+    footer_fields = {}
+    if footer is not None:
+        # Footer null counts describe the whole table, so they cannot stand in for sample counts
+        footer_fields = {
+            col_name: {stat: value for stat, value in stats.items() if sample_pct is None or stat != "missing"}
+            for col_name, stats in footer["fields"].items()
+        }
+    
+    source = table_name
+    table_rows = None
+    if sample_pct is not None:
+        source = _sample_source(table_name, sample_pct)
+        table_rows = footer["rows"] if footer is not None else conn.execute(f"SELECT COUNT(1) FROM {table_name}").fetchone()[0]
     
     results = {}
     
-    for col_info in schema:
-        col_name = col_info[0]
-        col_type = _extract_data_type(col_info[1])
-        
-        # Basic metrics for all columns
-        basic_sql = f"""
-        SELECT 
-            COUNT(1) - COUNT({col_name}) as missing_values,
-            COUNT(DISTINCT {col_name}) as unique_values
-        FROM {table_name}
-        """
-        basic_metrics = conn.execute(basic_sql).fetchone()
+    for batch in _column_batches(columns, batch_size):
+        metrics = _fetch_named_row(conn, _fused_aggregate_sql(source, batch, mode, top_n, footer_fields))
+        for index, (col_name, _) in batch:
+            for stat, value in footer_fields.get(col_name, {}).items():
+                metrics[f"c{index}_{stat}"] = value
+        sampled_rows = metrics["total_rows"] if sample_pct is not None else None
+        total_rows = table_rows if sample_pct is not None else metrics["total_rows"]
+        scale = total_rows / sampled_rows if sampled_rows else 1
         
-        # Most frequent values
-        freq_sql = f"""
-        SELECT {col_name} as value, COUNT(1) as frequency
-        FROM {table_name} 
-        WHERE {col_name} IS NOT NULL
-        GROUP BY {col_name}
-        ORDER BY COUNT(1) DESC
-        LIMIT {top_n}
-        """
-        freq_data = conn.execute(freq_sql).fetchall()
-        most_frequent = {row[0]: row[1] for row in freq_data}
-        
-        # Type-specific statistics
-        statistics = {}
-        if col_type in ["integer", "float"]:
-            stats_sql = f"""
-            SELECT 
-                MIN({col_name}) as min_val,
-                MAX({col_name}) as max_val,
-                AVG({col_name}) as mean_val,
-                PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY {col_name}) as median_val,
-                STDDEV({col_name}) as std_val,
-                VARIANCE({col_name}) as var_val,
-                SKEWNESS({col_name}) as skew_val,
-                KURTOSIS({col_name}) as kurt_val,
-                PERCENTILE_CONT(0.25) WITHIN GROUP (ORDER BY {col_name}) as q1,
-                PERCENTILE_CONT(0.75) WITHIN GROUP (ORDER BY {col_name}) as q3
-            FROM {table_name}
-            WHERE {col_name} IS NOT NULL
-            """
-            stats = conn.execute(stats_sql).fetchone()
-            if stats and stats[0] is not None:
-                iqr = stats[9] - stats[8]  # q3 - q1
-                cv = stats[4] / stats[2] if stats[2] != 0 else 0  # std / mean
-                statistics = {
-                    "min": round(stats[0], 2),
-                    "max": round(stats[1], 2),
-                    "mean": round(stats[2], 2),
-                    "median": round(stats[3], 2),
-                    "std": round(stats[4], 2),
-                    "var": round(stats[5], 2),
-                    "skew": round(stats[6], 2),
-                    "kurt": round(stats[7], 2),
-                    "iqr": round(iqr, 2),
-                    "cv": round(cv, 2),
-                    "lower_bound": round(stats[8] - 1.5 * iqr, 2),
-                    "upper_bound": round(stats[9] + 1.5 * iqr, 2)
-                }
+        # Most frequent values, grouped by the position of the column within the batch
+        frequencies = {}
+        if mode == "approx":
+            freq_sql, params, slots = _candidate_frequency_sql(source, batch, metrics)
+            counts = conn.execute(freq_sql, params).fetchone() if freq_sql else []
+            freq_rows = [(position, value, round(count * scale)) for (position, value), count in zip(slots, counts) if count > 0]
+            for position, value, frequency in sorted(freq_rows, key=lambda r: r[-1], reverse=True):
+                frequencies.setdefault(position, {})[value] = frequency
+        else:
+            freq_rows = conn.execute(_fused_frequency_sql(source, batch, top_n)).fetchall()
+            for row in sorted(freq_rows, key=lambda r: r[-1], reverse=True):
+                position = row[0]
+                frequencies.setdefault(position, {})[row[1 + position]] = row[-1]
         
-        elif col_type == "string":
-            string_sql = f"""
-            SELECT 
-                AVG(LENGTH({col_name})) as avg_length,
-                MIN(LENGTH({col_name})) as min_length,
-                MAX(LENGTH({col_name})) as max_length,
-                SUM(CASE WHEN {col_name} = '' THEN 1 ELSE 0 END) as empty_count,
-                SUM(CASE WHEN TRIM({col_name}) = '' AND {col_name} != '' THEN 1 ELSE 0 END) as whitespace_count
-            FROM {table_name}
-            WHERE {col_name} IS NOT NULL
-            """
-            string_stats = conn.execute(string_sql).fetchone()
+        for position, (index, (col_name, col_type)) in enumerate(batch):
+            most_frequent = frequencies.get(position, {})
+            missing_values = round(metrics[f"c{index}_missing"] * scale)
+            unique_values = metrics[f"c{index}_unique"]
             
-            # Get mode (most frequent value)
-            mode_val = list(most_frequent.keys())[0] if most_frequent else ""
+            # Type-specific statistics
+            statistics = {}
+            if col_type in ["integer", "float"]:
+                statistics = _numeric_statistics(metrics, index)
+            elif col_type == "string":
+                statistics = _string_statistics(metrics, index, most_frequent, total_rows)
+                if sampled_rows:
+                    statistics["empty_count"] = round(statistics["empty_count"] * scale)
+                    statistics["whitespace_count"] = round(statistics["whitespace_count"] * scale)
             
-            if string_stats:
-                pattern_consistency = basic_metrics[1] / total_rows if total_rows > 0 else 0
-                statistics = {
-                    "mode": mode_val,
-                    "avg_length": round(string_stats[0], 2) if string_stats[0] else 0,
-                    "min_length": string_stats[1] if string_stats[1] else 0,
-                    "max_length": string_stats[2] if string_stats[2] else 0,
-                    "empty_count": string_stats[3] if string_stats[3] else 0,
-                    "whitespace_count": string_stats[4] if string_stats[4] else 0,
-                    "pattern_consistency": round(pattern_consistency, 2)
-                }
+            # Compile results
+            results[col_name] = {
+                "data_type": col_type,
+                "missing_values": missing_values,
+                "missing_values_pct": round(missing_values / total_rows, 2) if total_rows > 0 else 0,
+                "unique_values": unique_values,
+                "unique_values_pct": round(unique_values / total_rows, 2) if total_rows > 0 else 0,
+                "most_frequent": most_frequent,
+                "statistics": statistics
+            }
+            if mode == "approx":
+                accuracy = _approx_accuracy(metrics, index, col_type, sampled_rows)
+                for stat in footer_fields.get(col_name, {}):
+                    accuracy.pop(stat, None)
+                results[col_name]["accuracy"] = accuracy
+    
+    return results
+
+def _moment_expressions(index: int, name: str, expr: str) -> list:
+    """Build count/min/max/central-moment aggregates for an expression, centred on its CTE mean."""
+    mu = f"means.c{index}_{name}_mu"
+    return [
+        f"COUNT({expr}) AS c{index}_{name}_n",
+        f"MIN({expr}) AS c{index}_{name}_min",
+        f"MAX({expr}) AS c{index}_{name}_max",
+        f"AVG({expr}) AS c{index}_{name}_mean",
+        f"COALESCE(SUM(POWER({expr} - {mu}, 2)), 0) AS c{index}_{name}_m2",
+        f"COALESCE(SUM(POWER({expr} - {mu}, 3)), 0) AS c{index}_{name}_m3",
+        f"COALESCE(SUM(POWER({expr} - {mu}, 4)), 0) AS c{index}_{name}_m4"
+    ]
+
+def _sketch_aggregate_sql(table_name: str, batch: list, quantile_size: int) -> str:
+    """Build one query computing counts, moments and quantile points for a batch of columns."""
+    means, expressions = [], ["COUNT(1) AS total_rows"]
+    probabilities = ", ".join(str(q) for q in QuantileSketch.probabilities(quantile_size))
+    for index, (col_name, col_type) in batch:
+        col = _quote_identifier(col_name)
+        expressions.append(f"COUNT({col}) AS c{index}_count")
+        if col_type in ["integer", "float"]:
+            means.append(f"AVG({col}) AS c{index}_values_mu")
+            expressions += _moment_expressions(index, "values", col)
+            expressions.append(f"QUANTILE_CONT({col}, [{probabilities}]) AS c{index}_points")
+        elif col_type == "string":
+            means.append(f"AVG(LENGTH({col})) AS c{index}_lengths_mu")
+            expressions += _moment_expressions(index, "lengths", f"LENGTH({col})")
+            expressions += [
+                f"SUM(CASE WHEN {col} = '' THEN 1 ELSE 0 END) AS c{index}_empty_count",
+                f"SUM(CASE WHEN TRIM({col}) = '' AND {col} != '' THEN 1 ELSE 0 END) AS c{index}_whitespace_count"
+            ]
+    means_cte = ", ".join(means) if means else "1 AS placeholder"
+    select_list = ",\n        ".join(expressions)
+    return f"""
+    WITH means AS (SELECT {means_cte} FROM {table_name})
+    SELECT
+        {select_list}
+    FROM {table_name}, means
+    """
+
+def _hll_register_sql(table_name: str, batch: list, precision: int) -> str:
+    """Build one UNPIVOT query computing HyperLogLog registers for every column in a batch."""
+    shift = 64 - precision
+    mask = (1 << shift) - 1
+    casts = ", ".join(f"CAST({_quote_identifier(col_name)} AS VARCHAR) AS \"{index}\"" for index, (col_name, _) in batch)
+    names = ", ".join(f"\"{index}\"" for index, _ in batch)
+    return f"""
+    SELECT column_index, bucket, MAX(rank) AS rank
+    FROM (
+        SELECT column_index,
+            hash(value) >> {shift} AS bucket,
+            CASE WHEN hash(value) & {mask} = 0 THEN {shift + 1}
+                 ELSE {shift} - FLOOR(LOG2(hash(value) & {mask}))::INTEGER END AS rank
+        FROM (SELECT {casts} FROM {table_name}) UNPIVOT (value FOR column_index IN ({names}))
+    )
+    GROUP BY column_index, bucket
+    """
+
+def _moment_sketch(metrics: dict, index: int, name: str) -> MomentSketch:
+    """Read a MomentSketch out of fused sketch aggregate results."""
+    prefix = f"c{index}_{name}_"
+    if not metrics[prefix + "n"]:
+        return MomentSketch()
+    return MomentSketch(
+        n=metrics[prefix + "n"],
+        mean=float(metrics[prefix + "mean"]),
+        m2=float(metrics[prefix + "m2"]),
+        m3=float(metrics[prefix + "m3"]),
+        m4=float(metrics[prefix + "m4"]),
+        min=metrics[prefix + "min"],
+        max=metrics[prefix + "max"]
+    )
+
+def sql_field_sketches(conn, table_name: str, batch_size: int = 50, columns: list = None,
+                       precision: int = 10, quantile_size: int = 100, capacity: int = 64) -> dict:
+    """Build mergeable per-field profiling state (see ``sketches.FieldSketch``) using SQL.
+
+    Each column batch costs four scans: column means, a fused moments/quantiles
+    aggregate, a GROUPING SETS top-``capacity`` query and an UNPIVOT query for
+    HyperLogLog registers. Returns ``{field_name: FieldSketch.to_dict()}``.
+    """
+    schema = conn.execute(f"DESCRIBE {table_name}").fetchall()
+    if columns is not None:
+        selected = set(columns)
+        schema = [col_info for col_info in schema if col_info[0] in selected]
+    columns = [(col_info[0], _extract_data_type(col_info[1])) for col_info in schema]
+    
+    results = {}
+    
+    for batch in _column_batches(columns, batch_size):
+        metrics = _fetch_named_row(conn, _sketch_aggregate_sql(table_name, batch, quantile_size))
+        total_rows = metrics["total_rows"]
         
-        # Compile results
-        results[col_name] = {
-            "data_type": col_type,
-            # "data_types": col_type,
-            "missing_values": basic_metrics[0],
-            "missing_values_pct": round(basic_metrics[0] / total_rows, 2) if total_rows > 0 else 0,
-            "unique_values": basic_metrics[1],
-            "unique_values_pct": round(basic_metrics[1] / total_rows, 2) if total_rows > 0 else 0,
-            "most_frequent": most_frequent,
-            "statistics": statistics
-        }
+        frequencies = {}
+        freq_rows = conn.execute(_fused_frequency_sql(table_name, batch, capacity)).fetchall()
+        for row in sorted(freq_rows, key=lambda r: r[-1], reverse=True):
+            position = row[0]
+            frequencies.setdefault(position, []).append([_json_value(row[1 + position]), row[-1]])
+        
+        registers = {}
+        for column_index, bucket, rank in conn.execute(_hll_register_sql(table_name, batch, precision)).fetchall():
+            registers.setdefault(int(column_index), [0] * (1 << precision))[bucket] = rank
+        
+        for position, (index, (col_name, col_type)) in enumerate(batch):
+            sketch = FieldSketch(
+                data_type=col_type,
+                rows=total_rows,
+                missing=total_rows - metrics[f"c{index}_count"],
+                distinct=HyperLogLog(precision, registers.get(index)),
+                frequent=HeavyHitters(frequencies.get(position, []), capacity)
+            )
+            if col_type in ["integer", "float"]:
+                sketch.values = _moment_sketch(metrics, index, "values")
+                sketch.quantiles = QuantileSketch(sketch.values.n, metrics[f"c{index}_points"] or [], quantile_size)
+            elif col_type == "string":
+                sketch.lengths = _moment_sketch(metrics, index, "lengths")
+                sketch.empty_count = metrics[f"c{index}_empty_count"] or 0
+                sketch.whitespace_count = metrics[f"c{index}_whitespace_count"] or 0
+            results[col_name] = sketch.to_dict()
     
-    return results
\ No newline at end of file
+    return results
@@ -0,0 +1,203 @@
+"""Chunked, out-of-core profiling of pandas and Arrow inputs.
+
+Each chunk is folded into the mergeable sketches from ``sketches`` (moments,
+HyperLogLog, quantile summary, heavy hitters, string lengths) plus a bounded set
+of row hashes for duplicate detection, so inputs larger than memory can be
+profiled one chunk at a time, e.g. ``pd.read_csv(path, chunksize=100_000)`` or
+a pyarrow ``RecordBatchReader``.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Iterable
+from .field_profile import _extract_data_type, _native, _numeric_values, _value_counts
+from .sketches import FieldSketch, HeavyHitters, HyperLogLog, MomentSketch, QuantileSketch
+
+# 8 bytes per hash: the default keeps the duplicate set around 40 MB
+MAX_ROW_HASHES = 5_000_000
+
+
+def _to_frame(chunk) -> pd.DataFrame:
+    """Accept a DataFrame or a pyarrow RecordBatch/Table chunk."""
+    if isinstance(chunk, pd.DataFrame):
+        return chunk
+    if hasattr(chunk, "to_pandas"):
+        return chunk.to_pandas()
+    raise ValueError(f"Unsupported chunk type: {type(chunk).__name__}. Expected a DataFrame or Arrow batch")
+
+
+def _moment_sketch(values: np.ndarray, weights: np.ndarray = None) -> MomentSketch:
+    """Moment sketch of one chunk of float values, optionally weighted by occurrence counts."""
+    if len(values) == 0:
+        return MomentSketch()
+    if weights is None:
+        weights = np.ones(len(values))
+    n = weights.sum()
+    mean = (values * weights).sum() / n
+    deviations = values - mean
+    squared = deviations ** 2
+    return MomentSketch(
+        n=int(n), mean=float(mean),
+        m2=float((squared * weights).sum()), m3=float((squared * deviations * weights).sum()),
+        m4=float((squared ** 2 * weights).sum()),
+        min=_native(values.min()), max=_native(values.max())
+    )
+
+
+def _hll_registers(series: pd.Series, precision: int) -> HyperLogLog:
+    """HyperLogLog registers of one chunk, from 64-bit hashes of the non-null values."""
+    registers = np.zeros(1 << precision, dtype=np.int64)
+    values = series.dropna()
+    if len(values):
+        hashes = pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+        shift = 64 - precision
+        buckets = (hashes >> np.uint64(shift)).astype(np.int64)
+        remainder = hashes & np.uint64((1 << shift) - 1)
+        # Rank = position of the leftmost 1-bit in the remaining bits (shift + 1 if none)
+        _, exponent = np.frexp(remainder.astype(np.float64))
+        ranks = np.where(remainder == 0, shift + 1, shift - (exponent - 1)).astype(np.int64)
+        np.maximum.at(registers, buckets, ranks)
+    return HyperLogLog(precision, registers.tolist())
+
+
+def _heavy_hitters(counts: pd.Series, capacity: int) -> HeavyHitters:
+    """Top ``capacity`` values of one chunk; the largest dropped count is the error bound."""
+    kept = [[_native(value), int(count)] for value, count in counts.head(capacity).items()]
+    error = int(counts.iloc[capacity]) if len(counts) > capacity else 0
+    return HeavyHitters(kept, capacity, error)
+
+
+def series_sketch(series: pd.Series, data_type: str, precision: int = 10,
+                  quantile_size: int = 100, capacity: int = 64) -> FieldSketch:
+    """Build the mergeable FieldSketch of one column chunk."""
+    counts = _value_counts(series)
+    sketch = FieldSketch(
+        data_type=data_type,
+        rows=len(series),
+        missing=len(series) - int(counts.sum()),
+        distinct=_hll_registers(series, precision),
+        frequent=_heavy_hitters(counts, capacity)
+    )
+    if data_type in ["integer", "float"]:
+        values = _numeric_values(pd.to_numeric(series, errors="coerce"))
+        sketch.values = _moment_sketch(values)
+        points = np.quantile(values, QuantileSketch.probabilities(quantile_size)).tolist() if len(values) else []
+        sketch.quantiles = QuantileSketch(len(values), points, quantile_size)
+    elif data_type == "string":
+        # Measure each distinct string once, weighted by its count; non-strings have no length
+        distinct = pd.Series(counts.index.to_numpy(dtype=object), dtype=object)
+        is_text = distinct.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+        texts = distinct[is_text]
+        weights = counts.to_numpy(dtype="float64")[is_text]
+        lengths = texts.str.len().to_numpy(dtype="float64")
+        sketch.lengths = _moment_sketch(lengths, weights)
+        if sketch.lengths.n:
+            sketch.lengths.min, sketch.lengths.max = int(lengths.min()), int(lengths.max())
+        sketch.empty_count = int(weights[lengths == 0].sum())
+        sketch.whitespace_count = int(weights[texts.str.isspace().to_numpy(dtype=bool)].sum())
+    return sketch
+
+
+class DuplicateTracker:
+    """Duplicate row detection over chunks using a capped set of 64-bit row hashes.
+
+    Hashes are kept in a sorted NumPy array. Once ``max_hashes`` distinct rows
+    have been seen, new rows are only checked against the stored hashes, and the
+    duplicate count becomes a lower bound (``exact`` is False).
+    """
+
+    def __init__(self, max_hashes: int = MAX_ROW_HASHES, max_evidences: int = 10):
+        self.max_hashes = max_hashes
+        self.max_evidences = max_evidences
+        self.seen = np.empty(0, dtype=np.uint64)
+        self.duplicates = 0
+        self.evidences = {}
+        self.exact = True
+
+    def update(self, chunk: pd.DataFrame, offset: int):
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        repeated_in_chunk = pd.Series(hashes).duplicated().to_numpy()
+        if len(self.seen):
+            positions = np.searchsorted(self.seen, hashes).clip(max=len(self.seen) - 1)
+            repeated = repeated_in_chunk | (self.seen[positions] == hashes)
+        else:
+            repeated = repeated_in_chunk
+        self.duplicates += int(repeated.sum())
+
+        for row_number in np.flatnonzero(repeated)[:self.max_evidences - len(self.evidences)]:
+            self.evidences[offset + int(row_number)] = chunk.iloc[int(row_number)].to_dict()
+
+        new_hashes = np.unique(hashes[~repeated])
+        room = self.max_hashes - len(self.seen)
+        if len(new_hashes) > room:
+            self.exact = False
+            new_hashes = new_hashes[:max(room, 0)]
+        if len(new_hashes):
+            self.seen = np.union1d(self.seen, new_hashes)
+
+
+def stream_profile(chunks: Iterable, top_n: int = 5, max_hashes: int = MAX_ROW_HASHES,
+                   max_evidences: int = 10, precision: int = 10,
+                   quantile_size: int = 100, capacity: int = 1024) -> dict:
+    """Profile an iterable of DataFrame chunks or Arrow batches without loading it all.
+
+    Args:
+        chunks (Iterable): DataFrames (e.g. ``pd.read_csv(..., chunksize=...)``), pyarrow
+            RecordBatches, or a pyarrow Table / RecordBatchReader.
+        top_n (int, optional): Number of most frequent values to include. Defaults to 5.
+        max_hashes (int, optional): Cap on stored row hashes for duplicate detection.
+        max_evidences (int, optional): Maximum number of duplicate rows kept as evidence.
+        precision (int, optional): HyperLogLog precision (2**precision registers).
+        quantile_size (int, optional): Points kept by the quantile sketch.
+        capacity (int, optional): Values tracked by the heavy hitters sketch.
+
+    Returns:
+        dict: ``{"table": ..., "fields": ...}`` where ``table`` matches table_profile
+            (plus ``duplicates_exact``) and ``fields`` maps each field to a profile
+            entry in the sketch format, including ``accuracy``.
+    """
+    if hasattr(chunks, "to_batches"):
+        chunks = chunks.to_batches()
+
+    columns, data_types, sketches = None, {}, {}
+    tracker = DuplicateTracker(max_hashes=max_hashes, max_evidences=max_evidences)
+    rows = 0
+    for chunk in chunks:
+        chunk = _to_frame(chunk)
+        if columns is None:
+            columns = chunk.columns.tolist()
+            first_types = {col: _extract_data_type(str(chunk[col].dtype)) for col in columns}
+            data_types = dict.fromkeys(columns)
+        elif chunk.columns.tolist() != columns:
+            raise ValueError("All chunks must have the same columns")
+
+        tracker.update(chunk, offset=rows)
+        for col in columns:
+            data_type = _extract_data_type(str(chunk[col].dtype))
+            if chunk[col].notna().any():
+                if data_types[col] is None:
+                    data_types[col] = data_type
+                elif {data_type, data_types[col]} == {"integer", "float"}:
+                    # e.g. a CSV chunk where an integer column has missing values
+                    data_types[col] = "float"
+            # An all-null chunk says nothing about the type (CSV reads it as float) and only
+            # contributes row and missing counts, whatever type it is sketched as
+            sketch = series_sketch(chunk[col], data_types[col] or data_type, precision, quantile_size, capacity)
+            sketches[col] = sketches[col].merge(sketch) if col in sketches else sketch
+        rows += len(chunk)
+
+    if columns is None:
+        raise ValueError("No chunks to profile")
+
+    fields = {}
+    for col in columns:
+        sketches[col].data_type = data_types[col] or first_types[col]
+        fields[col] = sketches[col].to_profile(top_n=top_n)
+    table = {
+        "rows": rows,
+        "columns": len(columns),
+        "duplicates": tracker.duplicates,
+        "duplicates_exact": tracker.exact,
+        "evidences": tracker.evidences
+    }
+    return {"table": table, "fields": fields}
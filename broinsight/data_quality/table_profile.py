@@ -5,6 +5,8 @@ def table_profile(df: pd.DataFrame):
     
     Analyzes overall dataset characteristics including dimensions,
     duplicate detection, and provides evidence of data quality issues.
+    Rows are hashed once and duplicates are found on the hashes, so the
+    frame itself is only scanned a single time.
     
     Args:
         df (pd.DataFrame): DataFrame to profile.
@@ -18,9 +20,11 @@ def table_profile(df: pd.DataFrame):
                         for manual inspection and validation
     """
     rows, columns = df.shape
-    duplicated = df.duplicated()
-    duplicates = int(duplicated.sum())
-    evidences = df.loc[df.duplicated(keep=False),:].to_dict(orient="index")
+    row_hashes = pd.util.hash_pandas_object(df, index=False)
+    in_duplicate_group = row_hashes.duplicated(keep=False).to_numpy()
+    # Every duplicate group keeps one row as the original
+    duplicates = int(in_duplicate_group.sum()) - row_hashes[in_duplicate_group].nunique()
+    evidences = df.loc[in_duplicate_group,:].to_dict(orient="index")
     return {
         "rows": rows,
         "columns": columns,
@@ -0,0 +1,57 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from broinsight.experiment.streaming import TokenStream
+
+class AsyncModel:
+    """Awaitable adapter around any BaseLLM-compatible model (run(system_prompt, messages)).
+
+    ``run_async`` awaits the model's own ``run_async`` when it has one (e.g.
+    LocalOpenAI over an async HTTP client); otherwise the blocking ``run`` is
+    executed on a thread pool of ``max_concurrency`` threads dedicated to model
+    calls, so slow LLM responses never occupy the executor used for DuckDB.
+    Message builders and every other attribute are passed through to the model.
+
+    Usage:
+        model = AsyncModel(BedrockOpenAI(model_id, aws_configs), max_concurrency=64)
+        response = await model.run_async(system_prompt, [model.UserMessage(text="Hi")])
+    """
+
+    def __init__(self, model, max_concurrency: int = 64):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self._executor = None
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def run(self, system_prompt, messages):
+        return self.model.run(system_prompt=system_prompt, messages=messages)
+
+    async def run_async(self, system_prompt, messages):
+        native = getattr(self.model, "run_async", None)
+        if native is not None:
+            return await native(system_prompt=system_prompt, messages=messages)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), partial(self.model.run, system_prompt=system_prompt, messages=messages))
+
+    def stream(self, system_prompt, messages) -> TokenStream:
+        """Async iterator over the answer's chunks (see TokenStream), generated on the model-call threads"""
+        return TokenStream(self.model, system_prompt, messages, executor=self._pool())
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="broinsight-llm")
+        return self._executor
+
+    def close(self):
+        """Shut down the model-call threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+def as_async_model(model, max_concurrency: int = 64) -> AsyncModel:
+    """Wrap a model for the async flow, leaving an AsyncModel as is"""
+    return model if isinstance(model, AsyncModel) else AsyncModel(model, max_concurrency=max_concurrency)
@@ -73,4 +73,37 @@ class BedrockOpenAI:
         )
         response['processed'] = time.time() - start
         response = self.OutputMessage(response=response)
-        return response
\ No newline at end of file
+        return response
+
+    def run_stream(self, system_prompt, messages, on_token):
+        """Same as run over converse_stream, passing each text chunk to on_token as it arrives"""
+        start = time.time()
+        first_token = None
+        chunks = []
+        usage = {"inputTokens": 0, "outputTokens": 0}
+        model = self.get_model()
+        response = model.converse_stream(
+            modelId=self.model_id,
+            system=self.SystemMessage(system_prompt),
+            messages=messages,
+            inferenceConfig=dict(
+                temperature=self.temperature
+            )
+        )
+        for event in response['stream']:
+            if 'contentBlockDelta' in event:
+                chunk = event['contentBlockDelta']['delta'].get('text')
+                if chunk:
+                    if first_token is None:
+                        first_token = time.time() - start
+                    chunks.append(chunk)
+                    on_token(chunk)
+            elif 'metadata' in event:
+                usage = event['metadata'].get('usage', usage)
+        response = self.OutputMessage(response=dict(
+            output=dict(message=dict(content=[{"text": "".join(chunks)}])),
+            usage=usage,
+            processed=time.time() - start
+        ))
+        response['first_token'] = first_token
+        return response
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+from broinsight.experiment.streaming import run_streaming
+
+class CachedModel:
+    """Persistent response cache around any BaseLLM-compatible model (run(system_prompt, messages)).
+
+    Responses are keyed by a hash of the model id, temperature, system prompt and
+    messages, and stored in a SQLite file so they survive restarts and can be
+    shared by processes on one machine. Entries older than ``ttl_seconds`` are
+    ignored and purged; when the stored responses exceed ``max_bytes`` the least
+    recently used ones are deleted. A cache hit returns the stored response with
+    ``tokens`` input/output set to 0 (nothing was billed), the original counts in
+    ``cached_input``/``cached_output`` and ``cache_hit`` True, so the token totals
+    the actions keep on Shared only count real model calls.
+
+    Message builders and every other attribute are passed through to the model.
+
+    Usage:
+        model = CachedModel(BedrockOpenAI(model_id, aws_configs), ttl_seconds=24 * 3600)
+        insight = BroInsight(model=model)
+    """
+
+    def __init__(self, model, path: str = "~/.cache/broinsight/llm_cache.db", ttl_seconds: Optional[float] = 7 * 24 * 3600,
+                 max_bytes: int = 256 * 1024**2):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        if ttl_seconds is not None and ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive (None keeps entries until evicted)")
+        self.model = model
+        self.path = os.path.abspath(os.path.expanduser(path))
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    nbytes INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+
+    def __getattr__(self, name):
+        if name == "model":
+            raise AttributeError(name)
+        if name == "run_async":
+            # Only offer run_async when the model has one, so AsyncModel falls back to its threads otherwise
+            if hasattr(self.model, "run_async"):
+                return self._run_async
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def _model_identity(self) -> str:
+        """Identity of the wrapped model, part of the cache key"""
+        for attribute in ("model_id", "model_name"):
+            value = getattr(self.model, attribute, None)
+            if value is not None:
+                return str(value)
+        return self.model.__class__.__name__
+
+    def make_key(self, system_prompt, messages) -> str:
+        payload = json.dumps({
+            "model": self._model_identity(),
+            "temperature": getattr(self.model, "temperature", None),
+            "system_prompt": system_prompt,
+            "messages": messages
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        """Stored response for a key, marked as a cache hit, or None"""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT response, created FROM responses WHERE key = ?", [key]).fetchone()
+            if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", [key])
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", [now, key])
+            self.hits += 1
+        response = json.loads(row[0])
+        tokens = response.get("tokens") or {}
+        response["tokens"] = dict(
+            input=0,
+            output=0,
+            cached_input=tokens.get("input", 0),
+            cached_output=tokens.get("output", 0),
+            cache_hit=True
+        )
+        return response
+
+    def put(self, key: str, response: dict):
+        """Store a response, then drop expired and least recently used entries to stay within max_bytes"""
+        try:
+            text = json.dumps(response)
+        except (TypeError, ValueError):
+            return
+        nbytes = len(text.encode())
+        if nbytes > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, nbytes, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                [key, text, nbytes, now, now]
+            )
+            if self.ttl_seconds is not None:
+                self._conn.execute("DELETE FROM responses WHERE created < ?", [now - self.ttl_seconds])
+            total = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                evict = []
+                for old_key, size in self._conn.execute("SELECT key, nbytes FROM responses ORDER BY last_used"):
+                    if total <= self.max_bytes:
+                        break
+                    evict.append([old_key])
+                    total -= size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", evict)
+
+    def run(self, system_prompt, messages):
+        key = self.make_key(system_prompt, messages)
+        response = self.get(key)
+        if response is None:
+            response = self.model.run(system_prompt=system_prompt, messages=messages)
+            self.put(key, response)
+        return response
+
+    def run_stream(self, system_prompt, messages, on_token):
+        """Stream a model call; a cached answer arrives as a single chunk"""
+        key = self.make_key(system_prompt, messages)
+        response = self.get(key)
+        if response is None:
+            response = run_streaming(self.model, system_prompt, messages, on_token)
+            self.put(key, response)
+        else:
+            on_token(response['content'])
+        return response
+
+    async def _run_async(self, system_prompt, messages):
+        key = self.make_key(system_prompt, messages)
+        response = self.get(key)
+        if response is None:
+            response = await self.model.run_async(system_prompt=system_prompt, messages=messages)
+            self.put(key, response)
+        return response
+
+    def clear(self):
+        """Delete every stored response"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        """Size of the store and hit/miss counts of this instance"""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(nbytes), 0) FROM responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
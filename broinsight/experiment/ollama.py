@@ -1,3 +1,6 @@
+import asyncio
+import json
+import time
 import requests
 
 class LocalOpenAI:
@@ -19,21 +22,72 @@ class LocalOpenAI:
         return dict(
             content=response["message"]["content"],
             model_name=self.model_name,
-            input_token=0,
-            output_token=0
+            input_token=response.get("prompt_eval_count", 0),
+            output_token=response.get("eval_count", 0),
+            tokens=dict(
+                input=response.get("prompt_eval_count", 0),
+                output=response.get("eval_count", 0)
+            )
         )
         # return response
 
-    def run(self, system_prompt, messages):
+    def _payload(self, system_prompt, messages, stream=False):
         all_messages = [self.SystemMessage(system_prompt)] + messages
+        return {
+            "model": self.model_name,
+            "messages": all_messages,
+            "stream": stream,
+            "options": {"temperature": self.temperature}
+        }
+
+    def run(self, system_prompt, messages):
         response = requests.post(
             "{base_url}/api/chat".format(base_url=self.base_url), 
-            json={
-                "model": self.model_name,
-                "messages": all_messages,
-                "stream": False,
-                "options": {"temperature": self.temperature}
-            }
+            json=self._payload(system_prompt, messages)
         )
         response = response.json()
-        return self.OutputMessage(response)
\ No newline at end of file
+        return self.OutputMessage(response)
+
+    async def run_async(self, system_prompt, messages):
+        """Same as run, awaiting the HTTP call (uses httpx when installed, else a worker thread)"""
+        try:
+            import httpx
+        except ImportError:
+            return await asyncio.to_thread(self.run, system_prompt, messages)
+        async with httpx.AsyncClient(timeout=None) as client:
+            response = await client.post(
+                "{base_url}/api/chat".format(base_url=self.base_url),
+                json=self._payload(system_prompt, messages)
+            )
+        return self.OutputMessage(response.json())
+
+    def run_stream(self, system_prompt, messages, on_token):
+        """Same as run, passing each content chunk to on_token as Ollama generates it"""
+        start = time.time()
+        first_token = None
+        chunks = []
+        event = {}
+        with requests.post(
+            "{base_url}/api/chat".format(base_url=self.base_url),
+            json=self._payload(system_prompt, messages, stream=True),
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            # chunk_size=None hands over data as it arrives instead of buffering 512 bytes
+            for line in response.iter_lines(chunk_size=None):
+                if not line:
+                    continue
+                event = json.loads(line)
+                chunk = event.get("message", {}).get("content", "")
+                if chunk:
+                    if first_token is None:
+                        first_token = time.time() - start
+                    chunks.append(chunk)
+                    on_token(chunk)
+                if event.get("done"):
+                    break
+        # The final event carries the token counts; give it the accumulated content
+        event["message"] = {"role": "assistant", "content": "".join(chunks)}
+        output = self.OutputMessage(event)
+        output["first_token"] = first_token
+        return output
@@ -0,0 +1,63 @@
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Any, Callable, Optional
+
+def run_streaming(model, system_prompt, messages, on_token: Optional[Callable[[str], Any]] = None):
+    """Run a model call, passing content chunks to ``on_token`` as they are generated.
+
+    Models with ``run_stream(system_prompt, messages, on_token)`` (BedrockOpenAI,
+    LocalOpenAI) stream; other models answer in one piece, delivered to
+    ``on_token`` as a single chunk. Either way the full response, with its token
+    counts, is returned once generation is complete.
+    """
+    if on_token is None:
+        return model.run(system_prompt=system_prompt, messages=messages)
+    if hasattr(model, "run_stream"):
+        return model.run_stream(system_prompt=system_prompt, messages=messages, on_token=on_token)
+    response = model.run(system_prompt=system_prompt, messages=messages)
+    on_token(response['content'])
+    return response
+
+class TokenStream:
+    """Async iterator over the content chunks of a model call running on an executor.
+
+    ``response`` holds the full response (content and token counts) once the
+    iteration has finished; errors of the model call are raised at the end of it.
+
+    Usage:
+        stream = TokenStream(model, system_prompt, messages)
+        async for chunk in stream:
+            print(chunk, end="", flush=True)
+        tokens = stream.response['tokens']
+    """
+
+    def __init__(self, model, system_prompt, messages, executor: Optional[Executor] = None):
+        self.model = model
+        self.system_prompt = system_prompt
+        self.messages = messages
+        self.executor = executor
+        self.response = None
+
+    def __aiter__(self):
+        return self._chunks()
+
+    async def _chunks(self):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        done = object()
+
+        def on_token(chunk):
+            # Called on the executor thread: hand the chunk to the event loop
+            loop.call_soon_threadsafe(queue.put_nowait, chunk)
+
+        future = loop.run_in_executor(
+            self.executor, partial(run_streaming, self.model, self.system_prompt, self.messages, on_token)
+        )
+        future.add_done_callback(lambda _: queue.put_nowait(done))
+        while True:
+            chunk = await queue.get()
+            if chunk is done:
+                break
+            yield chunk
+        self.response = await future
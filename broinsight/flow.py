@@ -1,10 +1,18 @@
 from broflow import Flow, Start, End
+from broflow.action_async import AsyncStart, AsyncEnd
+from broflow.flow_async import AsyncFlow
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
 from .actions.retrieve import Retrieve
 from .actions.chat import Chat
 from .actions.generate_sql import GenerateSQL
 from .actions.select_metadata import SelectMetadata
 from .actions.organize import Organize
 from .actions.guide_question import GuideQuestion 
+from .actions.async_actions import (
+    AsyncOrganize, AsyncGuideQuestion, AsyncSelectMetadata, AsyncGenerateSQL, AsyncRetrieve, AsyncChat
+)
+from .experiment.async_model import as_async_model
 from brollm import BaseLLM
 from broprompt import Prompt
 
@@ -36,6 +44,7 @@ def get_flow(model:BaseLLM):
     
     # One-shot workflow paths:
     # Path 1: organize -> select_metadata -> generate_sql -> retrieve -> chat -> end
+    #         (select_metadata -> retrieve when Shared.plan_cache has the question's plan)
     # Path 2: organize -> chat -> end  
     # Path 3: organize -> guide_question -> end
     
@@ -44,10 +53,62 @@ def get_flow(model:BaseLLM):
     guide_question_action >> end_action
     organize_action -"select_metadata">> select_metadata_action
     select_metadata_action >> generate_sql_action
+    select_metadata_action -"retrieve">> retrieve_action
     generate_sql_action >> retrieve_action
     retrieve_action -"generate_sql">> generate_sql_action
     retrieve_action >> chat_action
     organize_action >> chat_action
     chat_action >> end_action
     
-    return Flow(start_action=start_action, name="BroInsight One-Shot!")
\ No newline at end of file
+    return Flow(start_action=start_action, name="BroInsight One-Shot!")
+
+def get_async_flow(model:BaseLLM, db_executor:Optional[Executor]=None, max_db_workers:int=8, max_llm_concurrency:int=64):
+    """Same one-shot workflow as get_flow, awaitable so one event loop can serve many sessions.
+
+    Run each session with ``await flow.run_async(shared)`` (e.g. under asyncio.gather).
+    LLM calls are awaited through the model's run_async, or run on up to
+    ``max_llm_concurrency`` threads when the model has none; DuckDB work runs on
+    ``db_executor``, by default a pool of ``max_db_workers`` threads.
+    """
+    model = as_async_model(model, max_concurrency=max_llm_concurrency)
+    if db_executor is None:
+        db_executor = ThreadPoolExecutor(max_workers=max_db_workers, thread_name_prefix="broinsight-db")
+
+    start_action = AsyncStart(message="Welcome to BroInsight!")
+    end_action = AsyncEnd(message="Thank you for using BroInsight!")
+
+    organize_action = AsyncOrganize(
+        system_prompt=Prompt.from_markdown("broinsight/prompt_hub/organize.md").str,
+        model=model, executor=db_executor
+    )
+    guide_question_action = AsyncGuideQuestion(
+        system_prompt=Prompt.from_markdown("broinsight/prompt_hub/guide_question.md").str,
+        model=model, executor=db_executor
+    )
+    select_metadata_action = AsyncSelectMetadata(
+        system_prompt=Prompt.from_markdown("broinsight/prompt_hub/select_metadata.md").str,
+        model=model, executor=db_executor
+    )
+    generate_sql_action = AsyncGenerateSQL(
+        system_prompt=Prompt.from_markdown("broinsight/prompt_hub/generate_sql.md").str,
+        model=model, executor=db_executor
+    )
+    retrieve_action = AsyncRetrieve(executor=db_executor)
+    chat_action = AsyncChat(
+        system_prompt=Prompt.from_markdown("broinsight/prompt_hub/chat.md").str,
+        model=model, executor=db_executor
+    )
+
+    start_action >> organize_action
+    organize_action -"guide">> guide_question_action
+    guide_question_action >> end_action
+    organize_action -"select_metadata">> select_metadata_action
+    select_metadata_action >> generate_sql_action
+    select_metadata_action -"retrieve">> retrieve_action
+    generate_sql_action >> retrieve_action
+    retrieve_action -"generate_sql">> generate_sql_action
+    retrieve_action >> chat_action
+    organize_action >> chat_action
+    chat_action >> end_action
+
+    return AsyncFlow(start_action=start_action, name="BroInsight One-Shot Async!")
@@ -1,40 +1,70 @@
 import duckdb
+import itertools
+import threading
 import yaml
 import json
 import uuid
 import pandas as pd
 from pathlib import Path
-from typing import Optional, List
+from typing import Dict, Iterable, Iterator, Optional, List
+from broinsight.utils.result_cache import ResultCache, view_dependencies
+from broinsight.utils.resource_governor import ResourceGovernor, active_limits
+from broinsight.utils.sql_guard import explain_plan
+from broinsight.utils.result_stream import fetch_capped, iter_result_chunks, record_batch_reader
 
 class DuckConnector:
-    def __init__(self, data_db_path=":memory:", metadata_db_path="metadata.db"):
+    """Data and metadata access over two long-lived DuckDB connections.
+
+    Both connections are opened once and reused for every statement; DataFrames are
+    registered on the data connection once, when register_dataframe is called. A
+    re-entrant lock serializes access, since a DuckDB connection is not safe to share
+    between threads without one.
+    
+    With ``result_cache_bytes`` set, execute_query results are kept in an in-memory
+    LRU cache of that many bytes (requires pyarrow), keyed by normalized SQL and the
+    registration of the DataFrames it reads; re-registering a DataFrame invalidates
+    its entries, and any statement that may write data clears the cache.
+    
+    With ``resource_governor`` the data connection runs under its "query" profile
+    (memory_limit, threads, temp_directory, ...); see resource_limits().
+    """
+
+    def __init__(self, data_db_path=":memory:", metadata_db_path="metadata.db", result_cache_bytes: Optional[int] = None,
+                 resource_governor: Optional[ResourceGovernor] = None):
         self.data_db_path = data_db_path
         self.metadata_db_path = metadata_db_path
         self.data_conn = duckdb.connect(data_db_path)
-        self._registered_tables = {}  # Track registered DataFrames
+        if resource_governor is not None:
+            resource_governor.apply(self.data_conn, "query")
+        self.metadata_conn = duckdb.connect(metadata_db_path)
+        self._lock = threading.RLock()
+        self._registered_tables = {}  # Track registered DataFrames (re-registered on cursors)
+        self._versions = itertools.count(1)
+        self._table_versions = {}  # table name -> version of its registration
+        self._result_cache = ResultCache(result_cache_bytes) if result_cache_bytes is not None else None
         self._init_metadata_schema()
     
     def _execute_metadata(self, sql: str, params: list = None):
-        """Execute SQL on metadata database with context manager"""
-        with duckdb.connect(self.metadata_db_path) as conn:
+        """Execute SQL on the persistent metadata connection"""
+        with self._lock:
             if params:
-                result = conn.execute(sql, params)
+                result = self.metadata_conn.execute(sql, params)
             else:
-                result = conn.execute(sql)
+                result = self.metadata_conn.execute(sql)
             
-            # Fetch results before connection closes
+            # Fetch results while the lock is held
             if sql.strip().upper().startswith('SELECT'):
                 return result.fetchall()
             else:
                 return result
     
     def _execute_data(self, sql: str, params: list = None):
-        """Execute SQL on data database with context manager"""
-        with duckdb.connect(self.data_db_path) as conn:
+        """Execute SQL on the persistent data connection"""
+        with self._lock:
             if params:
-                return conn.execute(sql, params)
+                return self.data_conn.execute(sql, params)
             else:
-                return conn.execute(sql)
+                return self.data_conn.execute(sql)
 
     def _init_metadata_schema(self):
         """Create metadata table if not exists"""
@@ -49,61 +79,110 @@ class DuckConnector:
             )
         """)
     
-    def execute_query(self, sql: str) -> pd.DataFrame:
-        """Execute query on data connection and return DataFrame"""
-        with duckdb.connect(self.data_db_path) as conn:
-            # Re-register all tables that were registered before
-            if hasattr(self, '_registered_tables'):
-                for table_name, df in self._registered_tables.items():
-                    conn.register(table_name, df)
-            return conn.execute(sql).fetch_df()
+    def execute_query(self, sql: str, max_rows: Optional[int] = None, max_bytes: Optional[int] = None,
+                      timeout: Optional[float] = None, count_total: bool = True) -> pd.DataFrame:
+        """Execute query on data connection and return DataFrame
+        
+        With max_rows/max_bytes only that much of the result is fetched; the true size
+        is in df.attrs['total_rows'] and df.attrs['truncated'] tells whether it was cut.
+        Counting the true size of a cut result runs the query a second time; with
+        count_total=False it is skipped and total_rows is None.
+        With timeout (seconds) the query is interrupted and TimeoutError raised when it
+        runs longer.
+        """
+        def execute():
+            with self._lock:
+                return fetch_capped(self.data_conn, sql, max_rows=max_rows, max_bytes=max_bytes, timeout=timeout,
+                                           count_total=count_total)
+        if self._result_cache is None:
+            return execute()
+        return self._result_cache.run(sql, execute, self._versions_of, max_rows=max_rows, max_bytes=max_bytes,
+                                      count_total=count_total)
+    
+    def _versions_of(self, tables: Iterable[str]) -> Dict[str, int]:
+        """Registration version of each referenced table and of the tables below referenced views
+        (0 for tables stored in the database)"""
+        with self._lock:
+            names = view_dependencies(self.data_conn, tables)
+        return {name: self._table_versions.get(name, 0) for name in names}
+    
+    def result_cache_stats(self) -> Optional[dict]:
+        """Hit/miss and memory metrics of the result cache (None when it is disabled)"""
+        return self._result_cache.stats() if self._result_cache is not None else None
+    
+    def resource_limits(self) -> Dict[str, str]:
+        """DuckDB memory, thread and spill settings of the data connection"""
+        with self._lock:
+            return active_limits(self.data_conn)
+    
+    def explain(self, sql: str) -> list:
+        """Bind and plan a query without running it (see sql_guard.explain_plan)"""
+        with self._lock:
+            return explain_plan(self.data_conn, sql)
+    
+    def stream_query(self, sql: str, batch_rows: int = 100_000, arrow: bool = False) -> Iterator:
+        """Execute query and yield the result in chunks of about batch_rows rows
+        
+        Yields pandas DataFrames, or pyarrow RecordBatches when arrow=True. The stream
+        runs on its own cursor, so other queries can run while it is being consumed.
+        """
+        with self._lock:
+            conn = self.data_conn.cursor()
+            # DataFrames registered on the parent connection are not visible to cursors
+            for table_name, df in self._registered_tables.items():
+                conn.register(table_name, df)
+        with conn:
+            result = conn.execute(sql)
+            if arrow:
+                yield from record_batch_reader(result, batch_rows)
+            else:
+                yield from iter_result_chunks(result, batch_rows)
     
     def register_dataframe(self, df: pd.DataFrame, table_name: str):
         """Register DataFrame as table in data connection"""
-        # Keep track of registered tables for re-registration
-        if not hasattr(self, '_registered_tables'):
-            self._registered_tables = {}
-        self._registered_tables[table_name] = df
-        
-        # Register in current connection
-        self.data_conn.register(table_name, df)
+        # Keep track of registered tables for cursors opened by stream_query
+        with self._lock:
+            self._registered_tables[table_name] = df
+            self.data_conn.register(table_name, df)
+            self._table_versions[table_name.lower()] = next(self._versions)
+        if self._result_cache is not None:
+            self._result_cache.invalidate(table_name)
     
     def register_metadata_from_yaml(self, yaml_dir: str):
-        """Convert YAML metadata files to database records"""
-        yaml_path = Path(yaml_dir)
-        for yaml_file in yaml_path.glob("*.yaml"):
+        """Convert YAML metadata files to database records
+        
+        All files are upserted in a single transaction with one batched
+        INSERT ... ON CONFLICT statement; if a table appears in several files,
+        the last one wins.
+        """
+        rows = {}
+        for yaml_file in sorted(Path(yaml_dir).glob("*.yaml")):
             with open(yaml_file, 'r') as f:
                 metadata = yaml.safe_load(f)
             
             table_name = metadata['table_name']
-            description = metadata['description']
-            
             # Everything else goes to detail JSON
             detail = {
                 'fields': metadata['fields']
             }
-            
-            # Check if table exists
-            existing = self._execute_metadata(
-                "SELECT table_id FROM metadata_tables WHERE table_name = ?", 
-                [table_name]
-            )
-            
-            if existing:
-                # Update existing record
-                self._execute_metadata("""
-                    UPDATE metadata_tables 
-                    SET description = ?, detail = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE table_name = ?
-                """, [description, json.dumps(detail), table_name])
-            else:
-                # Insert new record
-                table_id = str(uuid.uuid4())
-                self._execute_metadata("""
-                    INSERT INTO metadata_tables 
-                    (table_id, table_name, description, detail)
+            rows[table_name] = [str(uuid.uuid4()), table_name, metadata['description'], json.dumps(detail)]
+        
+        if not rows:
+            return
+        with self._lock:
+            conn = self.metadata_conn
+            conn.execute("BEGIN TRANSACTION")
+            try:
+                conn.executemany("""
+                    INSERT INTO metadata_tables (table_id, table_name, description, detail)
                     VALUES (?, ?, ?, ?)
-                """, [table_id, table_name, description, json.dumps(detail)])
+                    ON CONFLICT (table_name) DO UPDATE
+                    SET description = excluded.description, detail = excluded.detail, updated_at = now()
+                """, list(rows.values()))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
     
     def get_metadata_summary(self) -> str:
         """Get summary of all tables - same interface as MetadataLoader"""
@@ -170,6 +249,16 @@ class DuckConnector:
         
         return "\n".join(lines)
     
+    def category_values(self) -> Dict[str, Dict[str, List]]:
+        """Known values of categorical fields, {table: {field: values}}, from the fields' unique_values"""
+        result = self._execute_metadata("SELECT table_name, detail FROM metadata_tables")
+        categories = {}
+        for table_name, detail_json in result:
+            fields = json.loads(detail_json).get('fields', {})
+            categories[table_name] = {field_name: list(field_info['unique_values'].keys())
+                                      for field_name, field_info in fields.items() if field_info.get('unique_values')}
+        return categories
+    
     def list_tables(self) -> List[str]:
         """List all registered metadata tables"""
         result = self._execute_metadata("SELECT table_name FROM metadata_tables")
@@ -189,5 +278,7 @@ class DuckConnector:
             print(f"metadata.db size: {os.path.getsize('metadata.db')} bytes")
     
     def close(self):
-        """Close data connection (metadata uses context manager)"""
-        self.data_conn.close()
\ No newline at end of file
+        """Close the data and metadata connections"""
+        with self._lock:
+            self.data_conn.close()
+            self.metadata_conn.close()
\ No newline at end of file
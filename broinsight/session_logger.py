@@ -5,15 +5,16 @@ class SessionLogger:
         self.logs = []  # In-memory fallback
     
     def log(self, action: str, input_data: str = None, output_data: str = None, 
-            status: str = "success", error_message: str = None):
-        """Log an action in the session (memory only)"""
+            status: str = "success", error_message: str = None, details: dict = None):
+        """Log an action in the session (memory only); details holds extra structured context"""
         log_entry = {
             "timestamp": datetime.now().isoformat(),
             "action": action,
             "input_data": input_data,
             "output_data": output_data,
             "status": status,
-            "error_message": error_message
+            "error_message": error_message,
+            "details": details
         }
         
         # Store in memory only during execution
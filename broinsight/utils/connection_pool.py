@@ -0,0 +1,134 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+class CursorPool:
+    """Bounded pool of DuckDB cursors on one database, for concurrent queries.
+
+    Every request gets its own cursor (a connection to the same database, safe to
+    use from its thread) and returns it for reuse. At most ``max_concurrency``
+    cursors are in use at once; further requests wait, and the time they spend
+    waiting is recorded in ``stats()``. DataFrames registered on the pool are
+    registered on each cursor before it is handed out, since DataFrame views are
+    local to the connection they were registered on.
+
+    Usage:
+        pool = CursorPool(conn, max_concurrency=8)
+        pool.register("orders", orders_df)
+        with pool.cursor() as cursor:
+            df = cursor.execute("SELECT COUNT(*) FROM orders").df()
+    """
+
+    def __init__(self, conn, max_concurrency: int = 8):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self._conn = conn
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._idle = []  # (cursor, {name: id(dataframe)} registered on it)
+        self._dataframes = {}
+        self._closed = False
+        self._active = 0
+        self._waiting = 0
+        self._acquired = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def register(self, name: str, dataframe):
+        """Make a DataFrame visible as a table on every cursor handed out from now on"""
+        with self._lock:
+            self._dataframes[name] = dataframe
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._dataframes.pop(name, None)
+
+    def _sync(self, cursor, registered: dict) -> dict:
+        """Bring a cursor's DataFrame registrations up to date with the pool"""
+        with self._lock:
+            dataframes = dict(self._dataframes)
+        for name in [name for name in registered if name not in dataframes]:
+            cursor.unregister(name)
+            del registered[name]
+        for name, dataframe in dataframes.items():
+            if registered.get(name) != id(dataframe):
+                cursor.register(name, dataframe)
+                registered[name] = id(dataframe)
+        return registered
+
+    @contextmanager
+    def cursor(self, timeout: Optional[float] = None):
+        """Borrow a cursor for one request, waiting while the pool is at its limit
+
+        Raises:
+            TimeoutError: No cursor became free within ``timeout`` seconds
+        """
+        if self._closed:
+            raise ValueError("Cursor pool is closed")
+        with self._lock:
+            self._waiting += 1
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=timeout) if timeout is not None else self._slots.acquire()
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._waiting -= 1
+            if acquired:
+                self._active += 1
+                self._acquired += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+                entry = self._idle.pop() if self._idle else None
+        if not acquired:
+            raise TimeoutError(f"No cursor available within {timeout}s ({self.max_concurrency} in use)")
+
+        try:
+            if entry is None:
+                entry = (self._conn.cursor(), {})
+            cursor, registered = entry
+            self._sync(cursor, registered)
+        except Exception:
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+            raise
+
+        healthy = True
+        try:
+            yield cursor
+        except Exception:
+            # A failed statement may leave a transaction open; start the next request clean
+            healthy = False
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+                if healthy and not self._closed:
+                    self._idle.append((cursor, registered))
+                    cursor = None
+            if cursor is not None:
+                cursor.close()
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Concurrency and queue-wait metrics since the pool was created"""
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "waiting": self._waiting,
+                "idle": len(self._idle),
+                "acquired": self._acquired,
+                "total_wait_seconds": round(self._total_wait, 6),
+                "avg_wait_seconds": round(self._total_wait / self._acquired, 6) if self._acquired else 0.0,
+                "max_wait_seconds": round(self._max_wait, 6)
+            }
+
+    def close(self):
+        """Close idle cursors; cursors still in use are closed when returned"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for cursor, _ in idle:
+            cursor.close()
@@ -1,19 +1,157 @@
 import duckdb
+import itertools
+import os
+import threading
 import pandas as pd
-from typing import Dict, List, Optional, Union
-from broinsight.data_quality.sql_profile import sql_table_profile, sql_field_profile
+from functools import partial, wraps
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Union
+from broinsight.data_quality.sql_profile import sql_table_profile, sql_field_profile, sql_field_sketches, sql_duplicate_evidences, parquet_footer_stats, _extract_data_type, _path_literal
+from broinsight.data_quality.partition_profile import expand_paths, file_partitions, partition_profile
+from broinsight.data_quality.sketches import FieldSketch
 # from broinsight.data_quality.criteria import assess_data_quality
 # from broinsight.data_quality.create_profile import format_profile
 from broinsight.utils.data_spec import Metadata, TableSpec, create_field_specs_from_profile, create_data_quality_assessment
+from broinsight.utils.connection_pool import CursorPool
+from broinsight.utils.object_cache import ObjectCache
+from broinsight.utils.resource_governor import ResourceGovernor, ResourceProfile, active_limits, apply_settings
+from broinsight.utils.result_cache import ResultCache, view_dependencies
+from broinsight.utils.sql_guard import explain_plan
+from broinsight.utils.result_stream import fetch_capped, iter_result_chunks, record_batch_reader
+from broinsight.utils.profile_cache import ProfileCache, dataframe_fingerprint, local_file_fingerprint, parquet_footer_fingerprint, s3_etag_fingerprint
 from broinsight.experiment.bedrock import AWSConfig
 
+MATERIALIZE_POLICIES = [False, True, "on_first_use"]
+FILE_FORMATS = {
+    'parquet': ('.parquet', '.parq', '.pq'),
+    'csv': ('.csv', '.tsv', '.txt', '.csv.gz', '.tsv.gz')
+}
+
+def _detect_format(paths: List[str]) -> Optional[str]:
+    """File format from path suffixes (compression suffixes included), or None"""
+    for path in paths:
+        for file_format, suffixes in FILE_FORMATS.items():
+            if path.lower().endswith(suffixes):
+                return file_format
+    return None
+
+def _hive_partition_columns(files: List[str]) -> List[str]:
+    """Hive partition keys (key=value directories) shared by every file, in path order"""
+    columns = None
+    for path in files:
+        keys = [segment.split('=', 1)[0] for segment in path.split('/')[:-1] if '=' in segment]
+        columns = keys if columns is None else [key for key in columns if key in keys]
+    return columns or []
+
+_httpfs_installed = False
+_httpfs_lock = threading.Lock()
+
+def preload_httpfs():
+    """Install the httpfs extension once per process; later connections only need to LOAD it"""
+    global _httpfs_installed
+    with _httpfs_lock:
+        if not _httpfs_installed:
+            duckdb.execute("INSTALL httpfs")
+            _httpfs_installed = True
+
+def _configure_s3(conn, aws_access_key_id=None, aws_secret_access_key=None, region_name='ap-southeast-1', aws_session_token=None):
+    """Load httpfs and create the S3 secret on a connection (module-level so worker processes can use it)"""
+    preload_httpfs()
+    conn.execute("LOAD httpfs")
+    
+    if aws_access_key_id and aws_secret_access_key:
+        secret_sql = f"""
+        CREATE OR REPLACE SECRET s3_secret (
+            TYPE s3,
+            PROVIDER config,
+            KEY_ID '{aws_access_key_id}',
+            SECRET '{aws_secret_access_key}',
+            REGION '{region_name}'"""
+        if aws_session_token:
+            secret_sql += f",\n            SESSION_TOKEN '{aws_session_token}'"
+        secret_sql += "\n        )"
+        conn.execute(secret_sql)
+    else:
+        conn.execute("""
+        CREATE OR REPLACE SECRET s3_secret (
+            TYPE s3,
+            PROVIDER credential_chain
+        )""")
+
+def _setup_worker(conn, s3_configs: Optional[dict] = None, settings: Optional[dict] = None):
+    """Prepare a profiling worker's connection: S3 access and its share of the resource limits"""
+    if s3_configs:
+        _configure_s3(conn, **s3_configs)
+    if settings:
+        apply_settings(conn, settings)
+
+def _governed(profile: str):
+    """Run a DataCatalog method under a resource profile of the catalog's governor, if it has one"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self._governor is None:
+                return method(self, *args, **kwargs)
+            with self._governor.use(self._conn, profile):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def _synchronized(method):
+    """Serialize a DataCatalog method on the catalog lock (it uses the shared main connection)"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
 class DataCatalog:
-    def __init__(self, aws_configs:Optional[AWSConfig]=None):
+    def __init__(self, aws_configs:Optional[AWSConfig]=None, profile_cache:Optional[str]=None, max_concurrency: int = 8,
+                 result_cache_bytes: Optional[int] = None, s3_cache: Optional[str] = None,
+                 s3_cache_bytes: int = 10 * 1024**3, s3_endpoint_url: Optional[str] = None,
+                 resource_governor: Optional[ResourceGovernor] = None):
+        """
+        Args:
+            aws_configs: AWS credentials for s3:// sources
+            profile_cache: Path of an on-disk profile cache (e.g. "profile_cache.db"); profile_tables()
+                then reuses Metadata of sources whose fingerprint has not changed
+            max_concurrency: Maximum number of query()/query_stream() calls running at once;
+                each runs on its own pooled cursor, further calls wait (see pool_stats())
+            result_cache_bytes: Memory budget of a query() result cache (requires pyarrow); repeated
+                queries over unchanged tables are then served from it. None (default) disables it.
+                File sources are assumed not to change until they are registered again
+            s3_cache: Directory of an on-disk cache of S3 objects (see ObjectCache). s3:// sources are
+                then downloaded once per ETag and read locally, also across sessions; unchanged
+                objects are never transferred again
+            s3_cache_bytes: Size cap of the S3 object cache; least recently used objects are evicted
+            s3_endpoint_url: S3-compatible endpoint for the object cache (e.g. MinIO or moto)
+            resource_governor: DuckDB memory/threads/spill limits; queries run under its "query"
+                profile and profile_tables(), profile_partitioned() and refresh_profile() under
+                its "profiling" profile (see resource_limits()). None keeps DuckDB's defaults
+        """
         self._conn = duckdb.connect()
+        self._governor = resource_governor
+        if resource_governor is not None:
+            resource_governor.apply(self._conn, "query")
+        self._lock = threading.RLock()  # guards the main connection: registration, DDL, profiling
+        self._pool = CursorPool(self._conn, max_concurrency=max_concurrency)
         self._tables = {}
+        # Guards the _tables registry itself, held only for dict updates and snapshots, so
+        # lock-free readers (query, explain, query_stream) never wait on profiling
+        self._registry_lock = threading.Lock()
         self._relationships = []  # Store table relationships
+        self._relationship_index = {}  # foreign table -> its relationships
+        self._versions = itertools.count(1)  # catalog-wide, so versions never repeat across re-registration
+        self._aws_configs = None
+        self._profile_cache = ProfileCache(profile_cache) if profile_cache else None
+        self._result_cache = ResultCache(result_cache_bytes) if result_cache_bytes is not None else None
+        self._object_cache = None
         if aws_configs:
-            self._setup_s3(**self._validate_config(aws_configs))
+            self._aws_configs = self._validate_config(aws_configs)
+            self._setup_s3(**self._aws_configs)
+        if s3_cache:
+            self._object_cache = ObjectCache(s3_cache, max_bytes=s3_cache_bytes, aws_configs=self._aws_configs,
+                                             endpoint_url=s3_endpoint_url)
 
     def _validate_config(self, aws_configs):
         """Validate and convert AWSConfig to dictionary"""
@@ -28,81 +166,392 @@ class DataCatalog:
 
     def _setup_s3(self, aws_access_key_id=None, aws_secret_access_key=None, region_name='ap-southeast-1', aws_session_token=None):
         """Setup S3 connection using your existing logic"""
-
-        self._conn.execute("INSTALL httpfs")
-        self._conn.execute("LOAD httpfs")
-        
-        if aws_access_key_id and aws_secret_access_key:
-            secret_sql = f"""
-            CREATE OR REPLACE SECRET s3_secret (
-                TYPE s3,
-                PROVIDER config,
-                KEY_ID '{aws_access_key_id}',
-                SECRET '{aws_secret_access_key}',
-                REGION '{region_name}'"""
-            if aws_session_token:
-                secret_sql += f",\n                SESSION_TOKEN '{aws_session_token}'"
-            secret_sql += "\n            )"
-            self._conn.execute(secret_sql)
-        else:
-            self._conn.execute("""
-            CREATE OR REPLACE SECRET s3_secret (
-                TYPE s3,
-                PROVIDER credential_chain
-            )""")
-    
-    def create_table(self, name: str, source, table_description: str = '', metadata=None):
-        """Universal table creation method"""
+        _configure_s3(self._conn, aws_access_key_id, aws_secret_access_key, region_name, aws_session_token)
+    
+    def _reader(self, path, file_format: Optional[str] = None, hive_partitioning: bool = False) -> str:
+        """DuckDB table function reading a file path, glob or list of paths"""
+        paths = path if isinstance(path, list) else [path]
+        file_format = file_format or _detect_format(paths) or 'csv'
+        options = ""
+        if hive_partitioning:
+            options += ", hive_partitioning=true"
+        if isinstance(path, list) or any(char in path for char in "*?["):
+            # Tolerate columns added or reordered across files
+            options += ", union_by_name=true"
+        function = "read_parquet" if file_format == 'parquet' else "read_csv_auto"
+        return f"{function}({_path_literal(path)}{options})"
+    
+    @_synchronized
+    def create_table(self, name: str, source, table_description: str = '', metadata=None, materialize: Union[bool, str] = False,
+                     file_format: Optional[str] = None, hive_partitioning: Optional[bool] = None):
+        """Universal table creation method
+        
+        Args:
+            name: Table name used in SQL
+            source: pandas DataFrame, or CSV/parquet source (local or s3://): a path, a glob
+                such as "s3://bucket/events/*/*.parquet", or a list of paths
+            table_description: Business description of the table
+            metadata: Pre-built Metadata, if already profiled
+            materialize: How file sources are held. False (default) registers a view, so
+                files are read on demand with projection/filter pushdown; True copies the
+                data into memory now; "on_first_use" keeps a view until the first query()
+                that references the table, then copies it
+            file_format: "parquet" or "csv"; detected from the path suffix when omitted
+            hive_partitioning: Read key=value directories as partition columns; detected
+                from the matched file paths when omitted. Filters on partition columns
+                skip non-matching files as long as the table stays a view
+        """
+        if materialize not in MATERIALIZE_POLICIES:
+            raise ValueError(f"Unsupported materialize policy: {materialize}. Use one of {MATERIALIZE_POLICIES}")
+        if file_format is not None and file_format not in FILE_FORMATS:
+            raise ValueError(f"Unsupported file format: {file_format}. Use one of {list(FILE_FORMATS)}")
+        partition_columns = []
+        remote_path = None
+        # Registering a name again replaces it, whatever holds it now (e.g. a materialized table),
+        # along with rows refresh_profile appended to it
+        self._drop_relation(name)
+        self._conn.execute(f"DROP TABLE IF EXISTS {name}__appended")
+        
         if isinstance(source, pd.DataFrame):
             # Pandas DataFrame
             self._conn.register(name, source)
+            self._pool.register(name, source)
             source_type = 'pandas'
             source_path = None
+            dataframe = source
+            materialized = True
         
-        elif isinstance(source, str):
-            # File path (local or S3)
-            if source.startswith('s3://'):
-                if source.endswith('.parquet'):
-                    self._conn.execute(f"CREATE TABLE {name} AS SELECT * FROM read_parquet('{source}')")
-                    source_type = 's3_parquet'
-                else:
-                    self._conn.execute(f"CREATE TABLE {name} AS SELECT * FROM read_csv_auto('{source}')")
-                    source_type = 's3_csv'
+        elif isinstance(source, (str, list)):
+            # File path, glob or list of paths (local or S3)
+            paths = source if isinstance(source, list) else [source]
+            if not paths:
+                raise ValueError("Source list is empty")
+            location = 's3' if paths[0].startswith('s3://') else 'local'
+            if location == 's3' and self._object_cache is not None:
+                # Read local copies; the table then behaves like a local source
+                remote_path = source
+                source = files = self._object_cache.fetch(paths)
+            else:
+                files = expand_paths(self._conn, paths)
+            if not files:
+                raise ValueError(f"No files found for {source}")
+            file_format = file_format or _detect_format(files) or 'csv'
+            source_type = f"{location}_{file_format}"
+            partition_columns = _hive_partition_columns(files)
+            if hive_partitioning is None:
+                hive_partitioning = bool(partition_columns)
+            elif not hive_partitioning:
+                partition_columns = []
+            reader = self._reader(source, file_format, hive_partitioning)
+            # A DataFrame registered under the name would shadow the view, on cursors and the main connection
+            self._conn.unregister(name)
+            self._pool.unregister(name)
+            materialized = materialize is True
+            if materialized:
+                self._conn.execute(f"CREATE TABLE {name} AS SELECT * FROM {reader}")
             else:
-                # Local file
-                self._conn.execute(f"CREATE TABLE {name} AS SELECT * FROM read_csv_auto('{source}')")
-                source_type = 'local_csv'
+                self._conn.execute(f"CREATE OR REPLACE VIEW {name} AS SELECT * FROM {reader}")
             source_path = source
+            dataframe = None
         
         else:
             raise ValueError(f"Unsupported source type: {type(source)}")
         
-        self._tables[name] = {
+        if self._result_cache is not None:
+            self._result_cache.invalidate(name)
+        previous = self._tables.get(name)
+        if self._object_cache is not None and previous and previous.get('remote_path'):
+            # Let the replaced table's copies be evicted, unless the new source uses them too
+            self._object_cache.release(set(previous['path']) - set(source_path if remote_path else []))
+        entry = {
             'type': source_type, 
             'path': source_path, 
+            'dataframe': dataframe,
+            'remote_path': remote_path,  # the s3:// source when path holds cached local copies
+            'format': file_format,
+            'hive_partitioning': bool(hive_partitioning),
+            'partition_columns': partition_columns,
+            'materialize': materialize,
+            'materialized': materialized,
+            'revision': 0,  # bumped when rows are appended in-process
+            'data_version': next(self._versions),  # keys cached query results; bumped with revision
+            'version': next(self._versions),  # bumped whenever the rendered metadata may change
+            'rendered': {},  # renderer name -> (version, text)
             'table_description': table_description,
             'metadata': metadata
         }
+        with self._registry_lock:
+            self._tables[name] = entry
+    
+    def _drop_relation(self, name: str):
+        """Drop the table or view stored under a name in the catalog database"""
+        relations = self._conn.execute("""
+            SELECT 'TABLE' FROM duckdb_tables() WHERE lower(table_name) = lower(?) AND NOT temporary
+            UNION ALL
+            SELECT 'VIEW' FROM duckdb_views() WHERE lower(view_name) = lower(?) AND NOT temporary AND NOT internal
+        """, [name, name]).fetchall()
+        for (kind,) in relations:
+            self._conn.execute(f"DROP {kind} {name}")
+    
+    def register(self, name: str, source, table_description: str = '', metadata=None, materialize: Union[bool, str] = False,
+                 file_format: Optional[str] = None, hive_partitioning: Optional[bool] = None):
+        self.create_table(name, source, table_description, metadata, materialize, file_format, hive_partitioning)
+    
+    @_synchronized
+    def materialize(self, table_name: str):
+        """Copy a view-backed file source into an in-memory table"""
+        if table_name not in self._tables:
+            raise ValueError(f"Table '{table_name}' not found")
+        entry = self._tables[table_name]
+        if entry['materialized']:
+            return
+        self._conn.execute(f"CREATE TABLE {table_name}__materialized AS SELECT * FROM {table_name}")
+        self._conn.execute(f"DROP VIEW {table_name}")
+        self._conn.execute(f"ALTER TABLE {table_name}__materialized RENAME TO {table_name}")
+        self._conn.execute(f"DROP TABLE IF EXISTS {table_name}__appended")
+        with self._registry_lock:
+            entry['materialized'] = True
+        
+    def query(self, sql: str, max_rows: Optional[int] = None, max_bytes: Optional[int] = None,
+              timeout: Optional[float] = None, count_total: bool = True):
+        """Run SQL and return a DataFrame
+        
+        With max_rows/max_bytes only that much of the result is fetched; the true size
+        is in df.attrs['total_rows'] and df.attrs['truncated'] tells whether it was cut.
+        Counting the true size of a cut result runs the query a second time; with
+        count_total=False it is skipped and total_rows is None.
+        With timeout (seconds) the query is interrupted and TimeoutError raised when it
+        runs longer.
+        Safe to call from many threads: each call runs on its own pooled cursor.
+        With a result cache, repeated reads of unchanged tables are served from memory.
+        """
+        self._materialize_referenced(sql)
+        
+        def execute():
+            with self._pool.cursor() as cursor:
+                return fetch_capped(cursor, sql, max_rows=max_rows, max_bytes=max_bytes, timeout=timeout,
+                                           count_total=count_total)
+        if self._result_cache is None:
+            return execute()
+        return self._result_cache.run(sql, execute, self._table_versions, max_rows=max_rows, max_bytes=max_bytes,
+                                      count_total=count_total)
+    
+    execute_query = query  # lets a catalog serve as Shared.db
+    
+    def explain(self, sql: str) -> list:
+        """Bind and plan a query without running it (see sql_guard.explain_plan)"""
+        self._materialize_referenced(sql)
+        with self._pool.cursor() as cursor:
+            return explain_plan(cursor, sql)
+    
+    def _table_versions(self, tables) -> Dict[str, int]:
+        """Data version of each referenced table and of the tables below referenced views
+        (0 for tables the catalog does not manage)"""
+        entries = {name.lower(): entry for name, entry in self._snapshot().items()}
+        with self._pool.cursor() as cursor:
+            names = view_dependencies(cursor, tables, managed=entries)
+        return {name: entries[name]['data_version'] if name in entries else 0 for name in names}
+    
+    def result_cache_stats(self) -> Optional[dict]:
+        """Hit/miss and memory metrics of the result cache (None when it is disabled)"""
+        return self._result_cache.stats() if self._result_cache is not None else None
     
-    def register(self, name: str, source, table_description: str = '', metadata=None):
-        self.create_table(name, source, table_description, metadata)
+    def query_stream(self, sql: str, batch_rows: int = 100_000, arrow: bool = False) -> Iterator:
+        """Run SQL and yield the result in chunks of about batch_rows rows
         
-    def query(self, sql: str):
-        return self._conn.execute(sql).df()
+        Yields pandas DataFrames, or pyarrow RecordBatches when arrow=True. The pooled
+        cursor is held until the stream is exhausted or closed.
+        """
+        self._materialize_referenced(sql)
+        with self._pool.cursor() as cursor:
+            result = cursor.execute(sql)
+            if arrow:
+                yield from record_batch_reader(result, batch_rows)
+            else:
+                yield from iter_result_chunks(result, batch_rows)
+    
+    def s3_cache_stats(self) -> Optional[dict]:
+        """Size and hit/miss counts of the S3 object cache (None when it is disabled)"""
+        return self._object_cache.stats() if self._object_cache is not None else None
+    
+    def resource_limits(self) -> Dict[str, str]:
+        """DuckDB memory, thread and spill settings currently in force for this catalog"""
+        with self._pool.cursor() as cursor:
+            return active_limits(cursor)
+    
+    def pool_stats(self) -> dict:
+        """Query concurrency and queue-wait metrics (see CursorPool.stats())"""
+        return self._pool.stats()
+    
+    def close(self):
+        """Close pooled cursors and the main connection"""
+        self._pool.close()
+        with self._lock:
+            self._conn.close()
+    
+    def _materialize_referenced(self, sql: str):
+        """Materialize "on_first_use" tables referenced by a query (materialize() takes the lock)"""
+        pending = [name for name, entry in self._snapshot().items()
+                   if entry['materialize'] == 'on_first_use' and not entry['materialized']]
+        if pending:
+            referenced = duckdb.get_table_names(sql)
+            for table_name in pending:
+                if table_name in referenced:
+                    self.materialize(table_name)
+    
+    def _snapshot(self) -> Dict[str, dict]:
+        """Copy of the table registry with copied entries, safe to read while tables change"""
+        with self._registry_lock:
+            return {name: dict(entry) for name, entry in self._tables.items()}
     
     def list_tables(self) -> List[str]:
-        return list(self._tables.keys())
+        with self._registry_lock:
+            return list(self._tables.keys())
+    
+    def _source_fingerprint(self, table_name: str) -> Optional[str]:
+        """Fingerprint of a table's source, or None when it cannot be determined"""
+        entry = self._tables[table_name]
+        try:
+            if entry['type'] == 'pandas':
+                return dataframe_fingerprint(entry['dataframe'])
+            # Globs are re-expanded, so added or removed files change the fingerprint
+            fingerprints = []
+            for path in expand_paths(self._conn, entry['path']):
+                if path.startswith('s3://'):
+                    if entry['format'] == 'parquet':
+                        fingerprints.append(parquet_footer_fingerprint(self._conn, path))
+                    else:
+                        fingerprints.append(s3_etag_fingerprint(path, self._aws_configs))
+                else:
+                    fingerprints.append(local_file_fingerprint(path))
+            return "\n".join(fingerprints)
+        except Exception:
+            return None
+    
+    def _footer_stats(self, table_name: str, schema: list) -> Optional[dict]:
+        """Parquet footer statistics for an unmodified parquet-backed table, else None"""
+        entry = self._tables[table_name]
+        if entry['type'] not in ('s3_parquet', 'local_parquet') or entry['revision'] > 0:
+            return None
+        try:
+            # Partition columns live in directory names, not in the footers
+            column_types = {col[0]: _extract_data_type(col[1]) for col in schema if col[0] not in entry['partition_columns']}
+            return parquet_footer_stats(self._conn, entry['path'], column_types)
+        except duckdb.Error:
+            return None
+    
+    def _cursor_for(self, cursors: threading.local, created: list, table_name: str):
+        """Get this thread's profiling cursor, with the table's DataFrame registered on it"""
+        cursor = getattr(cursors, 'cursor', None)
+        if cursor is None:
+            cursor = self._conn.cursor()
+            cursors.cursor = cursor
+            created.append(cursor)
+        # DataFrame views are connection-local, so cursors need their own registration
+        dataframe = self._tables[table_name].get('dataframe')
+        if dataframe is not None:
+            cursor.register(table_name, dataframe)
+        return cursor
     
-    def profile_tables(self, tables: List[str]):
-        """Generate complete Metadata objects for specified tables"""
+    @_synchronized
+    @_governed("profiling")
+    def profile_tables(self, tables: List[str], mode: str = "exact", sample_pct: Optional[float] = None,
+                       workers: int = 1, batch_size: int = 50, sketches: bool = False,
+                       max_evidences: int = 10, collect_evidences: bool = True,
+                       progress_callback: Optional[Callable[[int, int, str], None]] = None):
+        """Generate complete Metadata objects for specified tables
         
+        Args:
+            tables: Table names to profile
+            mode: "exact" or "approx" (HyperLogLog distinct counts, t-digest quantiles, approximate top-k)
+            sample_pct: With mode="approx", profile fields on a Bernoulli sample of this percentage
+            workers: Number of threads; each profiles table summaries and column batches on its own cursor
+            batch_size: Columns per fused field-profile query (one unit of parallel work)
+            max_evidences: Cap on duplicate groups kept as TableSpec.evidences (largest dup_count first)
+            collect_evidences: Set False to count duplicates without fetching any evidence rows
+            sketches: Also store mergeable per-field state so refresh_profile() can add new rows incrementally
+            progress_callback: Called as progress_callback(completed, total, table_name) after each unit
+        """
         for table_name in tables:
             if table_name not in self._tables:
                 raise ValueError(f"Table '{table_name}' not found")
-            
-            # Get raw profiles
-            table_profile = sql_table_profile(self._conn, table_name)
-            field_profile = sql_field_profile(self._conn, table_name)
+        
+        # Serve unchanged sources from the profile cache
+        cache_keys, cache_hits = {}, set()
+        if self._profile_cache:
+            options = dict(mode=mode, sample_pct=sample_pct, sketches=sketches,
+                           max_evidences=max_evidences, collect_evidences=collect_evidences)
+            for table_name in tables:
+                fingerprint = self._source_fingerprint(table_name)
+                if fingerprint is None:
+                    continue
+                cache_keys[table_name] = self._profile_cache.make_key(
+                    fingerprint, dict(options, revision=self._tables[table_name]['revision'])
+                )
+                cached = self._profile_cache.get(table_name, cache_keys[table_name])
+                if cached is not None:
+                    cached.table_description = self._tables[table_name].get('table_description', '')
+                    cached.partition_columns = self._tables[table_name].get('partition_columns', [])
+                    self._tables[table_name]['metadata'] = cached
+                    self._bump_version(table_name)
+                    cache_hits.add(table_name)
+            tables = [table_name for table_name in tables if table_name not in cache_hits]
+        
+        # Units of work: one table summary plus one unit per column batch, per table
+        units, footers = [], {}
+        for table_name in tables:
+            units.append((table_name, None))
+            schema = self._conn.execute(f"DESCRIBE {table_name}").fetchall()
+            columns = [col[0] for col in schema]
+            footers[table_name] = self._footer_stats(table_name, schema)
+            for start in range(0, len(columns), max(1, batch_size)):
+                units.append((table_name, columns[start:start + batch_size]))
+        
+        def run_unit(conn, unit):
+            table_name, columns = unit
+            if columns is None:
+                return sql_table_profile(conn, table_name, max_evidences=max_evidences, collect_evidences=collect_evidences)
+            profile = sql_field_profile(conn, table_name, batch_size=batch_size, mode=mode, sample_pct=sample_pct,
+                                        columns=columns, footer=footers[table_name])
+            if sketches:
+                for field_name, sketch in sql_field_sketches(conn, table_name, batch_size=batch_size, columns=columns).items():
+                    profile[field_name]['sketch'] = sketch
+            return profile
+        
+        results = [None] * len(units)
+        if workers <= 1:
+            for position, unit in enumerate(units):
+                results[position] = run_unit(self._conn, unit)
+                if progress_callback:
+                    progress_callback(position + 1, len(units), unit[0])
+        else:
+            cursors, created = threading.local(), []
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = {
+                        executor.submit(lambda unit: run_unit(self._cursor_for(cursors, created, unit[0]), unit), unit): position
+                        for position, unit in enumerate(units)
+                    }
+                    for completed, future in enumerate(as_completed(futures), start=1):
+                        position = futures[future]
+                        results[position] = future.result()
+                        if progress_callback:
+                            progress_callback(completed, len(units), units[position][0])
+            finally:
+                for cursor in created:
+                    cursor.close()
+        
+        # Merge units back per table in submission order, so output never depends on scheduling
+        profiles = {table_name: {'table': None, 'fields': {}} for table_name in tables}
+        for (table_name, columns), result in zip(units, results):
+            if columns is None:
+                profiles[table_name]['table'] = result
+            else:
+                profiles[table_name]['fields'].update(result)
+        
+        for table_name in tables:
+            table_profile = profiles[table_name]['table']
+            field_profile = profiles[table_name]['fields']
             
             # Create Metadata object
             metadata = Metadata(
@@ -110,26 +559,213 @@ class DataCatalog:
                 table_description=self._tables[table_name].get('table_description', ''),
                 table_spec=TableSpec(**table_profile),
                 field_spec=create_field_specs_from_profile(field_profile),
-                data_quality=create_data_quality_assessment(field_profile)
+                data_quality=create_data_quality_assessment(field_profile),
+                partition_columns=self._tables[table_name].get('partition_columns', [])
             )
             
             # Store in registry
             self._tables[table_name]['metadata'] = metadata
+            self._bump_version(table_name)
+            if table_name in cache_keys:
+                self._profile_cache.put(table_name, cache_keys[table_name], metadata)
     
-    def add_field_descriptions(self, table_name: str, field_descriptions):
-        """Add field descriptions to a profiled table"""
+    @_synchronized
+    @_governed("profiling")
+    def profile_partitioned(self, tables: List[str], processes: Optional[int] = None, top_n: int = 5,
+                            partitions_per_process: int = 2, max_evidences: int = 10, collect_evidences: bool = True,
+                            progress_callback: Optional[Callable[[int, int, str], None]] = None):
+        """Profile file-backed tables by partitions in a process pool and reduce into Metadata
+        
+        Each file (or glob match) is a partition; parquet files are also split into
+        row-group ranges when there are fewer files than processes. Every worker process
+        profiles its partition on its own DuckDB connection into mergeable sketches, so
+        field statistics are estimates (see FieldSpec.accuracy) and each field keeps its
+        sketch for refresh_profile(). Duplicates are counted exactly across partitions
+        from row fingerprints; evidences are fetched with one extra scan when requested.
+        
+        Args:
+            tables: Names of tables created from CSV/parquet paths
+            processes: Worker processes (defaults to the CPU count)
+            top_n: Number of most frequent values to keep per field
+            partitions_per_process: Target partitions per process, for load balancing
+            max_evidences: Cap on duplicate groups kept as TableSpec.evidences (largest dup_count first)
+            collect_evidences: Set False to count duplicates without fetching any evidence rows
+            progress_callback: Called as progress_callback(completed, total, table_name) after each partition
+        """
+        for table_name in tables:
+            if table_name not in self._tables:
+                raise ValueError(f"Table '{table_name}' not found")
+            entry = self._tables[table_name]
+            if entry['path'] is None or entry['revision'] > 0:
+                raise ValueError(f"Table '{table_name}' is not backed by unmodified files. Use profile_tables() instead.")
+        
+        processes = processes or os.cpu_count() or 1
+        settings = None
+        if self._governor is not None:
+            # Workers run side by side, each with its share of the profiling limits
+            settings = ResourceProfile(**self._governor.settings("profiling")).split(processes).settings()
+        connection_setup = None
+        if self._aws_configs or settings:
+            connection_setup = partial(_setup_worker, s3_configs=self._aws_configs, settings=settings)
+        for table_name in tables:
+            entry = self._tables[table_name]
+            partitions = file_partitions(self._conn, entry['path'], target_partitions=processes * partitions_per_process,
+                                         file_format=entry['format'], hive_partitioning=entry['hive_partitioning'])
+            callback = (lambda completed, total: progress_callback(completed, total, table_name)) if progress_callback else None
+            profile = partition_profile(partitions, processes=processes, connection_setup=connection_setup,
+                                        top_n=top_n, max_evidences=max_evidences, progress_callback=callback)
+            
+            table = profile['table']
+            evidences = {}
+            if collect_evidences and table['top_groups']:
+                evidences = sql_duplicate_evidences(self._conn, table_name, table['top_groups'])
+            field_profile = profile['fields']
+            metadata = Metadata(
+                table_name=table_name,
+                table_description=entry.get('table_description', ''),
+                table_spec=TableSpec(rows=table['rows'], columns=table['columns'],
+                                     duplicates=table['duplicates'], evidences=evidences),
+                field_spec=create_field_specs_from_profile(field_profile),
+                data_quality=create_data_quality_assessment(field_profile),
+                partition_columns=entry['partition_columns']
+            )
+            entry['metadata'] = metadata
+            self._bump_version(table_name)
+    
+    @_synchronized
+    @_governed("profiling")
+    def refresh_profile(self, table_name: str, new_rows_source, top_n: int = 5):
+        """Append new rows to a table and fold only their profile into its Metadata
+        
+        Requires the table to have been profiled with profile_tables(..., sketches=True).
+        A file-backed table that is still a view stays lazy: the new rows go to an
+        in-memory {table_name}__appended table and the view becomes its files UNION ALL
+        that table, so the files are neither copied nor re-read. Field statistics are re-derived from the merged sketches (distinct counts and
+        quantiles become estimates, see FieldSpec.accuracy). Duplicates are only
+        counted within the new rows; duplicates spanning old and new rows need a full
+        profile_tables() run.
+        
+        Args:
+            table_name: Profiled table to extend
+            new_rows_source: pandas DataFrame or file path (CSV/parquet, local or S3) with the new rows
+            top_n: Number of most frequent values to keep per field
+        """
         if table_name not in self._tables:
             raise ValueError(f"Table '{table_name}' not found")
         
         metadata = self._tables[table_name]['metadata']
         if metadata is None:
             raise ValueError(f"Table '{table_name}' not profiled. Run profile_tables() first.")
+        if any(field.sketch is None for field in metadata.field_spec):
+            raise ValueError(f"Table '{table_name}' has no profile sketches. Run profile_tables(..., sketches=True) first.")
         
-        # Use the existing method from Metadata class
-        metadata.add_field_descriptions(field_descriptions)
+        delta_name = f"{table_name}__delta"
+        if isinstance(new_rows_source, pd.DataFrame):
+            self._conn.register(delta_name, new_rows_source)
+        elif isinstance(new_rows_source, str):
+            self._conn.execute(f"CREATE OR REPLACE TEMP VIEW {delta_name} AS SELECT * FROM {self._reader(new_rows_source)}")
+        else:
+            raise ValueError(f"Unsupported source type: {type(new_rows_source)}")
+        
+        try:
+            delta_table = sql_table_profile(self._conn, delta_name, collect_evidences=False)
+            delta_sketches = sql_field_sketches(self._conn, delta_name)
+            
+            # Append the new rows to the table itself
+            if self._tables[table_name]['type'] == 'pandas':
+                delta_df = new_rows_source if isinstance(new_rows_source, pd.DataFrame) else self._conn.execute(f"SELECT * FROM {delta_name}").df()
+                dataframe = pd.concat([self._tables[table_name]['dataframe'], delta_df], ignore_index=True)
+                self._conn.register(table_name, dataframe)
+                self._pool.register(table_name, dataframe)
+                with self._registry_lock:
+                    self._tables[table_name]['dataframe'] = dataframe
+            elif self._tables[table_name]['materialized']:
+                self._conn.execute(f"INSERT INTO {table_name} SELECT * FROM {delta_name}")
+            else:
+                self._append_to_view(table_name, delta_name)
+            with self._registry_lock:
+                self._tables[table_name]['revision'] += 1
+                self._tables[table_name]['data_version'] = next(self._versions)
+            if self._result_cache is not None:
+                self._result_cache.invalidate(table_name)
+        finally:
+            if isinstance(new_rows_source, pd.DataFrame):
+                self._conn.unregister(delta_name)
+            else:
+                self._conn.execute(f"DROP VIEW IF EXISTS {delta_name}")
+        
+        field_profile = {}
+        for field in metadata.field_spec:
+            merged = FieldSketch.from_dict(field.sketch).merge(FieldSketch.from_dict(delta_sketches[field.field_name]))
+            field_profile[field.field_name] = merged.to_profile(top_n=top_n)
+            field_profile[field.field_name]['sketch'] = merged.to_dict()
+        
+        field_spec = create_field_specs_from_profile(field_profile, metadata.field_descriptions)
+        for old, new in zip(metadata.field_spec, field_spec):
+            new.description = new.description or old.description
+        
+        self._tables[table_name]['metadata'] = Metadata(
+            table_name=table_name,
+            table_description=metadata.table_description,
+            table_spec=TableSpec(
+                rows=metadata.table_spec.rows + delta_table['rows'],
+                columns=metadata.table_spec.columns,
+                duplicates=metadata.table_spec.duplicates + delta_table['duplicates'],
+                evidences=metadata.table_spec.evidences
+            ),
+            field_spec=field_spec,
+            field_descriptions=metadata.field_descriptions,
+            data_quality=create_data_quality_assessment(field_profile),
+            partition_columns=metadata.partition_columns
+        )
+        self._bump_version(table_name)
     
-    def to_dq_profile(self, table_name: str) -> str:
-        """Format metadata as PROFILE for data quality assessment"""
+    def _append_to_view(self, table_name: str, source: str):
+        """Add rows to a view-backed table, keeping its files as they are"""
+        entry = self._tables[table_name]
+        appended = f"{table_name}__appended"
+        if entry['revision'] == 0:
+            reader = self._reader(entry['path'], entry['format'], entry['hive_partitioning'])
+            self._conn.execute(f"CREATE OR REPLACE TABLE {appended} AS SELECT * FROM {table_name} LIMIT 0")
+            self._conn.execute(f"CREATE OR REPLACE VIEW {table_name} AS SELECT * FROM {reader} UNION ALL SELECT * FROM {appended}")
+        self._conn.execute(f"INSERT INTO {appended} SELECT * FROM {source}")
+    
+    def _bump_version(self, table_name: str):
+        """Mark a table's metadata as changed, invalidating its rendered fragments"""
+        entry = self._tables[table_name]
+        entry['version'] = next(self._versions)
+        entry['rendered'] = {}
+    
+    def table_version(self, table_name: str) -> int:
+        """Version of a table's metadata; changes on profiling, descriptions and relationships"""
+        if table_name not in self._tables:
+            raise ValueError(f"Table '{table_name}' not found")
+        return self._tables[table_name]['version']
+    
+    def _rendered(self, table_name: str, renderer: str, render: Callable[[Metadata], str]) -> str:
+        """Cached fragment of one table for a renderer, re-rendered only after a version bump"""
+        entry = self._tables[table_name]
+        version = entry['version']
+        cached = entry['rendered'].get(renderer)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        text = render(entry['metadata'])
+        entry['rendered'][renderer] = (version, text)
+        return text
+    
+    def _profiled_tables(self, table_names: Union[str, List[str]]) -> List[str]:
+        """Validate that tables exist and are profiled"""
+        if isinstance(table_names, str):
+            table_names = [table_names]
+        for table_name in table_names:
+            if table_name not in self._tables:
+                raise ValueError(f"Table '{table_name}' not found")
+            if self._tables[table_name]['metadata'] is None:
+                raise ValueError(f"Table '{table_name}' not profiled. Run profile_tables() first.")
+        return table_names
+    
+    def add_field_descriptions(self, table_name: str, field_descriptions):
+        """Add field descriptions to a profiled table"""
         if table_name not in self._tables:
             raise ValueError(f"Table '{table_name}' not found")
         
@@ -137,9 +773,18 @@ class DataCatalog:
         if metadata is None:
             raise ValueError(f"Table '{table_name}' not profiled. Run profile_tables() first.")
         
-        if metadata.data_quality is None:
+        # Use the existing method from Metadata class
+        metadata.add_field_descriptions(field_descriptions)
+        self._bump_version(table_name)
+    
+    def to_dq_profile(self, table_name: str) -> str:
+        """Format metadata as PROFILE for data quality assessment"""
+        self._profiled_tables(table_name)
+        if self._tables[table_name]['metadata'].data_quality is None:
             raise ValueError(f"No data quality assessment found for '{table_name}'")
-        
+        return self._rendered(table_name, 'dq_profile', self._render_dq_profile)
+    
+    def _render_dq_profile(self, metadata: Metadata) -> str:
         # Dataset overview
         profile = f"""DATASET: {metadata.table_name}
 DESCRIPTION: {metadata.table_description}
@@ -156,7 +801,8 @@ TOTAL ISSUES: {metadata.data_quality.total_issues}
         for field in metadata.field_spec:
             profile += f"\n{field.field_name} ({field.data_type}):\n"
             profile += f"  Missing: {field.missing_values:,} ({field.missing_values_pct:.1f}%)\n"
-            profile += f"  Unique: {field.unique_values:,} ({field.unique_values_pct:.1f}%)\n"
+            approx = "" if field.is_exact('unique_values') else "~"
+            profile += f"  Unique: {approx}{field.unique_values:,} ({field.unique_values_pct:.1f}%)\n"
             if field.description:
                 profile += f"  Description: {field.description}\n"
         
@@ -193,57 +839,59 @@ TOTAL ISSUES: {metadata.data_quality.total_issues}
         return profile
     
     def get_metadata(self, table_name: str):
-        """Get metadata object for a table"""
+        """Get metadata object for a table
+        
+        Rendered metadata is cached per table version; after editing the returned
+        object in place, call add_field_descriptions or re-profile to refresh it.
+        """
         if table_name not in self._tables:
             raise ValueError(f"Table '{table_name}' not found")
         return self._tables[table_name].get('metadata')
     
+    def category_values(self) -> Dict[str, Dict[str, List]]:
+        """Most frequent values of string fields in profiled tables, {table: {field: values}}"""
+        categories = {}
+        for table_name, entry in self._snapshot().items():
+            if entry.get('metadata') is None:
+                continue
+            categories[table_name] = {field.field_name: list(field.most_frequent.keys())
+                                      for field in entry['metadata'].field_spec
+                                      if field.data_type == 'string' and field.most_frequent}
+        return categories
+    
     def to_guide_metadata(self, table_names: Union[str, List[str]]) -> str:
         """Format metadata for question guidance - handles single or multiple tables"""
-        if isinstance(table_names, str):
-            table_names = [table_names]
-        
-        # Validate all tables exist and are profiled
-        for table_name in table_names:
-            if table_name not in self._tables:
-                raise ValueError(f"Table '{table_name}' not found")
-            metadata = self._tables[table_name]['metadata']
-            if metadata is None:
-                raise ValueError(f"Table '{table_name}' not profiled. Run profile_tables() first.")
-        
-        # Format metadata
-        result = "METADATA:\n\n"
+        table_names = self._profiled_tables(table_names)
+        fragments = [self._rendered(table_name, 'guide', self._render_guide_fragment) for table_name in table_names]
+        return "\n\n".join(["METADATA:"] + fragments).strip()
+    
+    def _render_guide_fragment(self, metadata: Metadata) -> str:
+        header = f"Table: {metadata.table_name}"
+        if metadata.table_description:
+            header += f" ({metadata.table_description})"
+        lines = [header, "Fields:"]
         
-        for table_name in table_names:
-            metadata = self._tables[table_name]['metadata']
-            result += f"Table: {metadata.table_name}"
-            if metadata.table_description:
-                result += f" ({metadata.table_description})"
-            result += "\nFields:\n"
-            
-            for field in metadata.field_spec:
-                result += f"- {field.field_name} ({field.data_type})"
-                if field.description:
-                    result += f": {field.description}"
-                result += "\n"
-                
-                # Add statistics for context
-                if field.data_type in ['float', 'integer'] and field.statistics:
-                    stats = field.statistics
-                    if 'min' in stats and 'max' in stats:
-                        result += f"  Range: {stats['min']} - {stats['max']}"
-                        if 'mean' in stats:
-                            result += f", Average: {stats['mean']:.2f}"
-                        result += "\n"
-                elif field.data_type == 'string' and field.most_frequent:
-                    # Show top values for categorical fields
-                    top_values = list(field.most_frequent.items())[:3]
-                    values_str = ", ".join([f"{k} ({v})" for k, v in top_values])
-                    result += f"  Values: {values_str}\n"
+        for field in metadata.field_spec:
+            line = f"- {field.field_name} ({field.data_type})"
+            if field.description:
+                line += f": {field.description}"
+            lines.append(line)
             
-            result += "\n"
+            # Add statistics for context
+            if field.data_type in ['float', 'integer'] and field.statistics:
+                stats = field.statistics
+                if 'min' in stats and 'max' in stats:
+                    line = f"  Range: {stats['min']} - {stats['max']}"
+                    if 'mean' in stats:
+                        line += f", Average: {stats['mean']:.2f}"
+                    lines.append(line)
+            elif field.data_type == 'string' and field.most_frequent:
+                # Show top values for categorical fields
+                top_values = list(field.most_frequent.items())[:3]
+                values_str = ", ".join([f"{k} ({v})" for k, v in top_values])
+                lines.append(f"  Values: {values_str}")
         
-        return result.strip()
+        return "\n".join(lines)
     
     def add_relationship(self, 
                        foreign_table: str, 
@@ -269,70 +917,62 @@ TOTAL ISSUES: {metadata.data_quality.total_issues}
         if primary_table not in self._tables:
             raise ValueError(f"Primary table '{primary_table}' not found")
         
-        self._relationships.append((foreign_table, foreign_key, primary_table, primary_key))
+        relationship = (foreign_table, foreign_key, primary_table, primary_key)
+        self._relationships.append(relationship)
+        self._relationship_index.setdefault(foreign_table, []).append(relationship)
+        # Relationships are rendered with the foreign table
+        self._bump_version(foreign_table)
     
     def get_table_relationships(self, table_name: str) -> List[tuple]:
         """Get all relationships for a specific table"""
-        return [r for r in self._relationships if r[0] == table_name]
+        return list(self._relationship_index.get(table_name, []))
     
     def to_sql_metadata(self, table_names: Union[str, List[str]]) -> str:
         """Format metadata for SQL generation - handles single or multiple tables"""
-        if isinstance(table_names, str):
-            table_names = [table_names]
-        
-        # Validate all tables exist and are profiled
-        for table_name in table_names:
-            if table_name not in self._tables:
-                raise ValueError(f"Table '{table_name}' not found")
-            metadata = self._tables[table_name]['metadata']
-            if metadata is None:
-                raise ValueError(f"Table '{table_name}' not profiled. Run profile_tables() first.")
+        table_names = self._profiled_tables(table_names)
+        fragments = [self._rendered(table_name, 'sql', self._render_sql_fragment) for table_name in table_names]
+        return "\n\n".join(["METADATAS:"] + fragments).strip()
+    
+    def _render_sql_fragment(self, metadata: Metadata) -> str:
+        lines = [f"Table: {metadata.table_name}"]
+        if metadata.partition_columns:
+            lines.append(f"Partitioned by: {', '.join(metadata.partition_columns)} (filter on these columns to read only matching files)")
         
-        # Format metadata
-        result = "METADATAS:\n\n"
+        # Add relationships if any
+        relationships = self.get_table_relationships(metadata.table_name)
+        if relationships:
+            lines.append("Relationships:")
+            for rel in relationships:
+                lines.append(f"  {rel[1]} -> {rel[2]}.{rel[3]}")
         
-        for table_name in table_names:
-            metadata = self._tables[table_name]['metadata']
-            result += f"Table: {metadata.table_name}\n"
+        lines.append("Columns:")
+        for field in metadata.field_spec:
+            # Column name and type
+            line = f"- {field.field_name} ({field.data_type})"
             
-            # Add relationships if any
-            relationships = self.get_table_relationships(table_name)
-            if relationships:
-                result += "Relationships:\n"
-                for rel in relationships:
-                    result += f"  {rel[1]} -> {rel[2]}.{rel[3]}\n"
+            # Add description if available
+            if field.description:
+                line += f": {field.description}"
             
-            result += "Columns:\n"
-            for field in metadata.field_spec:
-                # Column name and type
-                result += f"- {field.field_name} ({field.data_type})"
-                
-                # Add description if available
-                if field.description:
-                    result += f": {field.description}"
-                
-                # Add nullability info
-                if field.missing_values_pct == 0:
-                    result += ", NOT NULL"
-                elif field.missing_values_pct > 0:
-                    result += f", {field.missing_values_pct:.1f}% NULL"
-                
-                result += "\n"
-                
-                # Add value examples and ranges
-                if field.data_type in ['float', 'integer'] and field.statistics:
-                    stats = field.statistics
-                    if 'min' in stats and 'max' in stats:
-                        result += f"  Range: {stats['min']} - {stats['max']}"
-                        if 'mean' in stats:
-                            result += f", Average: {stats['mean']:.2f}"
-                        result += "\n"
-                elif field.data_type == 'string' and field.most_frequent:
-                    # Show example values for categorical fields
-                    top_values = list(field.most_frequent.keys())[:3]
-                    values_str = '", "'.join(map(str, top_values))
-                    result += f"  Examples: \"{values_str}\"\n"
+            # Add nullability info
+            if field.missing_values_pct == 0:
+                line += ", NOT NULL"
+            elif field.missing_values_pct > 0:
+                line += f", {field.missing_values_pct:.1f}% NULL"
+            lines.append(line)
             
-            result += "\n"
+            # Add value examples and ranges
+            if field.data_type in ['float', 'integer'] and field.statistics:
+                stats = field.statistics
+                if 'min' in stats and 'max' in stats:
+                    line = f"  Range: {stats['min']} - {stats['max']}"
+                    if 'mean' in stats:
+                        line += f", Average: {stats['mean']:.2f}"
+                    lines.append(line)
+            elif field.data_type == 'string' and field.most_frequent:
+                # Show example values for categorical fields
+                top_values = list(field.most_frequent.keys())[:3]
+                values_str = '", "'.join(map(str, top_values))
+                lines.append(f"  Examples: \"{values_str}\"")
         
-        return result.strip()
\ No newline at end of file
+        return "\n".join(lines)
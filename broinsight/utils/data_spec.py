@@ -41,6 +41,12 @@ class FieldSpec(BaseModel):
     most_frequent: dict
     statistics: dict
     description: Optional[str] = None
+    accuracy: dict = {}  # statistic -> {exact, method, error}; absent means exact
+    sketch: Optional[dict] = None  # mergeable profiling state (FieldSketch.to_dict()) for refresh_profile
+    
+    def is_exact(self, statistic: str) -> bool:
+        """Whether a statistic was computed exactly rather than estimated"""
+        return self.accuracy.get(statistic, {}).get('exact', True)
 
 class Metadata(BaseModel):
     table_name: str
@@ -49,6 +55,7 @@ class Metadata(BaseModel):
     field_spec: List[FieldSpec]
     field_descriptions: Optional[FieldDescriptions] = None
     data_quality: Optional[DataQualityAssessment] = None
+    partition_columns: List[str] = []  # hive partition keys; filtering on them skips files
     
     def add_field_descriptions(self, field_descriptions: FieldDescriptions):
         """Add descriptions to fields after initialization"""
@@ -81,7 +88,9 @@ def create_field_specs_from_profile(field_profile: dict, field_descriptions: Opt
             unique_values_pct=profile['unique_values_pct'],
             most_frequent=profile['most_frequent'],
             statistics=profile.get('statistics'),
-            description=description
+            description=description,
+            accuracy=profile.get('accuracy', {}),
+            sketch=profile.get('sketch')
         )
         field_specs.append(field_spec)
     
@@ -0,0 +1,186 @@
+import hashlib
+import os
+import re
+import shutil
+import threading
+import uuid
+from typing import Iterable, List, Optional, Tuple
+
+def split_s3_path(path: str) -> Tuple[str, str]:
+    """Bucket and key of an s3:// path"""
+    bucket, _, key = path[len('s3://'):].partition('/')
+    return bucket, key
+
+def _glob_regex(pattern: str):
+    """Regex for a DuckDB-style glob: * and ? stay within one path segment, ** spans segments"""
+    regex, i = "", 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+            continue
+        if char == "*":
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            end = pattern.find("]", i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                regex += pattern[i:end + 1]
+                i = end
+        else:
+            regex += re.escape(char)
+        i += 1
+    return re.compile(regex + r"\Z")
+
+class ObjectCache:
+    """On-disk, content-addressed cache of S3 objects, bounded in bytes with LRU eviction.
+
+    Each object is stored under a directory named after the hash of its path and
+    ETag, so a changed object is downloaded again while unchanged ones are served
+    locally across sessions and processes. Files keep their bucket/key layout
+    below that directory, so hive-style key=value directories survive. Recency is
+    the file's modification time, touched on every hit; when the cache grows past
+    ``max_bytes`` the least recently used objects are deleted, except those handed
+    out by this instance (they may back registered views) until release() is called.
+    Other sessions sharing the directory do not know about those files, so size a
+    shared cache to hold the working sets of the sessions using it.
+
+    ETags come from one LIST request per glob pattern (or a HEAD per plain path),
+    so a warm cache costs no data transfer. Uses boto3; ``endpoint_url`` points it
+    at an S3-compatible server such as MinIO or moto.
+
+    Usage:
+        cache = ObjectCache("~/.cache/broinsight/s3", max_bytes=20 * 1024**3)
+        local_files = cache.fetch(["s3://bucket/events/*/*.parquet"])
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 10 * 1024**3, aws_configs: Optional[dict] = None,
+                 endpoint_url: Optional[str] = None):
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.directory = os.path.abspath(os.path.expanduser(directory))
+        self.max_bytes = max_bytes
+        self._client_kwargs = dict(aws_configs or {})
+        if endpoint_url:
+            self._client_kwargs['endpoint_url'] = endpoint_url
+        self._client = None
+        self._lock = threading.Lock()
+        self._in_use = set()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('s3', **self._client_kwargs)
+        return self._client
+
+    def resolve(self, paths: Iterable[str]) -> List[Tuple[str, str, int]]:
+        """Expand s3:// paths and glob patterns into sorted (path, etag, size) tuples"""
+        objects = {}
+        for path in paths:
+            bucket, key = split_s3_path(path)
+            if not any(char in key for char in "*?["):
+                head = self.client.head_object(Bucket=bucket, Key=key)
+                objects[path] = (head['ETag'], head['ContentLength'])
+                continue
+            prefix = re.split(r"[*?\[]", key, maxsplit=1)[0]
+            matcher = _glob_regex(key)
+            for page in self.client.get_paginator('list_objects_v2').paginate(Bucket=bucket, Prefix=prefix):
+                for item in page.get('Contents', []):
+                    if matcher.match(item['Key']):
+                        objects[f"s3://{bucket}/{item['Key']}"] = (item['ETag'], item['Size'])
+        return [(path, etag, size) for path, (etag, size) in sorted(objects.items())]
+
+    def local_path(self, path: str, etag: str) -> str:
+        """Location of an object version in the cache"""
+        digest = hashlib.sha256(f"{path}\n{etag}".encode()).hexdigest()[:32]
+        bucket, key = split_s3_path(path)
+        return os.path.join(self.directory, digest, bucket, *key.split('/'))
+
+    def fetch(self, paths: Iterable[str]) -> List[str]:
+        """Local copies of the objects matched by s3:// paths or globs, downloading missing ones
+
+        Raises:
+            ValueError: No object matches the paths
+        """
+        paths = list(paths)
+        objects = self.resolve(paths)
+        if not objects:
+            raise ValueError(f"No objects found for {paths}")
+        local_files = []
+        for path, etag, size in objects:
+            local = self.local_path(path, etag)
+            with self._lock:
+                self._in_use.add(local)
+            if os.path.exists(local):
+                os.utime(local)
+                self.hits += 1
+            else:
+                self._download(path, local)
+                self.misses += 1
+            local_files.append(local)
+        self._evict()
+        return local_files
+
+    def _download(self, path: str, local: str):
+        os.makedirs(os.path.dirname(local), exist_ok=True)
+        partial = f"{local}.{uuid.uuid4().hex}.partial"
+        bucket, key = split_s3_path(path)
+        try:
+            self.client.download_file(bucket, key, partial)
+            os.replace(partial, local)  # atomic: readers never see a half-written object
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def _entries(self) -> List[Tuple[float, int, str, List[str]]]:
+        """(last use, size, directory, files) of every cached object version"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir():
+                continue
+            files = [os.path.join(root, name) for root, _, names in os.walk(entry.path) for name in names
+                     if not name.endswith('.partial')]
+            if files:
+                stats = [os.stat(file) for file in files]
+                entries.append((max(stat.st_mtime for stat in stats), sum(stat.st_size for stat in stats), entry.path, files))
+        return entries
+
+    def _evict(self):
+        """Delete least recently used objects until the cache fits in max_bytes"""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _, _ in entries)
+            for _, size, directory, files in entries:
+                if total <= self.max_bytes:
+                    break
+                if any(file in self._in_use for file in files):
+                    continue
+                # Another process may be evicting the same entry
+                shutil.rmtree(directory, ignore_errors=True)
+                total -= size
+
+    def release(self, local_files: Iterable[str]):
+        """Allow files handed out by fetch() to be evicted again"""
+        with self._lock:
+            self._in_use.difference_update(local_files)
+
+    def stats(self) -> dict:
+        """Size and hit/miss counts of the cache"""
+        with self._lock:
+            entries = self._entries()
+        return {
+            "directory": self.directory,
+            "objects": len(entries),
+            "bytes": sum(size for _, size, _, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -0,0 +1,188 @@
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from broinsight.utils.result_cache import _TOKEN
+
+_DATE = r"\d{4}-\d{2}-\d{2}"
+_NUMBER = r"(?<![\w.])\d+(?:\.\d+)?(?!\w|\.\d)"
+
+def category_index(category_values: Dict[str, Dict[str, Iterable]]) -> Dict[str, Tuple[str, str]]:
+    """Map lowercased category values to (value as stored, slot type naming the columns holding it)
+
+    Args:
+        category_values: {table: {column: values}}, e.g. from a metadata_db's category_values()
+    """
+    columns = {}
+    for table_name, fields in category_values.items():
+        for column, values in fields.items():
+            for value in values:
+                # Single characters (e.g. 'M', 'F') match too many ordinary words to be slots
+                if isinstance(value, str) and len(value.strip()) > 1:
+                    columns.setdefault(value, set()).add(f"{table_name}.{column}".lower())
+    index = {}
+    for value, found_in in columns.items():
+        index.setdefault(value.lower(), (value, "category:" + ",".join(sorted(found_in))))
+    return index
+
+def extract_slots(question: str, categories: Dict[str, Tuple[str, str]]) -> Tuple[str, List[Tuple[str, str]]]:
+    """Split a question into a normalized template and its literal slots.
+
+    Dates (YYYY-MM-DD), category values known from the metadata and numbers are
+    replaced by typed placeholders; the rest is lowercased with whitespace and
+    trailing punctuation normalized. "Average tip on Fri?" and "average tip on Sat"
+    share the template "average tip on {category:tips.day}".
+
+    Returns:
+        (template, [(slot type, value), ...]) with slots in question order
+    """
+    alternatives = [f"(?P<date>{_DATE})"]
+    if categories:
+        values = sorted(categories, key=len, reverse=True)
+        alternatives.append(r"(?P<category>(?<!\w)(?:" + "|".join(re.escape(value) for value in values) + r")(?!\w))")
+    alternatives.append(f"(?P<number>{_NUMBER})")
+    pattern = re.compile("|".join(alternatives), re.IGNORECASE)
+
+    parts, slots, position = [], [], 0
+    for match in pattern.finditer(question):
+        kind, text = match.lastgroup, match.group()
+        if kind == "category":
+            value, kind = categories[text.lower()]
+        else:
+            value = text
+        parts.append(question[position:match.start()].lower())
+        parts.append("{" + kind + "}")
+        slots.append((kind, value))
+        position = match.end()
+    parts.append(question[position:].lower())
+    template = re.sub(r"\s+", " ", "".join(parts)).strip().rstrip("?!. ")
+    return template, slots
+
+# Tokens after which a number is a filter or limit value rather than, say, a rounding precision
+_NUMBER_CONTEXT = {"=", "<", ">", "<=", ">=", "<>", "!=", "limit", "offset", "between", "and", "interval"}
+
+def _literal_matches(kind: str, value: str, token_kind: str, token: str) -> bool:
+    if kind == "number":
+        return token_kind == "number" and float(token) == float(value)
+    return token_kind == "string" and token[1:-1].replace("''", "'") == value
+
+def _render(kind: str, value: str) -> str:
+    if kind == "number":
+        return value
+    return "'{}'".format(value.replace("'", "''"))
+
+def parameterize_sql(sql: str, slots: List[Tuple[str, str]]) -> Optional[list]:
+    """SQL as text segments and slot indexes, or None when the slots cannot be bound safely
+
+    Every slot must appear as a literal in the SQL (string literals for dates and
+    categories, numeric literals compared against, in IN lists or after LIMIT for
+    numbers), numbers exactly once, and no two slots may share a value; otherwise a
+    different question would bind into the wrong place and the plan is not cached.
+    Other numbers, e.g. ROUND(x, 2), are left as they are.
+    """
+    if len({value for _, value in slots}) != len(slots):
+        return None
+    parts, position, found = [], 0, [0] * len(slots)
+    previous, in_list = None, False
+    for match in _TOKEN.finditer(sql):
+        token_kind, token = match.lastgroup, match.group()
+        if token_kind in ("space", "comment"):
+            continue
+        last, previous = previous, token.lower()
+        if token_kind not in ("string", "number"):
+            in_list = (in_list and token != ")") or (last == "in" and token == "(")
+            continue
+        if token_kind == "number" and last not in _NUMBER_CONTEXT and not in_list:
+            continue
+        for index, (kind, value) in enumerate(slots):
+            if _literal_matches(kind, value, token_kind, token):
+                parts.extend([sql[position:match.start()], index])
+                position = match.end()
+                found[index] += 1
+                break
+    parts.append(sql[position:])
+    for (kind, _), count in zip(slots, found):
+        if count == 0 or (kind == "number" and count > 1):
+            return None
+    return parts
+
+def bind_sql(parts: list, slots: List[Tuple[str, str]]) -> str:
+    """Fill a parameterized SQL template with literal values"""
+    return "".join(part if isinstance(part, str) else _render(*slots[part]) for part in parts)
+
+class PlanCache:
+    """In-memory LRU cache of validated NL-to-SQL plans with parameterized literals.
+
+    A plan is stored after its SQL ran successfully: the question is reduced to a
+    template with typed slots (dates, numbers, category values found in the
+    table metadata), the matching literals in the SQL become parameters, and the
+    template maps to that SQL and its selected tables. A later question with the
+    same template is answered by binding its own literals, skipping the table
+    selection and SQL generation calls. Questions whose literals cannot be mapped
+    one to one onto the SQL are not cached.
+
+    Usage:
+        cache = PlanCache()
+        categories = category_index(metadata_db.category_values())
+        cache.store("average tip on Fri", sql, ["tips"], categories)
+        plan = cache.lookup("average tip on Sat", categories)  # (sql, tables) or None
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # template -> (sql parts, tables)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._rejected = 0
+
+    def lookup(self, question: str, categories: Dict[str, Tuple[str, str]]) -> Optional[Tuple[str, List[str]]]:
+        """SQL bound to the question's literals and its selected tables, or None"""
+        template, slots = extract_slots(question, categories)
+        with self._lock:
+            entry = self._entries.get(template)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(template)
+            self._hits += 1
+        parts, tables = entry
+        return bind_sql(parts, slots), list(tables)
+
+    def store(self, question: str, sql: str, tables: List[str], categories: Dict[str, Tuple[str, str]]) -> bool:
+        """Remember the validated SQL of a question; returns whether it could be parameterized"""
+        template, slots = extract_slots(question, categories)
+        parts = parameterize_sql(sql, slots)
+        with self._lock:
+            if parts is None:
+                self._rejected += 1
+                return False
+            self._entries[template] = (parts, tuple(tables))
+            self._entries.move_to_end(template)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def invalidate(self, question: Optional[str] = None, categories: Optional[Dict[str, Tuple[str, str]]] = None):
+        """Forget the plan of a question (e.g. after its SQL failed), or every plan"""
+        with self._lock:
+            if question is None:
+                self._entries.clear()
+                return
+            template, _ = extract_slots(question, categories or {})
+            self._entries.pop(template, None)
+
+    def stats(self) -> dict:
+        """Hit/miss counts since the cache was created"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "rejected": self._rejected
+            }
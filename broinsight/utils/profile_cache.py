@@ -0,0 +1,94 @@
+import duckdb
+import hashlib
+import json
+import os
+import pickle
+import pandas as pd
+from typing import Optional
+from broinsight.utils.data_spec import Metadata
+
+class ProfileCache:
+    """On-disk cache of profiled Metadata, keyed by table name and source fingerprint.
+
+    An entry is only returned while the fingerprint of the source (and the profiling
+    options) still matches the one it was stored with, so changed sources are
+    re-profiled and unchanged ones are served without scanning any data. Metadata is
+    stored pickled, so a hit returns it exactly as profiled (e.g. the integer keys of
+    most_frequent and evidences); only open cache files you wrote yourself.
+
+    Usage:
+        cache = ProfileCache("profile_cache.db")
+        key = cache.make_key(fingerprint, {"mode": "exact"})
+        metadata = cache.get("orders", key)
+        if metadata is None:
+            cache.put("orders", key, profiled_metadata)
+    """
+
+    def __init__(self, path: str = "profile_cache.db"):
+        self.path = path
+        self._conn = duckdb.connect(path)
+        # Entries of the earlier JSON table (profile_cache) are not read; those tables are profiled again
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS profile_cache_v2 (
+                table_name VARCHAR PRIMARY KEY,
+                cache_key VARCHAR,
+                metadata BLOB,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    @staticmethod
+    def make_key(fingerprint: str, options: dict) -> str:
+        """Combine a source fingerprint with the profiling options that shape the result"""
+        payload = json.dumps({"fingerprint": fingerprint, "options": options}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, table_name: str, cache_key: str) -> Optional[Metadata]:
+        """Return cached Metadata if it was stored under the same key, else None"""
+        row = self._conn.execute(
+            "SELECT metadata FROM profile_cache_v2 WHERE table_name = ? AND cache_key = ?",
+            [table_name, cache_key]
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, table_name: str, cache_key: str, metadata: Metadata):
+        """Store Metadata for a table, replacing any stale entry"""
+        self._conn.execute("""
+            INSERT OR REPLACE INTO profile_cache_v2 (table_name, cache_key, metadata, created_at)
+            VALUES (?, ?, ?, now())
+        """, [table_name, cache_key, pickle.dumps(metadata)])
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """Drop the entry for one table, or every entry"""
+        if table_name is None:
+            self._conn.execute("DELETE FROM profile_cache_v2")
+        else:
+            self._conn.execute("DELETE FROM profile_cache_v2 WHERE table_name = ?", [table_name])
+
+    def close(self):
+        self._conn.close()
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame, including its schema"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return digest.hexdigest()
+
+def local_file_fingerprint(path: str) -> str:
+    """Path, size and modification time of a local file"""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+def parquet_footer_fingerprint(conn, path: str) -> str:
+    """Hash of a parquet file's footer metadata (row groups, sizes, statistics) - no data pages are read"""
+    rows = conn.execute(f"SELECT * FROM parquet_metadata('{path}')").fetchall()
+    return hashlib.sha256(repr(rows).encode()).hexdigest()
+
+def s3_etag_fingerprint(path: str, aws_configs: Optional[dict] = None) -> str:
+    """ETag of an S3 object, fetched with a HEAD request"""
+    import boto3
+    bucket, key = path[len('s3://'):].split('/', 1)
+    client = boto3.client('s3', **(aws_configs or {}))
+    head = client.head_object(Bucket=bucket, Key=key)
+    return f"{path}:{head['ETag']}"
@@ -0,0 +1,112 @@
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+from pydantic import BaseModel, Field
+from typing import Dict, Optional
+
+GOVERNED_SETTINGS = ["memory_limit", "threads", "temp_directory", "max_temp_directory_size", "preserve_insertion_order"]
+_UNITS = {"": 1, "b": 1, "kb": 1000, "mb": 1000**2, "gb": 1000**3, "tb": 1000**4,
+          "kib": 1024, "mib": 1024**2, "gib": 1024**3, "tib": 1024**4}
+
+def parse_bytes(size: str) -> int:
+    """Bytes of a DuckDB size string such as "2GB" or "512 MiB" """
+    match = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]*)\s*", str(size))
+    if not match or match.group(2).lower() not in _UNITS:
+        raise ValueError(f"Invalid size: {size}. Use e.g. '2GB' or '512MiB'")
+    return int(float(match.group(1)) * _UNITS[match.group(2).lower()])
+
+class ResourceProfile(BaseModel):
+    """DuckDB resource settings for one kind of work; None leaves a setting at DuckDB's default"""
+    memory_limit: Optional[str] = Field(description="Memory cap, e.g. '2GB'; larger operators spill to temp_directory", default=None)
+    threads: Optional[int] = Field(description="Worker threads", default=None)
+    temp_directory: Optional[str] = Field(description="Directory for spilled intermediates", default=None)
+    max_temp_directory_size: Optional[str] = Field(description="Cap on spilled data, e.g. '20GB'", default=None)
+    preserve_insertion_order: Optional[bool] = Field(description="Keep row order without ORDER BY (costs memory on large results)", default=None)
+
+    def settings(self) -> dict:
+        return {name: value for name, value in self.model_dump().items() if value is not None}
+
+    def split(self, parts: int) -> "ResourceProfile":
+        """Share of this profile for each of ``parts`` processes running side by side"""
+        update = {}
+        if self.threads is not None:
+            update["threads"] = max(1, self.threads // parts)
+        if self.memory_limit is not None:
+            update["memory_limit"] = f"{max(1, parse_bytes(self.memory_limit) // parts // 1000**2)}MB"
+        if self.max_temp_directory_size is not None:
+            update["max_temp_directory_size"] = f"{max(1, parse_bytes(self.max_temp_directory_size) // parts // 1000**2)}MB"
+        return self.model_copy(update=update)
+
+def apply_settings(conn, settings: dict):
+    """SET each setting on a connection (settings apply to its whole database, cursors included)"""
+    for name, value in settings.items():
+        if isinstance(value, bool):
+            conn.execute(f"SET {name} = {'true' if value else 'false'}")
+        elif isinstance(value, int):
+            conn.execute(f"SET {name} = {value}")
+        else:
+            conn.execute(f"SET {name} = '{str(value).replace(chr(39), chr(39) * 2)}'")
+
+def active_limits(conn) -> Dict[str, str]:
+    """Current values of the governed settings on a connection's database"""
+    return {name: str(conn.execute(f"SELECT current_setting('{name}')").fetchone()[0])
+            for name in GOVERNED_SETTINGS}
+
+def default_profiles() -> Dict[str, ResourceProfile]:
+    """Interactive queries on few threads in insertion order; profiling on every core, spilling to disk"""
+    cores = os.cpu_count() or 1
+    return {
+        "query": ResourceProfile(threads=min(4, cores), preserve_insertion_order=True),
+        "profiling": ResourceProfile(threads=cores, preserve_insertion_order=False,
+                                     temp_directory=os.path.join(tempfile.gettempdir(), "broinsight_spill"))
+    }
+
+class ResourceGovernor:
+    """Named DuckDB resource profiles, switched per operation.
+
+    The "query" profile is the resting state of a connection and governs
+    interactive queries; other profiles (e.g. "profiling") are switched on for
+    the duration of an operation and the resting state is restored afterwards.
+    DuckDB applies these settings to the whole database, so queries running on
+    other cursors during a profiling job share its limits; give each catalog on a
+    node its own memory_limit and threads so they add up to what the node has.
+
+    Usage:
+        governor = ResourceGovernor({
+            "query": ResourceProfile(memory_limit="1GB", threads=2),
+            "profiling": ResourceProfile(memory_limit="6GB", threads=8, temp_directory="/mnt/spill"),
+        })
+        catalog = DataCatalog(resource_governor=governor)
+    """
+
+    def __init__(self, profiles: Optional[Dict[str, ResourceProfile]] = None):
+        self.profiles = default_profiles()
+        self.profiles.update(profiles or {})
+        self._lock = threading.Lock()
+
+    def settings(self, name: str) -> dict:
+        """Settings of a profile, with unset values falling back to the resting "query" profile"""
+        if name not in self.profiles:
+            raise ValueError(f"Unknown resource profile: {name}. Use one of {list(self.profiles)}")
+        return {**self.profiles["query"].settings(), **self.profiles[name].settings()}
+
+    def apply(self, conn, name: str = "query") -> Dict[str, str]:
+        """Switch a connection to a profile; settings the profile leaves unset are reset"""
+        settings = self.settings(name)
+        with self._lock:
+            for setting in GOVERNED_SETTINGS:
+                if setting not in settings:
+                    conn.execute(f"RESET {setting}")
+            apply_settings(conn, settings)
+            return active_limits(conn)
+
+    @contextmanager
+    def use(self, conn, name: str):
+        """Run a block under a profile, then return the connection to the "query" profile"""
+        limits = self.apply(conn, name)
+        try:
+            yield limits
+        finally:
+            self.apply(conn, "query")
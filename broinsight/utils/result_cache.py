@@ -0,0 +1,258 @@
+import duckdb
+import re
+import threading
+import pandas as pd
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Strings, quoted identifiers, comments, numbers, words, multi-char operators, single characters
+_TOKEN = re.compile(r"""
+    (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*")
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<space>\s+)
+  | (?P<symbol>::|<>|!=|<=|>=|\|\||.)
+""", re.VERBOSE | re.DOTALL)
+
+# Statements whose result may be served from the cache
+_READ_STATEMENTS = {"select", "with", "from", "values"}
+# Statements that never change data
+_READ_ONLY_STATEMENTS = _READ_STATEMENTS | {"describe", "show", "explain", "summarize"}
+# Functions whose result changes between runs or that read outside the catalog's tables
+_VOLATILE = re.compile(
+    r"\b(random|uuid|gen_random_uuid|setseed|nextval|currval|now|today|current_date|current_time|"
+    r"current_timestamp|get_current_time|get_current_timestamp|localtime|localtimestamp|"
+    r"read_\w+|glob|parquet_\w+|sniff_csv|getenv)\b"
+)
+
+def _tokens(sql: str) -> List[Tuple[str, str]]:
+    tokens = []
+    for match in _TOKEN.finditer(sql):
+        kind = match.lastgroup
+        if kind in ("space", "comment"):
+            continue
+        text = match.group()
+        if kind == "word":
+            # Keywords and unquoted identifiers are case-insensitive in DuckDB
+            text = text.lower()
+        tokens.append((kind, text))
+    return tokens
+
+def _sort_in_lists(tokens: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Order the items of IN (...) lists that hold only literals"""
+    result, i = [], 0
+    while i < len(tokens):
+        result.append(tokens[i])
+        if tokens[i] == ("word", "in") and i + 1 < len(tokens) and tokens[i + 1] == ("symbol", "("):
+            end = i + 2
+            while end < len(tokens) and tokens[end] != ("symbol", ")"):
+                end += 1
+            items = tokens[i + 2:end]
+            values, separators = items[0::2], items[1::2]
+            if (end < len(tokens) and values
+                    and all(kind in ("string", "number") for kind, _ in values)
+                    and all(separator == ("symbol", ",") for separator in separators)
+                    and len(separators) == len(values) - 1):
+                ordered = sorted(set(values), key=lambda token: (token[0], token[1]))
+                result.append(tokens[i + 1])
+                for position, value in enumerate(ordered):
+                    if position:
+                        result.append(("symbol", ","))
+                    result.append(value)
+                result.append(tokens[end])
+                i = end + 1
+                continue
+        i += 1
+    return result
+
+def normalize_sql(sql: str) -> str:
+    """Canonical text of a query for cache lookups.
+
+    Comments and whitespace are dropped, keywords and unquoted identifiers are
+    lowercased, trailing semicolons are removed and the literals of ``IN (...)``
+    lists are sorted (and deduplicated), so queries that differ only in those
+    respects share one cache entry. String literals and quoted identifiers are
+    kept as written.
+    """
+    tokens = _tokens(sql)
+    while tokens and tokens[-1] == ("symbol", ";"):
+        tokens.pop()
+    return " ".join(text for _, text in _sort_in_lists(tokens))
+
+def is_cacheable(normalized_sql: str) -> bool:
+    """Whether a normalized query is a read whose result depends only on table contents"""
+    first = normalized_sql.split(" ", 1)[0]
+    return first in _READ_STATEMENTS and ";" not in normalized_sql and not _VOLATILE.search(normalized_sql)
+
+def may_write(normalized_sql: str) -> bool:
+    """Whether a normalized statement may change data, making cached results stale"""
+    return normalized_sql.split(" ", 1)[0] not in _READ_ONLY_STATEMENTS or ";" in normalized_sql
+
+def _view_query(create_sql: str) -> str:
+    """The SELECT of a CREATE VIEW statement (text after its top-level AS)"""
+    depth = 0
+    for match in _TOKEN.finditer(create_sql):
+        text = match.group()
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif depth == 0 and match.lastgroup == "word" and text.lower() == "as":
+            return create_sql[match.end():].strip().rstrip(";")
+    return ""
+
+def view_dependencies(conn, tables: Iterable[str], managed: Iterable[str] = ()) -> Set[str]:
+    """Lowercased names a query reads, plus the tables below any views among them, recursively.
+
+    Views in ``managed`` (e.g. a catalog's file-backed tables, versioned themselves)
+    are not expanded. Results over a view are then keyed by the versions of its
+    base tables, so they go stale when those tables change.
+    """
+    managed = {name.lower() for name in managed}
+    views = {name.lower(): sql for name, sql in conn.execute(
+        "SELECT view_name, sql FROM duckdb_views() WHERE NOT internal AND NOT temporary").fetchall()}
+    found, pending = set(), [name.lower() for name in tables]
+    while pending:
+        name = pending.pop()
+        if name in found:
+            continue
+        found.add(name)
+        if name in views and name not in managed:
+            try:
+                pending.extend(duckdb.get_table_names(_view_query(views[name])))
+            except Exception:
+                pass
+    return found
+
+class ResultCache:
+    """In-memory LRU cache of query results stored as Arrow tables, bounded in bytes.
+
+    Entries are keyed by normalized SQL together with the versions of the tables
+    the query reads, so a re-registered table never serves results of its old
+    contents; ``invalidate`` additionally frees those entries right away. Results
+    larger than the whole budget are not cached. Requires pyarrow.
+
+    Usage:
+        cache = ResultCache(max_bytes=256 * 1024**2)
+        key = cache.make_key(sql, {"orders": 3}, max_rows=100)
+        df = cache.get(key)
+        if df is None:
+            df = run(sql)
+            cache.put(key, df, tables=["orders"])
+    """
+
+    def __init__(self, max_bytes: int = 256 * 1024**2):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("pyarrow is required for the query result cache. Install it with: pip install pyarrow")
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (arrow table, attrs, tables, nbytes)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(sql: str, table_versions: Dict[str, int], **options) -> tuple:
+        """Cache key of a query: normalized SQL, versions of the tables it reads, fetch options"""
+        return (normalize_sql(sql), tuple(sorted(table_versions.items())), tuple(sorted(options.items())))
+
+    def get(self, key: tuple) -> Optional[pd.DataFrame]:
+        """Return a fresh DataFrame of the cached result, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        table, attrs, _, _ = entry
+        df = table.to_pandas()
+        df.attrs.update(attrs)
+        return df
+
+    def put(self, key: tuple, df: pd.DataFrame, tables: Iterable[str] = ()):
+        """Store a result, evicting least recently used entries to stay within max_bytes"""
+        import pyarrow as pa
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            # Object columns Arrow cannot represent (e.g. mixed types) are simply not cached
+            return
+        nbytes = table.nbytes
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[3]
+            self._entries[key] = (table, dict(df.attrs), frozenset(name.lower() for name in tables), nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[3]
+                self._evictions += 1
+
+    def run(self, sql: str, execute: Callable[[], pd.DataFrame],
+            table_versions: Callable[[Iterable[str]], Dict[str, int]], **options) -> pd.DataFrame:
+        """Serve a query from the cache, or execute it and cache the result.
+
+        Args:
+            sql: The query
+            execute: Runs the query and returns its DataFrame
+            table_versions: Maps the names of the tables a query reads to the versions of
+                everything its result depends on
+            **options: Fetch options that shape the result (e.g. max_rows), part of the key
+
+        Statements that may write data are executed and clear the whole cache.
+        """
+        normalized = normalize_sql(sql)
+        if not is_cacheable(normalized):
+            df = execute()
+            if may_write(normalized):
+                self.invalidate()
+            return df
+        try:
+            tables = duckdb.get_table_names(sql)
+        except Exception:
+            # Not parseable here: let the query itself report the problem
+            return execute()
+        versions = table_versions(tables)
+        key = self.make_key(normalized, versions, **options)
+        df = self.get(key)
+        if df is None:
+            df = execute()
+            # Versions may cover more than the names in the SQL (e.g. tables below a view)
+            self.put(key, df, versions.keys())
+        return df
+
+    def invalidate(self, table_name: Optional[str] = None):
+        """Drop the entries that read a table, or every entry"""
+        with self._lock:
+            if table_name is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            table_name = table_name.lower()
+            for key in [key for key, entry in self._entries.items() if table_name in entry[2]]:
+                self._bytes -= self._entries.pop(key)[3]
+
+    def stats(self) -> dict:
+        """Hit/miss counts and memory use since the cache was created"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions
+            }
@@ -0,0 +1,93 @@
+import duckdb
+import math
+import threading
+import pandas as pd
+from typing import Iterator, Optional
+
+# DuckDB hands results out in vectors of 2048 rows
+VECTOR_SIZE = 2048
+
+def iter_result_chunks(result, batch_rows: int = 100_000) -> Iterator[pd.DataFrame]:
+    """Yield a DuckDB result as DataFrame chunks of about batch_rows rows"""
+    vectors = max(1, math.ceil(batch_rows / VECTOR_SIZE))
+    while True:
+        chunk = result.fetch_df_chunk(vectors)
+        if len(chunk) == 0:
+            return
+        yield chunk
+
+def record_batch_reader(result, batch_rows: int = 100_000):
+    """Return a DuckDB result as a pyarrow RecordBatchReader (requires pyarrow)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("pyarrow is required for Arrow streaming. Install it with: pip install pyarrow")
+    return result.fetch_record_batch(batch_rows)
+
+def fetch_capped(conn, sql: str, max_rows: Optional[int] = None, max_bytes: Optional[int] = None,
+                 batch_rows: int = 100_000, timeout: Optional[float] = None, count_total: bool = True) -> pd.DataFrame:
+    """Execute a query and fetch at most max_rows rows / max_bytes of DataFrame memory.
+
+    The returned DataFrame carries the full result size in ``df.attrs['total_rows']``
+    and whether it was cut short in ``df.attrs['truncated']``. When the cap is hit, the
+    total is counted with a separate COUNT(*) over the query, so the remaining rows are
+    never materialized, but the query is executed a second time; with
+    ``count_total=False`` that is skipped and a truncated result has total_rows None.
+
+    With ``timeout`` (seconds), the query is stopped with ``conn.interrupt()`` once the
+    time is up and TimeoutError is raised. The connection must not be shared with other
+    threads meanwhile, as the interrupt applies to whatever it is running.
+    """
+    if timeout is None:
+        return _fetch_capped(conn, sql, max_rows, max_bytes, batch_rows, count_total)
+    timer = threading.Timer(timeout, conn.interrupt)
+    timer.daemon = True
+    timer.start()
+    try:
+        return _fetch_capped(conn, sql, max_rows, max_bytes, batch_rows, count_total)
+    except duckdb.InterruptException:
+        if timer.is_alive():
+            raise  # interrupted by someone else
+        raise TimeoutError(f"Query exceeded the {timeout}s time limit and was interrupted")
+    finally:
+        timer.cancel()
+
+def _fetch_capped(conn, sql: str, max_rows: Optional[int], max_bytes: Optional[int], batch_rows: int,
+                  count_total: bool) -> pd.DataFrame:
+    result = conn.execute(sql)
+    if max_rows is None and max_bytes is None:
+        df = result.fetch_df()
+        df.attrs.update(total_rows=len(df), truncated=False)
+        return df
+
+    if max_rows is not None:
+        batch_rows = min(batch_rows, max(max_rows, 1))
+    chunks, rows, size, truncated = [], 0, 0, False
+    for chunk in iter_result_chunks(result, batch_rows):
+        if max_rows is not None and rows + len(chunk) > max_rows:
+            chunk = chunk.iloc[:max_rows - rows]
+            truncated = True
+        chunk_bytes = int(chunk.memory_usage(deep=True).sum())
+        if max_bytes is not None and size + chunk_bytes > max_bytes:
+            # Keep as many rows as fit, estimated from the chunk's average row size
+            keep = int((max_bytes - size) / (chunk_bytes / len(chunk)))
+            chunk = chunk.iloc[:keep]
+            chunk_bytes = int(chunk.memory_usage(deep=True).sum())
+            truncated = True
+        chunks.append(chunk)
+        rows += len(chunk)
+        size += chunk_bytes
+        if truncated or (max_rows is not None and rows >= max_rows):
+            truncated = truncated or result.fetch_df_chunk(1).shape[0] > 0
+            break
+
+    if chunks:
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=[desc[0] for desc in result.description])
+    total_rows = rows
+    if truncated:
+        # The query goes on lines of its own, so a trailing -- comment cannot swallow the closing parenthesis
+        total_rows = conn.execute(f"SELECT COUNT(*) FROM (\n{sql.strip().rstrip(';')}\n)").fetchone()[0] if count_total else None
+    df.attrs.update(total_rows=total_rows, truncated=truncated)
+    return df
@@ -0,0 +1,132 @@
+import json
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from broinsight.utils.result_cache import _tokens, may_write, normalize_sql
+
+# Joins whose output can grow to the product of their inputs
+CROSS_JOIN_OPERATORS = {"CROSS_PRODUCT", "NESTED_LOOP_JOIN", "BLOCKWISE_NL_JOIN", "POSITIONAL_JOIN"}
+
+def explain_plan(conn, sql: str) -> List[dict]:
+    """Bind and plan a query without running it; returns the physical plan as JSON nodes
+
+    Raises the same DuckDB errors (syntax, missing tables/columns, types) the query
+    itself would raise on execution.
+    """
+    rows = conn.execute(f"EXPLAIN (FORMAT JSON) {sql.strip().rstrip(';')}").fetchall()
+    return json.loads(rows[0][1])
+
+def _cardinality(node: dict) -> Optional[int]:
+    value = node.get("extra_info", {}).get("Estimated Cardinality")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _estimate(node: dict, found: dict) -> int:
+    """Estimated output rows of a plan node, recording cross joins and the largest scan"""
+    children = [_estimate(child, found) for child in node.get("children", [])]
+    estimate = _cardinality(node)
+    if node["name"] in CROSS_JOIN_OPERATORS and len(children) == 2:
+        product = children[0] * children[1]
+        found["cross_joins"].append({"operator": node["name"], "left_rows": children[0],
+                                     "right_rows": children[1], "product_rows": product})
+        estimate = estimate if estimate is not None else product
+    if "SCAN" in node["name"] or node["name"] in ("READ_PARQUET", "READ_CSV_AUTO", "READ_CSV"):
+        found["max_scan_rows"] = max(found["max_scan_rows"], estimate or 0)
+    if estimate is None:
+        estimate = max(children) if children else 0
+    return estimate
+
+def has_top_level_limit(sql: str) -> bool:
+    """Whether the outermost query already has a LIMIT or FETCH FIRST/NEXT clause"""
+    depth = 0
+    for kind, text in _tokens(sql):
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif depth == 0 and kind == "word" and text in ("limit", "fetch"):
+            return True
+    return False
+
+class PreflightReport(BaseModel):
+    sql: str = Field(description="SQL to execute, after any rewrite")
+    passed: bool = Field(description="Whether the SQL may be executed")
+    reason: Optional[str] = Field(description="Rejection code: not_read_only, invalid_sql, cross_join or scan_too_large", default=None)
+    message: str = Field(description="Explanation of the rejection, phrased for the SQL author", default="")
+    estimated_rows: Optional[int] = Field(description="Estimated result rows from the plan", default=None)
+    max_scan_rows: Optional[int] = Field(description="Estimated rows of the largest table scan", default=None)
+    cross_joins: List[dict] = Field(description="Cross joins in the plan with their estimated sizes", default_factory=list)
+    rewrites: List[str] = Field(description="Rewrites applied to the SQL", default_factory=list)
+
+    def error(self) -> str:
+        """One-line structured reason, suitable for Shared.error_log"""
+        detail = f" (estimated rows: {self.estimated_rows:,})" if self.estimated_rows is not None else ""
+        return f"PREFLIGHT {self.reason}: {self.message}{detail}"
+
+class PreflightError(ValueError):
+    """Raised when pre-flight checks reject a query; carries the PreflightReport"""
+    def __init__(self, report: PreflightReport):
+        super().__init__(report.error())
+        self.report = report
+
+class SQLGuard:
+    """Pre-flight checks for generated SQL, based on the query plan rather than execution.
+
+    The query is bound and planned with EXPLAIN, which catches syntax and binding
+    errors without touching data and yields DuckDB's cardinality estimates. Queries
+    are rejected when they may write data, cross join more than
+    ``max_cross_join_rows`` rows, or scan more than ``max_scan_rows`` rows;
+    queries expected to return more than ``limit_rows`` rows without a LIMIT (or FETCH) get
+    one appended. ``timeout_seconds`` is the execution budget the caller should
+    enforce (Retrieve passes it on to execute_query, which interrupts the query).
+
+    Usage:
+        guard = SQLGuard(max_cross_join_rows=10_000_000)
+        report = guard.check(catalog, sql)
+        if report.passed:
+            df = catalog.query(report.sql, timeout=guard.timeout_seconds)
+    """
+
+    def __init__(self, max_cross_join_rows: Optional[int] = 10_000_000, max_scan_rows: Optional[int] = None,
+                 limit_rows: Optional[int] = 1_000_000, timeout_seconds: Optional[float] = 60.0):
+        self.max_cross_join_rows = max_cross_join_rows
+        self.max_scan_rows = max_scan_rows
+        self.limit_rows = limit_rows
+        self.timeout_seconds = timeout_seconds
+
+    def check(self, db, sql: str) -> PreflightReport:
+        """Validate and possibly rewrite a query against a database exposing explain(sql)"""
+        sql = sql.strip().rstrip(';').strip()
+        if may_write(normalize_sql(sql)):
+            return PreflightReport(sql=sql, passed=False, reason="not_read_only",
+                                   message="Only a single SELECT query is allowed")
+        try:
+            plan = db.explain(sql)
+        except Exception as e:
+            # Drop DuckDB's caret excerpt, which quotes the EXPLAIN wrapper rather than the query
+            message = str(e).split("\n\nLINE ")[0]
+            return PreflightReport(sql=sql, passed=False, reason="invalid_sql", message=message)
+
+        found = {"cross_joins": [], "max_scan_rows": 0}
+        estimated_rows = max((_estimate(node, found) for node in plan), default=0)
+        report = PreflightReport(sql=sql, passed=True, estimated_rows=estimated_rows,
+                                 max_scan_rows=found["max_scan_rows"], cross_joins=found["cross_joins"])
+
+        if self.max_cross_join_rows is not None:
+            for join in found["cross_joins"]:
+                if join["product_rows"] > self.max_cross_join_rows:
+                    report.passed, report.reason = False, "cross_join"
+                    report.message = (f"Cross join of {join['left_rows']:,} x {join['right_rows']:,} rows exceeds "
+                                      f"{self.max_cross_join_rows:,}; join on matching key columns instead")
+                    return report
+        if self.max_scan_rows is not None and found["max_scan_rows"] > self.max_scan_rows:
+            report.passed, report.reason = False, "scan_too_large"
+            report.message = (f"Scan of {found['max_scan_rows']:,} rows exceeds {self.max_scan_rows:,}; "
+                              "filter or aggregate on fewer rows")
+            return report
+
+        if self.limit_rows is not None and estimated_rows > self.limit_rows and not has_top_level_limit(sql):
+            report.sql = f"{sql}\nLIMIT {self.limit_rows}"
+            report.rewrites.append(f"Added LIMIT {self.limit_rows} (estimated {estimated_rows:,} rows)")
+        return report
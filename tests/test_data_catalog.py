@@ -0,0 +1,145 @@
+import sys
+import threading
+
+import pandas as pd
+import pytest
+from broinsight.utils.data_catalog import DataCatalog
+
+
+@pytest.fixture
+def csv_files(tmp_path):
+    first = tmp_path / "first.csv"
+    second = tmp_path / "second.csv"
+    pd.DataFrame({"a": [1, 2, 3]}).to_csv(first, index=False)
+    pd.DataFrame({"a": [10, 20]}).to_csv(second, index=False)
+    return str(first), str(second)
+
+
+@pytest.mark.parametrize("first_policy, second_policy", [
+    (True, True),
+    (True, False),
+    (False, True),
+    ("on_first_use", False),
+    ("on_first_use", True),
+])
+def test_reregister_file_source_replaces_existing_object(csv_files, first_policy, second_policy):
+    catalog = DataCatalog(result_cache_bytes=1024**2)
+    catalog.create_table("t", csv_files[0], materialize=first_policy)
+    assert catalog.query("SELECT SUM(a) AS total FROM t")["total"][0] == 6
+
+    catalog.create_table("t", csv_files[1], materialize=second_policy)
+    assert catalog.query("SELECT SUM(a) AS total FROM t")["total"][0] == 30
+
+
+def test_reregister_after_refresh_profile(csv_files):
+    catalog = DataCatalog()
+    catalog.create_table("t", csv_files[0])
+    catalog.profile_tables(["t"], sketches=True)
+    catalog.refresh_profile("t", pd.DataFrame({"a": [4]}))
+    assert catalog.query("SELECT SUM(a) AS total FROM t")["total"][0] == 10
+
+    catalog.create_table("t", csv_files[1])
+    assert catalog.query("SELECT SUM(a) AS total FROM t")["total"][0] == 30
+
+
+def test_refresh_profile_keeps_file_table_lazy(csv_files):
+    catalog = DataCatalog()
+    catalog.create_table("t", csv_files[0])
+    catalog.profile_tables(["t"], sketches=True)
+    catalog.refresh_profile("t", pd.DataFrame({"a": [4]}))
+    catalog.refresh_profile("t", csv_files[1])
+
+    assert catalog.query("SELECT SUM(a) AS total FROM t")["total"][0] == 40
+    assert catalog.get_metadata("t").table_spec.rows == 6
+    assert not catalog._tables["t"]["materialized"]
+    assert catalog.query("SELECT COUNT(*) AS n FROM duckdb_views() WHERE view_name = 't'")["n"][0] == 1
+
+    catalog.materialize("t")
+    assert catalog.query("SELECT SUM(a) AS total FROM t")["total"][0] == 40
+    assert catalog.query("SELECT COUNT(*) AS n FROM duckdb_tables() WHERE table_name = 't__appended'")["n"][0] == 0
+
+
+def test_reregister_dataframe_over_materialized_table(csv_files):
+    catalog = DataCatalog()
+    catalog.create_table("t", csv_files[0], materialize=True)
+    catalog.create_table("t", pd.DataFrame({"a": [100]}))
+    assert catalog.query("SELECT SUM(a) AS total FROM t")["total"][0] == 100
+
+
+def test_reregister_dataframe_name_as_file(csv_files):
+    catalog = DataCatalog()
+    catalog.create_table("t", pd.DataFrame({"a": [7, 8]}))
+    catalog.create_table("t", csv_files[0])
+
+    assert catalog.query("SELECT COUNT(*) AS n FROM t")["n"][0] == 3
+    catalog.profile_tables(["t"])
+    assert catalog.get_metadata("t").table_spec.rows == 3
+
+
+def test_result_cache_follows_views_to_their_base_tables(csv_files):
+    catalog = DataCatalog(result_cache_bytes=1024**2)
+    catalog.create_table("t", csv_files[0])
+    catalog.query("CREATE VIEW v AS SELECT * FROM t")
+    catalog.query("CREATE VIEW w AS SELECT a * 2 AS b FROM v")
+    assert catalog.query("SELECT SUM(a) AS total FROM v")["total"][0] == 6
+    assert catalog.query("SELECT SUM(b) AS total FROM w")["total"][0] == 12
+
+    catalog.create_table("t", csv_files[1])
+    assert catalog.query("SELECT SUM(a) AS total FROM v")["total"][0] == 30
+    assert catalog.query("SELECT SUM(b) AS total FROM w")["total"][0] == 60
+    assert catalog.query("SELECT SUM(b) AS total FROM w")["total"][0] == 60
+    assert catalog.result_cache_stats()["hits"] == 1
+
+
+def test_profile_cache_hit_returns_metadata_as_profiled(tmp_path):
+    path = tmp_path / "orders.csv"
+    pd.DataFrame({"id": [0, 1, 1, 2, 2], "city": ["a", "b", "b", "c", "c"]}).to_csv(path, index=False)
+    cache = str(tmp_path / "profile_cache.db")
+
+    cold = DataCatalog(profile_cache=cache)
+    cold.create_table("orders", str(path))
+    cold.profile_tables(["orders"])
+    profiled = cold.get_metadata("orders")
+    cold.close()
+
+    warm = DataCatalog(profile_cache=cache)
+    warm.create_table("orders", str(path))
+    warm.profile_tables(["orders"])
+    cached = warm.get_metadata("orders")
+    warm.close()
+
+    assert cached is not profiled
+    assert cached.table_spec.evidences and 1 in cached.field_spec[0].most_frequent
+    assert cached.model_dump() == profiled.model_dump()
+
+
+def test_queries_run_while_tables_are_registered(csv_files):
+    catalog = DataCatalog(result_cache_bytes=1024**2)
+    catalog.create_table("t", csv_files[0])
+    errors = []
+
+    def register():
+        for i in range(200):
+            catalog.create_table(f"r{i}", pd.DataFrame({"a": [i]}), materialize="on_first_use")
+
+    def query():
+        try:
+            while registering.is_alive():
+                assert catalog.query("SELECT SUM(a) AS total FROM t")["total"][0] == 6
+                catalog.category_values()
+        except Exception as e:
+            errors.append(e)
+
+    registering = threading.Thread(target=register)
+    threads = [registering] + [threading.Thread(target=query) for _ in range(4)]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads often, so registrations land mid-iteration
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
+    assert len(catalog.list_tables()) == 201
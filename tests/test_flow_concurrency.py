@@ -0,0 +1,120 @@
+"""Many sessions running one prebuilt flow at once must each follow their own route."""
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+from broprompt import Prompt
+
+from broinsight.actions.interface import Shared
+from broinsight.flow import get_async_flow, get_flow
+from broinsight.metadata.metadata_db import DuckConnector
+
+SESSIONS = 300
+ORGANIZE = Prompt.from_markdown("broinsight/prompt_hub/organize.md").str
+SELECT_METADATA = Prompt.from_markdown("broinsight/prompt_hub/select_metadata.md").str
+GENERATE_SQL = Prompt.from_markdown("broinsight/prompt_hub/generate_sql.md").str
+TOKENS = {"input": 1, "output": 1}
+
+# Session kinds, by i % 4, and the actions each must run through
+ROUTES = [
+    ["Organize", "GuideQuestion"],
+    ["Organize", "Chat"],
+    ["Organize", "SelectMetadata", "GenerateSQL", "Retrieve", "Chat"],
+    ["Organize", "SelectMetadata", "GenerateSQL", "Retrieve", "GenerateSQL", "Retrieve", "Chat"],
+]
+
+
+def answer(system_prompt, messages):
+    prompt = messages[-1]["content"]
+    if system_prompt == ORGANIZE and "fail organize" in prompt:
+        raise RuntimeError("model unavailable")
+    if system_prompt == ORGANIZE:
+        direct_to = "guide" if "guide me" in prompt else "chat" if "hello" in prompt else "query"
+        return {"content": f"```yaml\ndirect_to: {direct_to}\n```", "tokens": TOKENS}
+    if system_prompt == SELECT_METADATA:
+        return {"content": "```yaml\ntables:\n  - t\n```", "tokens": TOKENS}
+    if system_prompt == GENERATE_SQL:
+        number = prompt.split("QN=")[1].split()[0]
+        # BAD sessions first produce a broken query, forcing a Retrieve -> GenerateSQL retry
+        if "BAD" in prompt and "avoid the below errors" not in prompt:
+            return {"content": "```sql\nSELECT missing_column FROM t\n```", "tokens": TOKENS}
+        return {"content": f"```sql\nSELECT {number} AS n FROM t LIMIT 1\n```", "tokens": TOKENS}
+    return {"content": "answer", "tokens": TOKENS}
+
+
+class FakeModel:
+    def UserMessage(self, text):
+        return {"role": "user", "content": text}
+
+    def AIMessage(self, text):
+        return {"role": "assistant", "content": text}
+
+    def run(self, system_prompt, messages):
+        time.sleep(random.uniform(0, 0.005))
+        return answer(system_prompt, messages)
+
+    async def run_async(self, system_prompt, messages):
+        await asyncio.sleep(random.uniform(0, 0.005))
+        return answer(system_prompt, messages)
+
+
+@pytest.fixture(scope="module")
+def db(tmp_path_factory):
+    connector = DuckConnector(metadata_db_path=str(tmp_path_factory.mktemp("meta") / "metadata.db"))
+    connector.register_dataframe(pd.DataFrame({"a": [1, 2, 3]}), "t")
+    yield connector
+    connector.close()
+
+
+def make_sessions(db):
+    questions = ["guide me", "hello there", "rows QN={i}", "rows QN={i} BAD"]
+    return [
+        Shared(model=None, messages=[{"role": "user", "content": questions[i % 4].format(i=i)}], db=db, metadata_db=db)
+        for i in range(SESSIONS)
+    ]
+
+
+def assert_routes(sessions):
+    for i, shared in enumerate(sessions):
+        actions = [log["action"].removeprefix("Async") for log in shared.session_logger.logs]
+        assert actions == ROUTES[i % 4], f"session {i}"
+        if i % 4 >= 2:
+            assert int(shared.query_result["n"][0]) == i
+
+
+def test_threads_share_one_flow(db):
+    flow = get_flow(FakeModel())
+    sessions = make_sessions(db)
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        list(executor.map(flow.run, sessions))
+    assert_routes(sessions)
+
+
+def test_asyncio_sessions_share_one_flow(db):
+    flow = get_async_flow(FakeModel())
+    sessions = make_sessions(db)
+
+    async def run_all():
+        await asyncio.gather(*(flow.run_async(shared) for shared in sessions))
+
+    asyncio.run(run_all())
+    assert_routes(sessions)
+
+
+def test_failed_organize_routes_alike_after_guide_turn(db):
+    """A failed Organize must not reuse the previous turn's route, in either flow"""
+    def turns(run):
+        shared = Shared(model=None, messages=[{"role": "user", "content": "guide me"}], db=db, metadata_db=db)
+        run(shared)
+        first_turn = len(shared.session_logger.logs)
+        shared.messages.append({"role": "user", "content": "fail organize"})
+        run(shared)
+        return [(log["action"].removeprefix("Async"), log["status"]) for log in shared.session_logger.logs[first_turn:]]
+
+    async_flow = get_async_flow(FakeModel())
+    sync_route = turns(get_flow(FakeModel()).run)
+    async_route = turns(lambda shared: asyncio.run(async_flow.run_async(shared)))
+    assert sync_route == async_route == [("Organize", "failed"), ("Chat", "success")]
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from broinsight.metadata.metadata_db import DuckConnector
+
+
+def test_result_cache_follows_views_to_registered_dataframes(tmp_path):
+    db = DuckConnector(metadata_db_path=str(tmp_path / "metadata.db"), result_cache_bytes=1024**2)
+    db.register_dataframe(pd.DataFrame({"a": [1, 2, 3]}), "t")
+    db.execute_query("CREATE VIEW v AS SELECT * FROM t")
+    assert db.execute_query("SELECT SUM(a) AS total FROM v")["total"][0] == 6
+
+    db.register_dataframe(pd.DataFrame({"a": [10, 20]}), "t")
+    assert db.execute_query("SELECT SUM(a) AS total FROM v")["total"][0] == 30
+    db.close()
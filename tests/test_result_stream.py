@@ -0,0 +1,33 @@
+import duckdb
+import pytest
+
+from broinsight.utils.result_stream import fetch_capped
+
+
+@pytest.fixture
+def conn():
+    conn = duckdb.connect()
+    conn.execute("CREATE TABLE t AS SELECT range AS a FROM range(1000)")
+    yield conn
+    conn.close()
+
+
+def test_total_rows_counted_when_truncated(conn):
+    df = fetch_capped(conn, "SELECT a FROM t;", max_rows=10)
+    assert len(df) == 10
+    assert df.attrs == {"total_rows": 1000, "truncated": True}
+
+
+def test_total_rows_counted_for_query_ending_in_comment(conn):
+    df = fetch_capped(conn, "SELECT a FROM t WHERE a < 500 -- first half", max_rows=10)
+    assert len(df) == 10
+    assert df.attrs == {"total_rows": 500, "truncated": True}
+
+
+def test_total_rows_count_can_be_skipped(conn):
+    df = fetch_capped(conn, "SELECT a FROM t", max_rows=10, count_total=False)
+    assert len(df) == 10
+    assert df.attrs == {"total_rows": None, "truncated": True}
+
+    df = fetch_capped(conn, "SELECT a FROM t LIMIT 5", max_rows=10, count_total=False)
+    assert df.attrs == {"total_rows": 5, "truncated": False}
@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from broinsight.metadata.metadata_db import DuckConnector
+from broinsight.utils.sql_guard import SQLGuard
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DuckConnector(metadata_db_path=str(tmp_path / "metadata.db"))
+    db.register_dataframe(pd.DataFrame({"a": range(1_000)}), "t")
+    yield db
+    db.close()
+
+
+def test_limit_added_to_large_results(db):
+    report = SQLGuard(limit_rows=10).check(db, "SELECT a FROM t -- every row")
+    assert report.passed and report.rewrites
+    assert len(db.execute_query(report.sql)) == 10
+
+
+@pytest.mark.parametrize("sql, rows", [
+    ("SELECT a FROM t LIMIT 100", 100),
+    ("SELECT a FROM t FETCH FIRST 100 ROWS ONLY", 100),
+    ("SELECT a FROM t ORDER BY a OFFSET 5 ROWS FETCH NEXT 20 ROWS ONLY", 20),
+])
+def test_existing_row_limit_is_kept(db, sql, rows):
+    report = SQLGuard(limit_rows=10).check(db, sql)
+    assert report.passed and not report.rewrites
+    assert report.sql == sql
+    assert len(db.execute_query(report.sql)) == rows
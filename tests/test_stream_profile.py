@@ -0,0 +1,29 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+from broinsight.data_quality.field_profile import field_profile
+from broinsight.data_quality.stream_profile import stream_profile
+
+
+def test_null_only_first_chunk_does_not_fix_the_type():
+    df = pd.DataFrame({
+        "id": range(10),
+        "sparse": [np.nan] * 4 + ["a", "b", "a", "c", "a", "b"],
+    })
+    chunks = pd.read_csv(io.StringIO(df.to_csv(index=False)), chunksize=4)
+
+    streamed = stream_profile(chunks)["fields"]["sparse"]
+    full = field_profile(df)["sparse"]
+
+    assert streamed["data_type"] == full["data_types"] == "string"
+    assert streamed["missing_values"] == 4
+    assert streamed["most_frequent"] == {"a": 3, "b": 2, "c": 1}
+
+
+def test_all_null_column_keeps_its_first_chunk_type():
+    chunks = [pd.DataFrame({"empty": [np.nan, np.nan]}), pd.DataFrame({"empty": [np.nan]})]
+    profile = stream_profile(chunks)["fields"]["empty"]
+    assert profile["data_type"] == "float"
+    assert profile["missing_values"] == 3